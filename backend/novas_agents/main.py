@@ -91,7 +91,9 @@ set_up_metrics()
 
 def setup_a2a_server(app: FastAPI):
     from novas_agents.sk_agents import setup_sk_agents
+    from novas_agents.sk_mcp_pool import close_mcp_session_pools
     setup_sk_agents(app)
+    app.add_event_handler("shutdown", close_mcp_session_pools)
     
 @click.command()
 @click.option("--host", "host", default="localhost")
@@ -69,12 +69,21 @@ def create_sk_agent_stock_symbol_research(agent_name: str, agent_card: AgentCard
         deep_think_model=agent_config.get("deep_think_model", "openai:gpt-4.1"),
         quick_think_model=agent_config.get("quick_think_model", "openai:gpt-4.1"),
         mcp_server_url=agent_config.get("mcp_server_url", "http://localhost:9000/trading/sse"),
+        mcp_transport=agent_config.get("mcp_transport", "sse"),
+        mcp_pool_size=agent_config.get("mcp_pool_size", 4),
+        mcp_health_check_interval=agent_config.get("mcp_health_check_interval", 30.0),
+        mcp_acquire_timeout=agent_config.get("mcp_acquire_timeout", 60.0),
         max_debate_rounds=agent_config.get("max_debate_rounds", 1),
         max_risk_discuss_rounds=agent_config.get("max_risk_discuss_rounds", 1),
         max_recur_limit=agent_config.get("max_recur_limit", 100),
         selected_analysts=agent_config.get("selected_analysts", ["market", "news", "fundamentals"]),
         analyst_functions=agent_config.get("analyst_functions", {}),
         max_concurrent_analysts_tool_calls=agent_config.get("max_concurrent_analysts_tool_calls", 5),
+        stage_models={
+            **FinancialTradingAgentConfig.model_fields["stage_models"].default,
+            **agent_config.get("stage_models", {}),
+        },
+        report_digest_max_chars=agent_config.get("report_digest_max_chars", 4000),
     )
     return FinancialTradingAgent(config)
 def build_agent_card(agent_card_config: Dict[str, Any]) -> AgentCard:
@@ -119,6 +119,7 @@ def a2a_message_to_sk_message(message: Message) -> ChatMessageContent:
     return ChatMessageContent(
         role=message.role,
         items=[a2a_part_to_sk_item(part) for part in message.parts],
+        metadata=message.metadata or {},
     )
 
 
@@ -0,0 +1,213 @@
+"""
+Server-level pool of long-lived MCP sessions.
+
+Agents are built per request, and used to connect (and handshake with) the MCP server
+on every run. Instead, each run leases an already connected plugin from a pool shared
+by the whole agent server for the stages that call MCP tools. Idle sessions are pinged
+before reuse once they have been idle longer than the health check interval, and
+sessions that fail a health check or whose connection has dropped are replaced.
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Literal
+
+from semantic_kernel.connectors.mcp import (
+    MCPPluginBase,
+    MCPSsePlugin,
+    MCPStreamableHttpPlugin,
+)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+McpTransport = Literal["sse", "streamable_http"]
+
+# Sessions abandoned while connecting, referenced until their task has closed them
+_closing_tasks: set[asyncio.Task] = set()
+
+
+class _PooledMcpSession:
+    """
+    A connected MCP plugin.
+
+    connect() and close() run in a dedicated task, so the transport's task groups are
+    entered and exited by the same task no matter which run leased the session.
+    """
+
+    def __init__(self, plugin: MCPPluginBase):
+        self.plugin = plugin
+        self.checked_at = time.monotonic()
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._error: Exception | None = None
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+        try:
+            await self._ready.wait()
+        except BaseException:
+            # The caller was cancelled while connecting, the task closes the session
+            # as soon as it is connected instead of leaving it open
+            self._stop.set()
+            _closing_tasks.add(self._task)
+            self._task.add_done_callback(_closing_tasks.discard)
+            raise
+        if self._error is not None:
+            raise self._error
+
+    async def _run(self) -> None:
+        try:
+            await self.plugin.connect()
+        except Exception as e:
+            self._error = e
+            return
+        finally:
+            self._ready.set()
+        try:
+            await self._stop.wait()
+        finally:
+            try:
+                await self.plugin.close()
+            except Exception as e:
+                logger.warning(f"Error closing MCP session {self.plugin.name}: {e}")
+
+    @property
+    def closed(self) -> bool:
+        return self._task is None or self._task.done()
+
+    async def ping(self, timeout: float) -> bool:
+        if self.closed or self.plugin.session is None:
+            return False
+        try:
+            await asyncio.wait_for(self.plugin.session.send_ping(), timeout)
+        except Exception as e:
+            logger.warning(f"MCP session {self.plugin.name} failed health check: {e}")
+            return False
+        self.checked_at = time.monotonic()
+        return True
+
+    async def close(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+class McpSessionPool:
+    """
+    Pool of connected MCP plugins for one server.
+
+    lease() hands out an idle session, opens a new one while fewer than max_size are
+    leased, or waits up to acquire_timeout for a session to be returned. A session
+    leased by a run that raised is pinged before it is handed out again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        transport: McpTransport = "sse",
+        max_size: int = 4,
+        health_check_interval: float = 30.0,
+        health_check_timeout: float = 5.0,
+        acquire_timeout: float | None = 60.0,
+    ):
+        self.name = name
+        self.url = url
+        self.transport = transport
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+        self.acquire_timeout = acquire_timeout
+        self.closed = False
+        self.loop = asyncio.get_running_loop()
+        self._semaphore = asyncio.Semaphore(max_size)
+        self._idle: list[_PooledMcpSession] = []
+
+    def _create_plugin(self) -> MCPPluginBase:
+        if self.transport == "streamable_http":
+            return MCPStreamableHttpPlugin(
+                name=self.name, url=self.url, load_prompts=False, load_tools=True
+            )
+        return MCPSsePlugin(
+            name=self.name, url=self.url, load_prompts=False, load_tools=True
+        )
+
+    async def _acquire(self) -> _PooledMcpSession:
+        while self._idle:
+            # Most recently returned first, so rarely used sessions age out via health checks
+            session = self._idle.pop()
+            if session.closed:
+                continue
+            if time.monotonic() - session.checked_at < self.health_check_interval:
+                return session
+            try:
+                healthy = await session.ping(self.health_check_timeout)
+            except BaseException:
+                # Cancelled during the health check, keep the session for the next lease
+                self._idle.append(session)
+                raise
+            if healthy:
+                return session
+            await session.close()
+
+        session = _PooledMcpSession(self._create_plugin())
+        await session.start()
+        logger.info(f"Opened MCP session {self.name} to {self.url}")
+        return session
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[MCPPluginBase]:
+        if self.closed:
+            raise RuntimeError(f"MCP session pool {self.name} is closed")
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(
+                f"No MCP session of {self.name} was returned within {self.acquire_timeout}s"
+            ) from None
+        try:
+            session = await self._acquire()
+            try:
+                yield session.plugin
+            except BaseException:
+                # The run may have failed because of the connection, check it before reuse
+                session.checked_at = 0.0
+                raise
+            finally:
+                if self.closed or session.closed:
+                    await session.close()
+                else:
+                    self._idle.append(session)
+        finally:
+            self._semaphore.release()
+
+    async def close(self) -> None:
+        self.closed = True
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*(session.close() for session in idle))
+
+
+_pools: dict[tuple[str, str, str], McpSessionPool] = {}
+
+
+def get_mcp_session_pool(
+    name: str,
+    url: str,
+    transport: McpTransport = "sse",
+    **kwargs,
+) -> McpSessionPool:
+    """Get the shared pool for an MCP server, created on first use in the running event loop"""
+    key = (name, url, transport)
+    pool = _pools.get(key)
+    if pool is None or pool.closed or pool.loop is not asyncio.get_running_loop():
+        pool = McpSessionPool(name, url, transport, **kwargs)
+        _pools[key] = pool
+    return pool
+
+
+async def close_mcp_session_pools() -> None:
+    pools = list(_pools.values())
+    _pools.clear()
+    await asyncio.gather(*(pool.close() for pool in pools))
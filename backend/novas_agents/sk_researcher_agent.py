@@ -312,6 +312,38 @@ async def tavily_search_async(search_queries: list[str], max_results: int = 5, t
             print(f"> {result['url']}\n  {result['title']}\n  {result['content'][:100]}")
     return search_docs
 
+async def searxng_search_async(search_queries: list[str], max_results: int = 5, per_query_timeout: float = 8.0):
+    import httpx
+    from urllib.parse import urljoin
+
+    WEB_SEARCH_BASE_URL = os.getenv("WEB_SEARCH_BASE_URL", "http://localhost:9000")
+    async with httpx.AsyncClient(timeout=httpx.Timeout(per_query_timeout + 30.0, connect=10.0)) as client:
+        response = await client.post(
+            urljoin(WEB_SEARCH_BASE_URL, "/api/v1/web_search/multi"),
+            json={
+                "queries": search_queries,
+                "max_results": max_results * max(1, len(search_queries)),
+                "per_query_timeout": per_query_timeout,
+            },
+        )
+        response.raise_for_status()
+        fused = response.json()
+    logger.info(f"searxng_search_async - {fused['query']}, {len(fused['results'])} results, failed: {fused['metadata'].get('failed_queries')}")
+    # Shaped like the tavily response, the fused list is already ranked and deduplicated
+    return [{
+        "query": fused["query"],
+        "results": [
+            {
+                "url": result["url"],
+                "title": result["title"],
+                "content": result["snippet"],
+                "raw_content": None,
+                "query": (result["metadata"].get("queries") or [fused["query"]])[0],
+            }
+            for result in fused["results"]
+        ],
+    }]
+
 async def crawai_web_fetch_async(urls: list[str]):
     from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, BrowserConfig, CacheMode, DefaultMarkdownGenerator
     browser_config = BrowserConfig(
@@ -373,19 +405,22 @@ async def _web_search(
 ):
     logger.info(f"web_search - queries: {queries}, max_results: {max_results}, topic: {topic}, include_domains: {include_domains}, exclude_domains: {exclude_domains}")
     unique_results = {}
-    search_results = await tavily_search_async(
-        queries,
-        max_results=max_results,
-        topic=topic,
-        include_raw_content=True,
-        include_domains=include_domains,
-        exclude_domains=exclude_domains,
-    )
+    if configurable.search_api == "searxng":
+        search_results = await searxng_search_async(queries, max_results=max_results)
+    else:
+        search_results = await tavily_search_async(
+            queries,
+            max_results=max_results,
+            topic=topic,
+            include_raw_content=True,
+            include_domains=include_domains,
+            exclude_domains=exclude_domains,
+        )
     for search_result in search_results:
         for result in search_result['results']:
             url = result['url']
             if url not in unique_results:
-                unique_results[url] = {**result, "query": search_result['query']}
+                unique_results[url] = {"query": search_result['query'], **result}
                 
     urls_web_fetch = [url for url in unique_results.keys() if not unique_results[url].get("raw_content") or len(unique_results[url]['raw_content']) < 100]
     crawai_results = await crawai_web_fetch_async(urls_web_fetch)
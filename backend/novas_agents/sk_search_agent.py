@@ -88,6 +88,8 @@ class MetaSearchAgent(DeclarativeSpecMixin, Agent):
     instructions: str | None = None
     search_config: MetaSearchAgentConfig | None = None
     inner_chat_completion_agent: ChatCompletionAgent | None = None
+    # Uploaded files of the chat, passed in the metadata of the user message
+    local_file_ids: list[str] | None = None
 
     def __init__(
         self,
@@ -147,13 +149,27 @@ class MetaSearchAgent(DeclarativeSpecMixin, Agent):
         pass
 
     @kernel_function(
-        name="local_search_and_retrieve",
-        description="Search the local database for the query",
+        name=LOCAL_SEARCH_FUNCTION_NAME,
+        description="Search the files uploaded to the chat for passages relevant to the query",
     )
     async def local_search_and_retrieve(
-        self, query: Annotated[str, "The query to search for"]
-    ):
-        pass
+        self,
+        query: Annotated[str, "The query to search for"],
+        top_k: Annotated[int, "The number of passages to return"] = 10,
+    ) -> Annotated[list[dict[str, Any]], "The most relevant passages"]:
+        import httpx
+
+        NOVAS_APP_BASE_URL = os.getenv("NOVAS_APP_BASE_URL", "http://localhost:8000")
+        logger.info(f"local_search_and_retrieve: {query}, {self.local_file_ids}")
+        async with httpx.AsyncClient(
+            timeout=httpx.Timeout(60.0, connect=60.0)
+        ) as client:
+            response = await client.post(
+                urljoin(NOVAS_APP_BASE_URL, "/api/v1/uploads/search"),
+                json={"query": query, "fileIds": self.local_file_ids, "topK": top_k},
+            )
+            response.raise_for_status()
+            return response.json()["results"]
 
     @trace_agent_invocation
     @override
@@ -182,10 +198,21 @@ class MetaSearchAgent(DeclarativeSpecMixin, Agent):
                 ),
             )
         )
-        # kernel.add_function(function=KernelFunction.from_method(
-        #     method=self.local_search_and_retrieve,
-        #     plugin_name="local_search_and_retrieve",
-        # ))
+        self.local_file_ids = next(
+            (
+                message.metadata["file_ids"]
+                for message in reversed(messages)
+                if isinstance(message, ChatMessageContent)
+                and message.metadata.get("file_ids")
+            ),
+            None,
+        )
+        if self.local_file_ids:
+            kernel.add_function(
+                plugin_name=LOCAL_SEARCH_PLUGIN_NAME,
+                function_name=LOCAL_SEARCH_FUNCTION_NAME,
+                function=KernelFunction.from_method(self.local_search_and_retrieve),
+            )
         if self.search_config.search_web:
             kernel.add_function(
                 plugin_name=WEB_SEARCH_PLUGIN_NAME,
@@ -299,6 +326,7 @@ class MetaSearchAgent(DeclarativeSpecMixin, Agent):
                 async for search_and_fetch_result in self.__web_search_and_fetch(
                     function_call_arguments["query"],
                     language=function_call_arguments["language"],
+                    queries=function_call_arguments.get("queries"),
                 ):
                     result: WebSearchAndFetchResult = search_and_fetch_result
                     logger.info(f"__web_search_and_fetch result = {result}")
@@ -443,6 +471,53 @@ class MetaSearchAgent(DeclarativeSpecMixin, Agent):
                     f"function_call_result_message = \n{function_call_result_message}"
                 )
 
+                yield AgentResponseItem(
+                    message=function_call_result_message,
+                    thread=agent_thread,
+                )
+            elif (
+                function_call.function_name == LOCAL_SEARCH_FUNCTION_NAME
+                and function_call.plugin_name == LOCAL_SEARCH_PLUGIN_NAME
+            ):
+                logger.info(f"handling function_call = \n{function_call}")
+                function_call_arguments = json.loads(function_call.arguments)
+                local_results = await self.local_search_and_retrieve(
+                    function_call_arguments["query"],
+                    top_k=function_call_arguments.get("top_k", 10),
+                )
+                for local_result in local_results:
+                    final_data_source_references.append(FileReferenceContent(
+                        file_id=local_result["fileId"],
+                        tools=[],
+                        data_source={
+                            "url": f"file://{local_result['fileId']}",
+                            "title": local_result["title"],
+                            "snippet": local_result["content"],
+                            "text_content": local_result["content"],
+                            "metadata": {"chunk_index": local_result["chunkIndex"]},
+                        },
+                        metadata={
+                            "internal_type": "reference_data_source",
+                        },
+                    ))
+
+                function_call_result_message = StreamingChatMessageContent(
+                    role=AuthorRole.TOOL,
+                    items=[
+                        FunctionResultContent(
+                            id=call_id,
+                            name=function_call.name,
+                            call_id=function_call.id,
+                            function_name=LOCAL_SEARCH_FUNCTION_NAME,
+                            plugin_name=LOCAL_SEARCH_PLUGIN_NAME,
+                            result=local_results,
+                        )
+                    ],
+                    choice_index=(
+                        full_completion.choice_index if full_completion else 0
+                    ),
+                    metadata=(full_completion.metadata if full_completion else {}),
+                )
                 yield AgentResponseItem(
                     message=function_call_result_message,
                     thread=agent_thread,
@@ -507,13 +582,16 @@ class MetaSearchAgent(DeclarativeSpecMixin, Agent):
 
     @kernel_function(
         name=WEB_SEARCH_AND_FETCH_FUNCTION_NAME,
-        description="Search the web using either a query or specific links. When links are provided, retrieve content from those URLs directly. When no links are provided, use the query to search the web.",
+        description="Search the web using either a query or specific links. When links are provided, retrieve content from those URLs directly. When no links are provided, use the query to search the web. Additional reformulations of the query can be given to search them together and merge the results.",
     )
     async def __web_search_and_fetch(
         self,
         query: Annotated[str, "The query to search for"] = None,
         language: Annotated[str, "The language to search for"] = "en",
         links: Annotated[list[str], "The links to search for"] = None,
+        queries: Annotated[
+            list[str], "Additional reformulations of the query to search together"
+        ] = None,
     ) -> Annotated[AsyncGenerator[WebSearchAndFetchResult], "The search results"]:
         import httpx
 
@@ -544,7 +622,20 @@ class MetaSearchAgent(DeclarativeSpecMixin, Agent):
                 response.raise_for_status()
                 return response.json()
 
-        logger.info(f"web_search_and_retrieve: {query}, {links}")
+        async def __web_multi_search(
+            queries: list[str], language: str = "en"
+        ) -> dict[str, Any]:
+            async with httpx.AsyncClient(
+                timeout=httpx.Timeout(60.0, connect=60.0)
+            ) as client:
+                response = await client.post(
+                    urljoin(WEB_SEARCH_BASE_URL, "/api/v1/web_search/multi"),
+                    json={"queries": queries, "language": language},
+                )
+                response.raise_for_status()
+                return response.json()
+
+        logger.info(f"web_search_and_retrieve: {query}, {queries}, {links}")
         if links is not None and len(links) > 0:
             for link in links:
                 request_id = str(uuid.uuid4())
@@ -572,9 +663,13 @@ class MetaSearchAgent(DeclarativeSpecMixin, Agent):
                 arguments={
                     "query": query,
                     "language": language,
+                    "queries": queries,
                 },
             )
-            results = await __web_search(query, language)
+            if queries:
+                results = await __web_multi_search([query, *queries], language)
+            else:
+                results = await __web_search(query, language)
             results["results"] = results.get("results", [])[0:2]
             yield WebSearchAndFetchResult(
                 request_id=request_id,
@@ -1,11 +1,17 @@
 import asyncio
 from collections.abc import AsyncIterable, Awaitable, Callable
+from contextlib import AbstractAsyncContextManager, nullcontext
 from functools import reduce
 import logging.config
 import os
 import json
 from novas_agents.sk_trading_prompts import *
 from novas_agents.sk_trading_core import *
+from novas_agents.sk_mcp_pool import (
+    McpTransport,
+    close_mcp_session_pools,
+    get_mcp_session_pool,
+)
 from novas_agents.utils import (
     get_today_str,
 )
@@ -21,9 +27,9 @@ from pydantic import BaseModel, Field
 from typing import (
     Any,
     Literal,
-    override,
     Any,
 )
+from typing_extensions import override
 
 from semantic_kernel.connectors.ai.chat_completion_client_base import (
     ChatCompletionClientBase,
@@ -31,6 +37,9 @@ from semantic_kernel.connectors.ai.chat_completion_client_base import (
 from semantic_kernel.connectors.ai.function_choice_behavior import (
     FunctionChoiceBehavior,
 )
+from semantic_kernel.connectors.ai.prompt_execution_settings import (
+    PromptExecutionSettings,
+)
 from semantic_kernel.contents import (
     ChatMessageContent,
     AuthorRole,
@@ -45,10 +54,7 @@ from semantic_kernel.utils.telemetry.agent_diagnostics.decorators import (
     trace_agent_invocation,
 )
 from semantic_kernel.connectors.ai.open_ai import OpenAIChatCompletion
-from semantic_kernel.connectors.mcp import (
-    MCPPluginBase,
-    MCPSsePlugin,
-)
+from semantic_kernel.connectors.mcp import MCPPluginBase
 from semantic_kernel.kernel import Kernel, KernelPlugin, KernelArguments
 from openai import AsyncOpenAI
 
@@ -108,6 +114,10 @@ def name_to_speaker_id(name: str) -> str:
         logger.error(f"Invalid name: {name}")
         return name
 
+TradingStage = Literal[
+    "analysts", "researchers", "invest_judge", "trader", "risk_debators", "risk_judge"
+]
+
 class FinancialTradingAgentConfig(BaseModel):
     # Model Configuration
     deep_think_model: str = Field(default="openai:gpt-4.1", metadata={})
@@ -117,6 +127,10 @@ class FinancialTradingAgentConfig(BaseModel):
     mcp_server_url: str = Field(
         default="http://localhost:9000/trading/sse", metadata={}
     )
+    mcp_transport: McpTransport = Field(default="sse", metadata={})
+    mcp_pool_size: int = Field(default=4, metadata={})
+    mcp_health_check_interval: float = Field(default=30.0, metadata={})
+    mcp_acquire_timeout: float = Field(default=60.0, metadata={})
     max_debate_rounds: int = Field(default=1, metadata={})
     max_risk_discuss_rounds: int = Field(default=1, metadata={})
     max_recur_limit: int = Field(default=100, metadata={})
@@ -128,19 +142,89 @@ class FinancialTradingAgentConfig(BaseModel):
         dict[Literal["included_functions", "excluded_functions"], list[str]],
     ] = Field(default={}, metadata={})
     max_concurrent_analysts_tool_calls: int = Field(default=5, metadata={})
+    # Which of the two models each stage runs on, stages not listed use the deep model
+    stage_models: dict[TradingStage, Literal["deep", "quick"]] = Field(
+        default={
+            "analysts": "quick",
+            "researchers": "quick",
+            "invest_judge": "deep",
+            "trader": "deep",
+            "risk_debators": "quick",
+            "risk_judge": "deep",
+        },
+        metadata={},
+    )
+    # Analyst reports are compacted to this many characters for the debate stages
+    report_digest_max_chars: int = Field(default=4000, metadata={})
 
     class Config:
         arbitrary_types_allowed = True
 
 
+class ToolResultMemo:
+    """
+    Per-run memo of tool results shared by all analysts.
+
+    Calls are keyed by (plugin, function, canonical arguments). A duplicate call is
+    answered from the memo, or joins the in-flight call with the same key.
+    Failed calls are not memoized, so the next caller invokes the tool again.
+    """
+
+    def __init__(self):
+        self._results: dict[str, asyncio.Future] = {}
+        self.invoked_calls = 0
+        self.saved_calls = 0
+
+    @staticmethod
+    def make_key(plugin_name: str | None, function_name: str, arguments: dict[str, Any]) -> str:
+        return json.dumps(
+            [plugin_name, function_name, arguments],
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+
+    async def get_or_invoke(self, key: str, invoke: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._results.get(key)
+        if future is not None:
+            self.saved_calls += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The caller that started the call was cancelled, invoke it ourselves
+                self.saved_calls -= 1
+                return await self.get_or_invoke(key, invoke)
+
+        future = asyncio.get_running_loop().create_future()
+        self._results[key] = future
+        self.invoked_calls += 1
+        try:
+            result = await invoke()
+        except asyncio.CancelledError:
+            self._results.pop(key, None)
+            future.cancel()
+            raise
+        except BaseException as e:
+            self._results.pop(key, None)
+            future.set_exception(e)
+            # Avoid "exception was never retrieved" when nobody joined the call
+            future.exception()
+            raise
+        future.set_result(result)
+        return result
+
+
 async def safe_invoke_function(
     kernel: Kernel,
     function_call_content: FunctionCallContent,
     arguments: dict[str, Any],
     semaphore: asyncio.Semaphore,
+    memo: ToolResultMemo | None = None,
 ):
-    async with semaphore:
-        try:
+    async def invoke():
+        async with semaphore:
             function = kernel.get_function(
                 function_call_content.plugin_name,
                 function_call_content.function_name,
@@ -152,14 +236,84 @@ async def safe_invoke_function(
                 ),
             )
             return function_result.value
-        except Exception as e:
-            logger.error(
-                f"Error invoking function {function_call_content.function_name}: {e}"
-            )
-            return {
-                "error": str(e),
-                "arguments": arguments,
-            }
+
+    try:
+        if memo is None:
+            return await invoke()
+        key = ToolResultMemo.make_key(
+            function_call_content.plugin_name,
+            function_call_content.function_name,
+            arguments,
+        )
+        return await memo.get_or_invoke(key, invoke)
+    except Exception as e:
+        logger.error(
+            f"Error invoking function {function_call_content.function_name}: {e}"
+        )
+        return {
+            "error": str(e),
+            "arguments": arguments,
+        }
+
+
+def get_stage_model_config(
+    kernel: Kernel, configurable: FinancialTradingAgentConfig, stage: TradingStage
+) -> tuple[str, dict[str, Any]]:
+    """
+    Model name (also its service id in the kernel) and model config a stage is routed to.
+    Falls back to the deep think model when the kernel has no service for the quick one.
+    """
+    if (
+        configurable.stage_models.get(stage, "deep") == "quick"
+        and configurable.quick_think_model in kernel.services
+    ):
+        model_name = configurable.quick_think_model
+        model_config = configurable.quick_think_model_config
+    else:
+        model_name = configurable.deep_think_model
+        model_config = configurable.deep_think_model_config
+    return model_name, model_config
+
+
+def get_stage_model(
+    kernel: Kernel, configurable: FinancialTradingAgentConfig, stage: TradingStage
+) -> tuple[ChatCompletionClientBase, PromptExecutionSettings]:
+    model_name, model_config = get_stage_model_config(kernel, configurable, stage)
+    model = kernel.get_service(service_id=model_name, type=ChatCompletionClientBase)
+    settings = model.instantiate_prompt_execution_settings(
+        model=model_name,
+        **model_config,
+    )
+    return model, settings
+
+
+def build_trading_context(
+    state: FinancialTradingAgentState, configurable: FinancialTradingAgentConfig
+) -> str:
+    """The analyst report digests every debater of a run starts from"""
+    max_chars = configurable.report_digest_max_chars
+    return trading_context_prompt.format(
+        market_research_report=digest_report(state.market_report, max_chars),
+        sentiment_report=digest_report(state.sentiment_report, max_chars),
+        news_report=digest_report(state.news_report, max_chars),
+        fundamentals_report=digest_report(state.fundamentals_report, max_chars),
+    )
+
+
+def build_stage_chat_history(
+    system_prompt: str, user_prompt: str, debate_history: str | None = None
+) -> ChatHistory:
+    """
+    Messages for one stage turn. Debaters put the trading context in the system message
+    and the debate history, which only grows between turns, in its own message ahead of
+    the role prompt, so consecutive turns share everything but the newest argument as a
+    prefix that the provider can serve from its prompt cache.
+    """
+    messages = [ChatMessageContent(role=AuthorRole.SYSTEM, content=system_prompt)]
+    if debate_history is not None:
+        messages.append(ChatMessageContent(role=AuthorRole.USER, content=debate_history))
+    messages.append(ChatMessageContent(role=AuthorRole.USER, content=user_prompt))
+    return ChatHistory(messages=messages)
 
 
 async def async_invoke_analyst_component(
@@ -180,6 +334,7 @@ async def async_invoke_analyst_component(
     response_stream_queue: asyncio.Queue[
         AgentResponseItem[StreamingChatMessageContent]
     ],
+    tool_result_memo: ToolResultMemo | None = None,
 ) -> tuple[str, str, list[ChatMessageContent]]:
     model = kernel.get_service(
         service_id=model_service_id, type=ChatCompletionClientBase
@@ -233,6 +388,7 @@ async def async_invoke_analyst_component(
                         function_call_content,
                         arguments,
                         function_call_semaphore,
+                        tool_result_memo,
                     )
                 )
 
@@ -270,9 +426,11 @@ async def invoke_analysts_stream(
     kernel: Kernel,
     configurable: FinancialTradingAgentConfig,
     thread: AgentThread,
+    tool_result_memo: ToolResultMemo | None = None,
 ) -> AsyncIterable[AgentResponseItem[StreamingChatMessageContent]]:
     """
     Analysts discuss the company of interest and the trade date.
+    Duplicate tool calls across analysts are answered from tool_result_memo.
     """
     selected_analysts = configurable.selected_analysts
     analysts_pack = {
@@ -284,8 +442,6 @@ async def invoke_analysts_stream(
                 ticker=state.company_of_interest,
             ),
             "report": "",
-            "service_id": "",
-            "model_name": "",
             "model_config": {
                 "max_tokens": 8000,
             },
@@ -312,8 +468,6 @@ async def invoke_analysts_stream(
                 ticker=state.company_of_interest,
             ),
             "report": "",
-            "service_id": "",
-            "model_name": "",
             "model_config": {
                 "max_tokens": 8000,
             },
@@ -340,8 +494,6 @@ async def invoke_analysts_stream(
                 ticker=state.company_of_interest,
             ),
             "report": "",
-            "service_id": "",
-            "model_name": "",
             "model_config": {
                 "max_tokens": 8000,
             },
@@ -368,8 +520,6 @@ async def invoke_analysts_stream(
                 ticker=state.company_of_interest,
             ),
             "report": "",
-            "service_id": "",
-            "model_name": "",
             "model_config": {
                 "max_tokens": 8000,
             },
@@ -395,6 +545,7 @@ async def invoke_analysts_stream(
     function_call_semaphore = asyncio.Semaphore(
         configurable.max_concurrent_analysts_tool_calls
     )
+    model_name, model_config = get_stage_model_config(kernel, configurable, "analysts")
     coroutines = []
     for analyst in selected_analysts:
         coroutines.append(
@@ -402,9 +553,12 @@ async def invoke_analysts_stream(
                 analyst_name=analyst,
                 state=state,
                 kernel=kernel,
-                model_service_id=analysts_pack[analyst]["service_id"],
-                model_name=analysts_pack[analyst]["model_name"],
-                model_config=analysts_pack[analyst]["model_config"],
+                model_service_id=model_name,
+                model_name=model_name,
+                model_config={
+                    **model_config,
+                    **analysts_pack[analyst]["model_config"],
+                },
                 system_prompt=analysts_pack[analyst]["system_prompt"],
                 shall_continue_func=analysts_pack[analyst]["shall_continue_func"],
                 included_functions=analysts_pack[analyst]["included_functions"],
@@ -412,6 +566,7 @@ async def invoke_analysts_stream(
                 function_call_semaphore=function_call_semaphore,
                 thread=thread,
                 response_stream_queue=response_stream_queue,
+                tool_result_memo=tool_result_memo,
             )
         )
 
@@ -483,30 +638,14 @@ async def invoke_researchers_stream(
     configurable: FinancialTradingAgentConfig,
     thread: AgentThread,
 ) -> AsyncIterable[AgentResponseItem[StreamingChatMessageContent]]:
-    deep_think_model = kernel.get_service(
-        service_id=configurable.deep_think_model, type=ChatCompletionClientBase
-    )
-    bull_model = deep_think_model
-    bear_model = deep_think_model
-    invest_judge_model = deep_think_model
-
-    settings = deep_think_model.instantiate_prompt_execution_settings(
-        model=configurable.deep_think_model,
-        **configurable.deep_think_model_config,
-    )
-    bull_model_settings = deep_think_model.instantiate_prompt_execution_settings(
-        model=configurable.deep_think_model,
-        **configurable.deep_think_model_config,
+    bull_model, bull_model_settings = get_stage_model(
+        kernel, configurable, "researchers"
     )
-    bear_model_settings = deep_think_model.instantiate_prompt_execution_settings(
-        model=configurable.deep_think_model,
-        **configurable.deep_think_model_config,
+    bear_model, bear_model_settings = get_stage_model(
+        kernel, configurable, "researchers"
     )
-    invest_judge_model_settings = (
-        deep_think_model.instantiate_prompt_execution_settings(
-            model=configurable.deep_think_model,
-            **configurable.deep_think_model_config,
-        )
+    invest_judge_model, invest_judge_model_settings = get_stage_model(
+        kernel, configurable, "invest_judge"
     )
 
     debate_state = FinancialTradingInvestDebateState(
@@ -522,6 +661,7 @@ async def invoke_researchers_stream(
     news_report = state.news_report
     fundamentals_report = state.fundamentals_report
     curr_situation = f"{market_research_report}\n\n{sentiment_report}\n\n{news_report}\n\n{fundamentals_report}"
+    trading_context = build_trading_context(state, configurable)
 
     past_bull_memories = bull_memory.get_memories(curr_situation, n_matches=2)
     past_bear_memories = bear_memory.get_memories(curr_situation, n_matches=2)
@@ -534,19 +674,16 @@ async def invoke_researchers_stream(
 
     for i in range(configurable.max_debate_rounds):
         # Bull Researcher
-        bull_prompt = bull_researcher_system_prompt.format(
-            market_research_report=market_research_report,
-            sentiment_report=sentiment_report,
-            news_report=news_report,
-            fundamentals_report=fundamentals_report,
-            history=debate_state.history,
+        bull_prompt = bull_researcher_user_prompt.format(
             current_response=debate_state.current_response,
             past_memory_str=past_bull_memory_str,
         )
         all_messages: list[StreamingChatMessageContent] = []
         async for chunk in bull_model.get_streaming_chat_message_content(
-            ChatHistory(
-                messages=[ChatMessageContent(role=AuthorRole.USER, content=bull_prompt)]
+            build_stage_chat_history(
+                trading_context,
+                bull_prompt,
+                invest_debate_history_prompt.format(history=debate_state.history),
             ),
             bull_model_settings,
             kernel=kernel,
@@ -567,19 +704,16 @@ async def invoke_researchers_stream(
         debate_state.current_response = argument
 
         # Bear Researcher
-        bear_prompt = bear_researcher_system_prompt.format(
-            market_research_report=market_research_report,
-            sentiment_report=sentiment_report,
-            news_report=news_report,
-            fundamentals_report=fundamentals_report,
-            history=debate_state.history,
+        bear_prompt = bear_researcher_user_prompt.format(
             current_response=debate_state.current_response,
             past_memory_str=past_bear_memory_str,
         )
         all_messages: list[StreamingChatMessageContent] = []
         async for chunk in bear_model.get_streaming_chat_message_content(
-            ChatHistory(
-                messages=[ChatMessageContent(role=AuthorRole.USER, content=bear_prompt)]
+            build_stage_chat_history(
+                trading_context,
+                bear_prompt,
+                invest_debate_history_prompt.format(history=debate_state.history),
             ),
             bear_model_settings,
             kernel=kernel,
@@ -609,18 +743,14 @@ async def invoke_researchers_stream(
     for i, rec in enumerate(past_memories, 1):
         past_memory_str += rec["recommendation"] + "\n\n"
 
-    research_manager_prompt = researcher_manager_system_prompt.format(
+    research_manager_prompt = researcher_manager_user_prompt.format(
         history=debate_state.history,
         past_memory_str=past_memory_str,
     )
     all_messages: list[StreamingChatMessageContent] = []
     async for chunk in invest_judge_model.get_streaming_chat_message_content(
-        ChatHistory(
-            messages=[
-                ChatMessageContent(
-                    role=AuthorRole.USER, content=research_manager_prompt
-                )
-            ]
+        build_stage_chat_history(
+            researcher_manager_system_prompt, research_manager_prompt
         ),
         invest_judge_model_settings,
         kernel=kernel,
@@ -667,35 +797,19 @@ async def invoke_trader_stream(
     else:
         past_memory_str = "No past memories found."
 
-    trader_system_message = trader_system_prompt.format(
-        company_name=company_name,
-        investment_plan=analyst_investment_plan,
-        past_memory_str=past_memory_str,
-    )
     trader_user_message = trader_user_prompt.format(
         company_name=company_name,
         investment_plan=analyst_investment_plan,
         past_memory_str=past_memory_str,
     )
 
-    trader_model = kernel.get_service(
-        service_id=configurable.deep_think_model, type=ChatCompletionClientBase
-    )
-    trader_model_settings = trader_model.instantiate_prompt_execution_settings(
-        model=configurable.deep_think_model,
-        **configurable.deep_think_model_config,
+    trader_model, trader_model_settings = get_stage_model(
+        kernel, configurable, "trader"
     )
 
     all_messages: list[StreamingChatMessageContent] = []
     async for chunk in trader_model.get_streaming_chat_message_content(
-        ChatHistory(
-            messages=[
-                ChatMessageContent(
-                    role=AuthorRole.SYSTEM, content=trader_system_message
-                ),
-                ChatMessageContent(role=AuthorRole.USER, content=trader_user_message),
-            ]
-        ),
+        build_stage_chat_history(trader_system_prompt, trader_user_message),
         trader_model_settings,
         kernel=kernel,
     ):
@@ -742,54 +856,36 @@ async def invoke_risk_analysis_stream(
     )
     state.risk_debate_state = risk_debate_state
 
-    risky_model = kernel.get_service(
-        service_id=configurable.deep_think_model, type=ChatCompletionClientBase
-    )
-    risky_model_settings = risky_model.instantiate_prompt_execution_settings(
-        model=configurable.deep_think_model,
-        **configurable.deep_think_model_config,
-    )
-    safe_model = kernel.get_service(
-        service_id=configurable.deep_think_model, type=ChatCompletionClientBase
+    risky_model, risky_model_settings = get_stage_model(
+        kernel, configurable, "risk_debators"
     )
-    safe_model_settings = safe_model.instantiate_prompt_execution_settings(
-        model=configurable.deep_think_model,
-        **configurable.deep_think_model_config,
+    safe_model, safe_model_settings = get_stage_model(
+        kernel, configurable, "risk_debators"
     )
-    neutral_model = kernel.get_service(
-        service_id=configurable.deep_think_model, type=ChatCompletionClientBase
+    neutral_model, neutral_model_settings = get_stage_model(
+        kernel, configurable, "risk_debators"
     )
-    neutral_model_settings = neutral_model.instantiate_prompt_execution_settings(
-        model=configurable.deep_think_model,
-        **configurable.deep_think_model_config,
-    )
-    risk_judge_model = kernel.get_service(
-        service_id=configurable.deep_think_model, type=ChatCompletionClientBase
-    )
-    risk_judge_model_settings = risk_judge_model.instantiate_prompt_execution_settings(
-        model=configurable.deep_think_model,
-        **configurable.deep_think_model_config,
+    risk_judge_model, risk_judge_model_settings = get_stage_model(
+        kernel, configurable, "risk_judge"
     )
+    trading_context = build_trading_context(state, configurable)
 
     while True:
         # Risky Debator
         risky_prompt = risky_debator_user_prompt.format(
-            market_research_report=market_research_report,
-            sentiment_report=sentiment_report,
-            news_report=news_report,
-            fundamentals_report=fundamentals_report,
-            trader_decision=trader_decision,
-            history=risk_debate_state.history,
             current_risky_response=risk_debate_state.current_risky_response,
             current_safe_response=risk_debate_state.current_safe_response,
             current_neutral_response=risk_debate_state.current_neutral_response,
         )
         all_messages: list[StreamingChatMessageContent] = []
         async for chunk in risky_model.get_streaming_chat_message_content(
-            ChatHistory(
-                messages=[
-                    ChatMessageContent(role=AuthorRole.USER, content=risky_prompt)
-                ]
+            build_stage_chat_history(
+                trading_context,
+                risky_prompt,
+                risk_debate_history_prompt.format(
+                    trader_decision=trader_decision,
+                    history=risk_debate_state.history,
+                ),
             ),
             risky_model_settings,
             kernel=kernel,
@@ -817,20 +913,19 @@ async def invoke_risk_analysis_stream(
 
         # Safe Debator
         safe_prompt = safe_debator_user_prompt.format(
-            market_research_report=market_research_report,
-            sentiment_report=sentiment_report,
-            news_report=news_report,
-            fundamentals_report=fundamentals_report,
-            trader_decision=trader_decision,
-            history=risk_debate_state.history,
             current_risky_response=risk_debate_state.current_risky_response,
             current_safe_response=risk_debate_state.current_safe_response,
             current_neutral_response=risk_debate_state.current_neutral_response,
         )
         all_messages: list[StreamingChatMessageContent] = []
         async for chunk in safe_model.get_streaming_chat_message_content(
-            ChatHistory(
-                messages=[ChatMessageContent(role=AuthorRole.USER, content=safe_prompt)]
+            build_stage_chat_history(
+                trading_context,
+                safe_prompt,
+                risk_debate_history_prompt.format(
+                    trader_decision=trader_decision,
+                    history=risk_debate_state.history,
+                ),
             ),
             safe_model_settings,
             kernel=kernel,
@@ -858,22 +953,19 @@ async def invoke_risk_analysis_stream(
 
         # Neutral Debator
         neutral_prompt = neutral_debator_user_prompt.format(
-            market_research_report=market_research_report,
-            sentiment_report=sentiment_report,
-            news_report=news_report,
-            fundamentals_report=fundamentals_report,
-            trader_decision=trader_decision,
-            history=risk_debate_state.history,
             current_risky_response=risk_debate_state.current_risky_response,
             current_safe_response=risk_debate_state.current_safe_response,
             current_neutral_response=risk_debate_state.current_neutral_response,
         )
         all_messages: list[StreamingChatMessageContent] = []
         async for chunk in neutral_model.get_streaming_chat_message_content(
-            ChatHistory(
-                messages=[
-                    ChatMessageContent(role=AuthorRole.USER, content=neutral_prompt)
-                ]
+            build_stage_chat_history(
+                trading_context,
+                neutral_prompt,
+                risk_debate_history_prompt.format(
+                    trader_decision=trader_decision,
+                    history=risk_debate_state.history,
+                ),
             ),
             neutral_model_settings,
             kernel=kernel,
@@ -916,11 +1008,7 @@ async def invoke_risk_analysis_stream(
     )
     all_messages: list[StreamingChatMessageContent] = []
     async for chunk in risk_judge_model.get_streaming_chat_message_content(
-        ChatHistory(
-            messages=[
-                ChatMessageContent(role=AuthorRole.USER, content=risk_judge_prompt)
-            ]
-        ),
+        build_stage_chat_history(risk_judge_system_prompt, risk_judge_prompt),
         risk_judge_model_settings,
         kernel=kernel,
     ):
@@ -947,16 +1035,27 @@ class FinancialTradingAgent(DeclarativeSpecMixin, Agent):
     @classmethod
     def _get_kernel(cls, config: FinancialTradingAgentConfig) -> Kernel:
         kernel = Kernel()
+        async_client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            base_url=os.getenv("OPENAI_BASE_URL"),
+        )
         kernel.add_service(
             service=OpenAIChatCompletion(
                 ai_model_id=os.getenv("OPENAI_MODEL_NAME"),
                 service_id=config.deep_think_model,
-                async_client=AsyncOpenAI(
-                    api_key=os.getenv("OPENAI_API_KEY"),
-                    base_url=os.getenv("OPENAI_BASE_URL"),
-                ),
+                async_client=async_client,
             ),
         )
+        if config.quick_think_model != config.deep_think_model:
+            # "openai:gpt-4.1-mini" -> "gpt-4.1-mini", unless the deployment names it explicitly
+            kernel.add_service(
+                service=OpenAIChatCompletion(
+                    ai_model_id=os.getenv("OPENAI_QUICK_MODEL_NAME")
+                    or config.quick_think_model.split(":", 1)[-1],
+                    service_id=config.quick_think_model,
+                    async_client=async_client,
+                ),
+            )
         # kernel.add_function(
         #     plugin_name=plugin_name,
         #     function_name=clarify_completed_tool_name,
@@ -1003,19 +1102,10 @@ class FinancialTradingAgent(DeclarativeSpecMixin, Agent):
         ) = None,
         **kwargs,
     ) -> AsyncIterable[AgentResponseItem[StreamingChatMessageContent]]:
-        trading_plugin: MCPPluginBase | None = None
-        if self.config.mcp_server_url:
-            trading_plugin = MCPSsePlugin(
-                name="trading",
-                url=self.config.mcp_server_url,
-                load_prompts=False,
-                load_tools=True,
-            )
+        # Each run gets its own kernel, so concurrent runs never share plugin state
+        kernel = self.kernel.clone()
+        tool_result_memo = ToolResultMemo()
         try:
-            if trading_plugin is not None:
-                await trading_plugin.connect()
-                self.kernel.add_plugin(trading_plugin, plugin_name="trading")
-
             if thread is None:
                 thread = ChatHistoryAgentThread()
 
@@ -1064,10 +1154,23 @@ class FinancialTradingAgent(DeclarativeSpecMixin, Agent):
             self.log_state(state, seq)
             while step != FinancialTradingAgentStep.END:
                 if step == FinancialTradingAgentStep.ANALYSTS:
-                    async for response in invoke_analysts_stream(
-                        conditional_logic, state, self.kernel, self.config, thread
-                    ):
-                        yield response
+                    # Only the analysts call MCP tools, the session goes back to the
+                    # pool before the debates so it is not held for the whole run
+                    async with self._lease_mcp_session() as trading_plugin:
+                        if trading_plugin is not None:
+                            kernel.add_plugin(trading_plugin, plugin_name="trading")
+                        try:
+                            async for response in invoke_analysts_stream(
+                                conditional_logic,
+                                state,
+                                kernel,
+                                self.config,
+                                thread,
+                                tool_result_memo,
+                            ):
+                                yield response
+                        finally:
+                            kernel.plugins.pop("trading", None)
                 elif step == FinancialTradingAgentStep.RESEARCHERS:
                     async for response in invoke_researchers_stream(
                         conditional_logic,
@@ -1075,14 +1178,14 @@ class FinancialTradingAgent(DeclarativeSpecMixin, Agent):
                         bear_memory,
                         invest_judge_memory,
                         state,
-                        self.kernel,
+                        kernel,
                         self.config,
                         thread,
                     ):
                         yield response
                 elif step == FinancialTradingAgentStep.TRADER:
                     async for response in invoke_trader_stream(
-                        trader_memory, state, self.kernel, self.config, thread
+                        trader_memory, state, kernel, self.config, thread
                     ):
                         yield response
                 elif step == FinancialTradingAgentStep.RISK_ANALYSIS:
@@ -1090,7 +1193,7 @@ class FinancialTradingAgent(DeclarativeSpecMixin, Agent):
                         conditional_logic,
                         risk_manager_memory,
                         state,
-                        self.kernel,
+                        kernel,
                         self.config,
                         thread,
                     ):
@@ -1099,14 +1202,27 @@ class FinancialTradingAgent(DeclarativeSpecMixin, Agent):
                 step = state.next_step
                 seq += 1
                 self.log_state(state, seq)
-
         except Exception as e:
             logger.error(f"Error in trading agent: {e}")
             raise e
         finally:
-            if trading_plugin is not None:
-                await trading_plugin.close()
-                self.kernel.plugins.pop("trading")
+            # Also reported for failed and cancelled runs
+            logger.info(
+                f"Trading run made {tool_result_memo.invoked_calls} MCP tool calls, "
+                f"saved {tool_result_memo.saved_calls} duplicate calls via the tool result memo"
+            )
+
+    def _lease_mcp_session(self) -> AbstractAsyncContextManager[MCPPluginBase | None]:
+        if not self.config.mcp_server_url:
+            return nullcontext()
+        return get_mcp_session_pool(
+            "trading",
+            self.config.mcp_server_url,
+            self.config.mcp_transport,
+            max_size=self.config.mcp_pool_size,
+            health_check_interval=self.config.mcp_health_check_interval,
+            acquire_timeout=self.config.mcp_acquire_timeout,
+        ).lease()
 
     def log_state(self, state: FinancialTradingAgentState, seq: int):
         try:
@@ -1165,13 +1281,13 @@ async def main():
     config.quick_think_model = "openai:gpt-4.1"
     config.analyst_functions = {
         "market": {
-            "included_functions": ["retrieve_stockstats_indicators_report", "retrieve_stock_historical_data"],
+            "included_functions": ["retrieve_stockstats_indicators_report", "retrieve_stock_historical_data", "retrieve_stockstats_indicators_batch", "retrieve_stock_historical_data_batch"],
         },
         "news": {
             "included_functions": ["retrieve_company_news", "retrieve_company_research_report"],
         },
         "fundamentals": {
-            "included_functions": ["retrieve_financial_cash_flow_statement", "retrieve_financial_income_statement", "retrieve_financial_balance_sheet", "retrieve_financial_analysis_indicators"],
+            "included_functions": ["retrieve_financial_cash_flow_statement", "retrieve_financial_income_statement", "retrieve_financial_balance_sheet", "retrieve_financial_analysis_indicators", "retrieve_financial_statement_batch"],
         },
         "social": {
             "included_functions": [],
@@ -1187,6 +1303,7 @@ async def main():
         # if last_message_id != response.message.id:
         #     last_message_id = response.message.id
         print(response.content, end="", flush=True)
+    await close_mcp_session_pools()
 
 
 if __name__ == "__main__":
@@ -168,6 +168,72 @@ class FinancialTradingConditionalLogic:
         return False
 
 
+def _compact_block(block: list[str], header_rows: int, max_rows: int) -> list[str]:
+    """Keep the header and the first and last rows of a table or code block"""
+    body = block[header_rows:]
+    if len(body) <= max_rows:
+        return block
+    head = (max_rows + 1) // 2
+    tail = max_rows - head
+    return (
+        block[:header_rows]
+        + body[:head]
+        + [f"... ({len(body) - max_rows} rows omitted) ..."]
+        + (body[-tail:] if tail else [])
+    )
+
+
+def digest_report(report: str, max_chars: int = 4000, max_table_rows: int = 12) -> str:
+    """
+    Compact an analyst report for the debate stages.
+
+    Blank lines are collapsed, markdown tables and fenced code blocks (usually pasted
+    tool output) keep only their first and last rows, and a report still longer than
+    max_chars is cut at a line boundary. The digest only depends on the report, so
+    every stage of a run sees exactly the same text.
+    """
+    if not report:
+        return report
+    lines: list[str] = []
+    block: list[str] = []
+    block_kind = ""
+    for line in report.splitlines():
+        line = line.rstrip()
+        stripped = line.lstrip()
+        if block_kind == "code":
+            block.append(line)
+            if stripped.startswith("```"):
+                lines.extend(
+                    _compact_block(block[:-1], 1, max_table_rows) + block[-1:]
+                )
+                block, block_kind = [], ""
+            continue
+        if block_kind == "table" and not stripped.startswith("|"):
+            lines.extend(_compact_block(block, 2, max_table_rows))
+            block, block_kind = [], ""
+        if stripped.startswith("```"):
+            block, block_kind = [line], "code"
+        elif stripped.startswith("|"):
+            block.append(line)
+            block_kind = "table"
+        elif line or (lines and lines[-1]):
+            lines.append(line)
+    if block_kind == "table":
+        lines.extend(_compact_block(block, 2, max_table_rows))
+    elif block_kind == "code":
+        lines.extend(_compact_block(block, 1, max_table_rows))
+
+    digest = "\n".join(lines).strip()
+    if max_chars > 0 and len(digest) > max_chars:
+        cut = digest.rfind("\n", 0, max_chars)
+        cut = cut if cut > 0 else max_chars
+        digest = (
+            digest[:cut].rstrip()
+            + f"\n... (report truncated, {len(digest) - cut} characters omitted) ..."
+        )
+    return digest
+
+
 class FinancialSituationMemory:
     def __init__(self, name, config):
         # if config["backend_url"] == "http://localhost:11434/v1":
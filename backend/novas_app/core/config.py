@@ -17,6 +17,15 @@ class Settings(BaseSettings):
     
     # SearxNG Settings
     SEARXNG_API_URL: str = "http://searxng:8080"
+    SEARXNG_CACHE_TTL: float = 300.0
+    SEARXNG_CACHE_BACKEND: str = "memory"  # memory or redis
+    
+    # Upload Settings
+    MAX_UPLOAD_FILE_SIZE: int = 200 * 1024 * 1024
+    MAX_UPLOAD_REQUEST_SIZE: int = 500 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    UPLOAD_GC_INTERVAL: int = 3600  # seconds between garbage collection runs
+    UPLOAD_GC_GRACE_PERIOD: int = 86400  # seconds a blob stays unreferenced before deletion
     
     # Weather Settings
     OPENMETEO_API_URL: str = "https://api.open-meteo.com/v1/forecast"
@@ -46,6 +55,16 @@ class Settings(BaseSettings):
     # Ollama Settings
     OLLAMA_API_URL: str = ""
     
+    # Embedding Settings
+    EMBEDDING_PROVIDER: str = "openai"  # openai (or compatible) or ollama
+    EMBEDDING_MODEL: str = "text-embedding-3-small"
+    EMBEDDING_API_URL: Optional[str] = None
+    EMBEDDING_API_KEY: Optional[str] = None
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_BATCH_WINDOW_MS: int = 10
+    EMBEDDING_CACHE_PATH: str = "./data/db_app/embedding_cache.db"
+    HYBRID_LEXICAL_WEIGHT: float = 0.3  # weight of BM25 in the reranking scores of file chunks and web documents
+    
     # YouTube Settings
     YOUTUBE_API_KEY: str = ""
     
@@ -0,0 +1,5 @@
+from novas_app.db.schemas import User
+
+
+async def get_current_user() -> User:
+    return User(id="dev", email="dev@test.com", username="dev", full_name="Dev User")
@@ -0,0 +1,284 @@
+"""Batched embedding service with a persistent vector cache.
+
+Texts from concurrent callers are collected for a short window and sent to the
+provider in batches through one shared http client. Vectors are cached in SQLite
+by (model, sha256(text)), so a text is only embedded once per model.
+
+Supported providers are OpenAI-compatible `/embeddings` endpoints and Ollama
+`/api/embed`; `EMBEDDING_API_URL` can point at a local stub server for tests.
+"""
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+import httpx
+import numpy as np
+from loguru import logger
+
+from novas_app.core.config import get_settings
+
+
+class EmbeddingCache:
+    """SQLite key-value store of float32 vectors keyed by (model, text hash)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        # The connection is shared by the worker threads, one statement at a time
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL, "
+                "PRIMARY KEY (model, text_hash))"
+            )
+            self._connection = connection
+        return self._connection
+
+    def get_many(self, model: str, text_hashes: Sequence[str]) -> Dict[str, List[float]]:
+        """Get the cached vectors of the given hashes (blocking)."""
+        found: Dict[str, List[float]] = {}
+        unique_hashes = list(dict.fromkeys(text_hashes))
+        with self._lock:
+            connection = self._connect()
+            # Stay below SQLite's bound parameter limit
+            for i in range(0, len(unique_hashes), 500):
+                batch = unique_hashes[i:i + 500]
+                rows = connection.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? "
+                    f"AND text_hash IN ({','.join('?' * len(batch))})",
+                    [model, *batch]
+                ).fetchall()
+                for text_hash, vector in rows:
+                    found[text_hash] = np.frombuffer(vector, dtype=np.float32).tolist()
+        return found
+
+    def put_many(self, model: str, vectors: Dict[str, List[float]]) -> None:
+        """Store vectors by text hash (blocking)."""
+        with self._lock, self._connect() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                [
+                    (model, text_hash, np.asarray(vector, dtype=np.float32).tobytes())
+                    for text_hash, vector in vectors.items()
+                ]
+            )
+
+
+class EmbeddingService:
+    """Embeds texts in micro-batches, backed by a persistent cache.
+
+    Exposes `embed_documents` and `embed_query`, so it can be used wherever an
+    embeddings model is expected.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        model: str,
+        base_url: str,
+        api_key: Optional[str] = None,
+        batch_size: int = 64,
+        batch_window: float = 0.01,
+        cache: Optional[EmbeddingCache] = None,
+        timeout: float = 60.0
+    ):
+        """Initialize embedding service.
+
+        Args:
+            provider: "openai" for OpenAI-compatible endpoints or "ollama"
+            model: Embedding model name
+            base_url: Provider base URL
+            api_key: API key sent as bearer token
+            batch_size: Maximum number of texts per provider request
+            batch_window: Seconds to wait for more texts before sending a batch
+            cache: Persistent vector cache
+            timeout: Provider request timeout in seconds
+        """
+        if provider not in ("openai", "ollama"):
+            raise ValueError(f"Unsupported embedding provider: {provider}")
+        self.provider = provider
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.cache = cache
+        self.timeout = timeout
+
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._queue: Dict[str, str] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None or self._http_client.is_closed:
+            headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+            self._http_client = httpx.AsyncClient(timeout=self.timeout, headers=headers)
+        return self._http_client
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    async def _request_embeddings(self, texts: List[str]) -> List[List[float]]:
+        client = self._get_http_client()
+        if self.provider == "ollama":
+            response = await client.post(
+                f"{self.base_url}/api/embed",
+                json={"model": self.model, "input": texts}
+            )
+            response.raise_for_status()
+            return response.json()["embeddings"]
+
+        response = await client.post(
+            f"{self.base_url}/embeddings",
+            json={"model": self.model, "input": texts}
+        )
+        response.raise_for_status()
+        data = sorted(response.json()["data"], key=lambda item: item["index"])
+        return [item["embedding"] for item in data]
+
+    async def _flush(self) -> None:
+        await asyncio.sleep(self.batch_window)
+        while self._queue:
+            batch = dict(list(self._queue.items())[:self.batch_size])
+            for text_hash in batch:
+                del self._queue[text_hash]
+            try:
+                vectors = await self._request_embeddings(list(batch.values()))
+                if len(vectors) != len(batch):
+                    raise ValueError(
+                        f"Expected {len(batch)} embeddings, got {len(vectors)}"
+                    )
+                result = dict(zip(batch.keys(), vectors))
+                if self.cache is not None:
+                    await asyncio.to_thread(self.cache.put_many, self.model, result)
+                for text_hash, vector in result.items():
+                    future = self._pending.pop(text_hash, None)
+                    if future is not None and not future.done():
+                        future.set_result(vector)
+            except Exception as e:
+                logger.error(f"Error embedding batch of {len(batch)} texts: {e}")
+                for text_hash in batch:
+                    future = self._pending.pop(text_hash, None)
+                    if future is not None and not future.done():
+                        future.set_exception(e)
+        self._flush_task = None
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, batching them with concurrent requests.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One vector per text
+        """
+        if not texts:
+            return []
+        text_hashes = [self.text_hash(text) for text in texts]
+        vectors: Dict[str, List[float]] = {}
+        if self.cache is not None:
+            vectors = await asyncio.to_thread(self.cache.get_many, self.model, text_hashes)
+
+        loop = asyncio.get_running_loop()
+        waiting: Dict[str, asyncio.Future] = {}
+        for text_hash, text in zip(text_hashes, texts):
+            if text_hash in vectors or text_hash in waiting:
+                continue
+            future = self._pending.get(text_hash)
+            if future is None:
+                future = loop.create_future()
+                self._pending[text_hash] = future
+                self._queue[text_hash] = text
+            waiting[text_hash] = future
+
+        if waiting:
+            if self._flush_task is None:
+                self._flush_task = asyncio.create_task(self._flush())
+            # Shielded, the futures are shared with other callers that must not
+            # be cancelled along with this one
+            results = await asyncio.gather(
+                *(asyncio.shield(future) for future in waiting.values())
+            )
+            vectors.update(zip(waiting.keys(), results))
+
+        return [vectors[text_hash] for text_hash in text_hashes]
+
+    async def embed_query(self, text: str) -> List[float]:
+        """Embed a single text.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            Vector of the text
+        """
+        return (await self.embed_documents([text]))[0]
+
+    async def aclose(self) -> None:
+        """Close the shared http client."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+
+def embedding_model_name(embeddings: object) -> Optional[str]:
+    """Model name of an embeddings model, as exposed by the common providers.
+
+    Args:
+        embeddings: Embeddings model, e.g. a LangChain one or an EmbeddingService
+
+    Returns:
+        The model name, or None when the model does not expose one
+    """
+    for attribute in ("model", "model_name"):
+        name = getattr(embeddings, attribute, None)
+        if isinstance(name, str) and name:
+            return name
+    return None
+
+
+@lru_cache()
+def get_embedding_service() -> Optional[EmbeddingService]:
+    """Get the embedding service configured in the settings.
+
+    Returns:
+        EmbeddingService, or None when no embedding provider is configured
+    """
+    settings = get_settings()
+    provider = settings.EMBEDDING_PROVIDER
+    if provider == "ollama":
+        base_url = settings.EMBEDDING_API_URL or settings.OLLAMA_API_URL
+        api_key = settings.EMBEDDING_API_KEY
+    elif provider == "openai":
+        base_url = settings.EMBEDDING_API_URL or settings.OPENAI_BASE_URL or "https://api.openai.com/v1"
+        api_key = settings.EMBEDDING_API_KEY or settings.OPENAI_API_KEY
+        if not api_key and not settings.EMBEDDING_API_URL:
+            return None
+    else:
+        return None
+    if not base_url:
+        return None
+
+    return EmbeddingService(
+        provider=provider,
+        model=settings.EMBEDDING_MODEL,
+        base_url=base_url,
+        api_key=api_key,
+        batch_size=settings.EMBEDDING_BATCH_SIZE,
+        batch_window=settings.EMBEDDING_BATCH_WINDOW_MS / 1000,
+        cache=EmbeddingCache(settings.EMBEDDING_CACHE_PATH) if settings.EMBEDDING_CACHE_PATH else None
+    )
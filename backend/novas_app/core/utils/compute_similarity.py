@@ -1,5 +1,5 @@
 """Compute similarity between embeddings."""
-from typing import List
+from typing import List, Sequence, Union
 import numpy as np
 
 def compute_similarity(a: List[float], b: List[float]) -> float:
@@ -12,4 +12,59 @@ def compute_similarity(a: List[float], b: List[float]) -> float:
     Returns:
         Cosine similarity
     """
-    return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)) 
\ No newline at end of file
+    return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)) 
+
+def compute_similarities(
+    query: Sequence[float],
+    vectors: Union[np.ndarray, Sequence[Sequence[float]]]
+) -> np.ndarray:
+    """Compute cosine similarity between a query and many vectors at once.
+
+    The vectors are stacked into one contiguous float32 matrix, normalized once
+    and scored with a single matrix-vector product. Zero vectors score NaN, like
+    `compute_similarity` does.
+
+    Args:
+        query: Query vector
+        vectors: Matrix (or list) of vectors, one per row
+
+    Returns:
+        Array of cosine similarities, one per row of `vectors`
+    """
+    matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+    if matrix.size == 0:
+        return np.empty(0, dtype=np.float32)
+    query_vector = np.asarray(query, dtype=np.float32)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = matrix @ query_vector
+        scores /= np.linalg.norm(matrix, axis=1) * np.linalg.norm(query_vector)
+    return scores
+
+def top_k_indices(
+    similarities: np.ndarray,
+    k: int,
+    threshold: float = float("-inf")
+) -> List[int]:
+    """Indices of the k highest similarities above a threshold.
+
+    Uses `argpartition` so only the candidates are sorted. Ties keep their
+    original order, matching a stable descending sort.
+
+    Args:
+        similarities: Similarity scores
+        k: Maximum number of indices to return
+        threshold: Only scores strictly greater than this are kept
+
+    Returns:
+        Indices ordered by descending similarity
+    """
+    candidates = np.flatnonzero(similarities > threshold)
+    if k <= 0 or candidates.size == 0:
+        return []
+    scores = similarities[candidates]
+    if candidates.size > k:
+        kth_score = np.partition(scores, candidates.size - k)[candidates.size - k]
+        keep = scores >= kth_score
+        candidates, scores = candidates[keep], scores[keep]
+    order = np.lexsort((candidates, -scores))[:k]
+    return candidates[order].tolist()
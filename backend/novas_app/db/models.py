@@ -141,4 +141,27 @@ class DbUser(DbAppBase):
     anonymous_token: Mapped[str] = mapped_column(String, unique=True, nullable=True)
     
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now(timezone.utc))
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc)) 
\ No newline at end of file
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc)) 
+
+class DbFileBlob(DbAppBase):
+    """Content-addressed upload, shared by every reference to the same bytes."""
+    __tablename__ = "file_blobs"
+
+    sha256: Mapped[str] = mapped_column(String, primary_key=True)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    file_extension: Mapped[str] = mapped_column(String, nullable=False)
+    ref_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+
+class DbFileReference(DbAppBase):
+    """A user's upload of a file blob."""
+    __tablename__ = "file_references"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    sha256: Mapped[str] = mapped_column(String, ForeignKey("file_blobs.sha256"), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String, nullable=False, index=True)
+    file_name: Mapped[str] = mapped_column(String, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now(timezone.utc))
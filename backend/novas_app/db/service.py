@@ -1,10 +1,10 @@
 from typing import List, Optional
 import uuid
 from datetime import datetime, timezone
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .models import DbChat, DbMessage, DbTask, DbUserBase, DbMessagePart, DbArtifactPart, DbArtifact
+from .models import DbChat, DbMessage, DbTask, DbUserBase, DbMessagePart, DbArtifactPart, DbArtifact, DbFileBlob, DbFileReference
 from .schemas import ChatCreate, MessageCreate
 from .database import get_user_engine, get_user_session
 from novas_app.core.ui_messages import UIMessage, UIMessagePart
@@ -271,3 +271,92 @@ class UserDbService:
         result = await self.session.execute(query)
         return list(result.scalars().all())
 
+
+class FileBlobDbService:
+    """Service for the reference-counted metadata of content-addressed uploads."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def fetch_blob(self, sha256: str) -> Optional[DbFileBlob]:
+        """Get a blob by its content hash."""
+        return await self.session.get(DbFileBlob, sha256)
+
+    async def add_reference(
+        self, sha256: str, size: int, file_extension: str, user_id: str, file_name: str
+    ) -> tuple[DbFileReference, bool]:
+        """Reference a blob, creating its metadata on first upload.
+
+        Returns the reference and whether the blob was new.
+        """
+        # Incremented in SQL, reading the count first would lose concurrent updates
+        now = datetime.now(timezone.utc)
+        result = await self.session.execute(
+            update(DbFileBlob)
+            .where(DbFileBlob.sha256 == sha256)
+            .values(ref_count=DbFileBlob.ref_count + 1, updated_at=now)
+        )
+        created = result.rowcount == 0
+        if created:
+            self.session.add(
+                DbFileBlob(
+                    sha256=sha256, size=size, file_extension=file_extension, ref_count=1, updated_at=now
+                )
+            )
+        reference = DbFileReference(
+            id=str(uuid.uuid4()),
+            sha256=sha256,
+            user_id=user_id,
+            file_name=file_name,
+        )
+        self.session.add(reference)
+        await self.session.commit()
+        return reference, created
+
+    async def remove_reference(self, sha256: str, user_id: str) -> bool:
+        """Drop one of a user's references to a blob."""
+        query = (
+            select(DbFileReference)
+            .where(DbFileReference.sha256 == sha256, DbFileReference.user_id == user_id)
+            .limit(1)
+        )
+        reference = (await self.session.execute(query)).scalar_one_or_none()
+        if reference is None:
+            return False
+        await self.session.execute(
+            update(DbFileBlob)
+            .where(DbFileBlob.sha256 == sha256, DbFileBlob.ref_count > 0)
+            .values(ref_count=DbFileBlob.ref_count - 1, updated_at=datetime.now(timezone.utc))
+        )
+        await self.session.delete(reference)
+        await self.session.commit()
+        return True
+
+    async def fetch_referenced_sha256s(self, user_id: str, sha256s: List[str]) -> set[str]:
+        """Subset of the given blobs the user holds a reference to."""
+        if not sha256s:
+            return set()
+        query = (
+            select(DbFileReference.sha256)
+            .where(DbFileReference.user_id == user_id, DbFileReference.sha256.in_(sha256s))
+            .distinct()
+        )
+        result = await self.session.execute(query)
+        return set(result.scalars().all())
+
+    async def fetch_unreferenced_blobs(self, unreferenced_before: datetime) -> List[DbFileBlob]:
+        """List blobs without references since before the given time."""
+        query = (
+            select(DbFileBlob)
+            .where(DbFileBlob.ref_count <= 0, DbFileBlob.updated_at < unreferenced_before)
+        )
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    async def delete_blob(self, sha256: str) -> bool:
+        """Delete the metadata of a blob if it is still unreferenced."""
+        result = await self.session.execute(
+            delete(DbFileBlob).where(DbFileBlob.sha256 == sha256, DbFileBlob.ref_count <= 0)
+        )
+        await self.session.commit()
+        return result.rowcount > 0
@@ -5,10 +5,7 @@ from novas_app.features.chat.service import ChatService
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from novas_app.db.database import get_app_session, get_user_session
-
-
-async def get_current_user() -> User:
-    return User(id="dev", email="dev@test.com", username="dev", full_name="Dev User")
+from novas_app.core.current_user import get_current_user
 
 
 async def get_app_db_session() -> AsyncGenerator[AsyncSession, None]:
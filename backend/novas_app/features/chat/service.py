@@ -217,12 +217,18 @@ class ChatService:
             )
             
             agent_client = client_factory.create(agent_card)
-            async for part in self._chat_stream_internal(chat_id, agent_client, messages, options):
+            file_ids = [file["file_id"] for file in (chat.files or []) if file.get("file_id")]
+            async for part in self._chat_stream_internal(chat_id, agent_client, messages, options, file_ids):
                 if part is not None:
                     yield part
 
     async def _chat_stream_internal(
-        self, chat_id: str, agent_client: Client, messages: List[UIMessage], options: Dict[str, Any] = {}
+        self,
+        chat_id: str,
+        agent_client: Client,
+        messages: List[UIMessage],
+        options: Dict[str, Any] = {},
+        file_ids: List[str] | None = None,
     ) -> AsyncIterator[UIMessageStreamPart]:
 
         request_id = str(uuid.uuid4())
@@ -230,6 +236,12 @@ class ChatService:
         final_user_message_a2a = await self.build_message_with_history(
             chat_id, final_user_message_ui
         )
+        if file_ids and isinstance(final_user_message_a2a, a2a_types.Message):
+            # Lets the agent search the chat's uploads
+            final_user_message_a2a.metadata = {
+                **(final_user_message_a2a.metadata or {}),
+                "file_ids": file_ids,
+            }
 
         task_id = None
         context_id = None
@@ -565,8 +577,15 @@ class ChatService:
 
     async def delete_chat(self, chat_id: str) -> None:
         """Delete chat by ID."""
+        from novas_app.features.files.storage import release_upload
+
         try:
+            chat = await self.db.fetch_chat(chat_id)
             await self.db.delete_chat(chat_id)
+            # Attached uploads are shared blobs, drop this chat's references
+            for file in (chat.files if chat and chat.files else []):
+                if file.get("file_id"):
+                    await release_upload(file["file_id"], self.user.id)
         except HTTPException:
             raise
         except Exception as e:
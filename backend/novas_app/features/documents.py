@@ -1,8 +1,32 @@
 """Document processing module."""
-from typing import List, Dict, Any, Optional
+import asyncio
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 
 import httpx
+from loguru import logger
+
+FETCH_CONCURRENCY = 8
+FETCH_TIMEOUT = 15.0
+MAX_DOCUMENT_BYTES = 5 * 1024 * 1024
+EXTRACTION_WORKERS = 2
+
+_BOILERPLATE_TAGS = [
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe",
+    "form", "button", "nav", "header", "footer", "aside"
+]
+_BOILERPLATE_PATTERN = re.compile(
+    r"(^|[\s_-])(nav|navbar|menu|footer|header|sidebar|breadcrumbs?|cookies?|banner|"
+    r"ads?|advert\w*|promo|share|social|related|comments?|subscribe|newsletter|popup|modal)($|[\s_-])",
+    re.IGNORECASE
+)
+
+_http_client: Optional[httpx.AsyncClient] = None
+_extraction_pool: Optional[ProcessPoolExecutor] = None
 
 @dataclass
 class Document:
@@ -10,35 +34,184 @@ class Document:
     page_content: str
     metadata: Dict[str, Any]
 
-async def get_documents_from_links(urls: List[str]) -> List[Document]:
-    """Get documents from URLs.
-    
+def _get_http_client() -> httpx.AsyncClient:
+    """Get the client shared by all link fetches."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=httpx.Timeout(FETCH_TIMEOUT, connect=5.0),
+            limits=httpx.Limits(max_connections=4 * FETCH_CONCURRENCY, max_keepalive_connections=FETCH_CONCURRENCY),
+            headers={"User-Agent": "Mozilla/5.0 (compatible; Perplexica/1.0)"}
+        )
+    return _http_client
+
+def _get_extraction_pool() -> ProcessPoolExecutor:
+    """Get the worker processes parsing HTML, which would otherwise hold the GIL."""
+    global _extraction_pool
+    if _extraction_pool is None:
+        _extraction_pool = ProcessPoolExecutor(
+            max_workers=EXTRACTION_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _extraction_pool
+
+async def close_document_fetching() -> None:
+    """Close the shared client and the extraction workers."""
+    global _http_client, _extraction_pool
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+    if _extraction_pool is not None:
+        _extraction_pool.shutdown(wait=False, cancel_futures=True)
+        _extraction_pool = None
+
+def extract_readable_text(
+    content: bytes,
+    content_type: str = "",
+    declared_encoding: Optional[str] = None
+) -> Tuple[str, str]:
+    """Decode a response body and strip the page boilerplate.
+
+    The encoding is taken from the header, a BOM or the `<meta>` charset, and
+    guessed from the bytes otherwise. Scripts, styles, navigation, headers,
+    footers and elements named like menus, ads or cookie banners are removed,
+    except around the `<article>`, `<main>` or `role="main"` content, whose
+    text is preferred when it has substance.
+
     Args:
-        urls: List of URLs
-        
+        content: Raw response body
+        content_type: Content-Type header value
+        declared_encoding: Charset from the Content-Type header
+
     Returns:
-        List of documents
+        Tuple of the page title (empty when unknown) and its readable text
+    """
+    from bs4 import BeautifulSoup
+    from bs4.dammit import UnicodeDammit
+
+    dammit = UnicodeDammit(
+        content,
+        known_definite_encodings=[declared_encoding] if declared_encoding else [],
+        is_html="html" in content_type or not content_type
+    )
+    text = dammit.unicode_markup or content.decode("utf-8", errors="replace")
+    if content_type and "html" not in content_type and "xml" not in content_type:
+        return "", text.strip()
+
+    soup = BeautifulSoup(text, "html.parser")
+    title = soup.title.get_text(strip=True) if soup.title else ""
+    content_roots = soup.find_all(
+        lambda tag: tag.name in ("article", "main") or tag.get("role") == "main"
+    )
+    # Wrappers like <form> or <div class="has-sidebar"> around the content stay
+    protected = {id(root) for root in content_roots}
+    protected.update(id(parent) for root in content_roots for parent in root.parents)
+    for element in soup(_BOILERPLATE_TAGS):
+        if id(element) not in protected:
+            element.decompose()
+    for element in soup.find_all(True):
+        if element.decomposed or id(element) in protected or element.name in ("html", "body"):
+            continue
+        names = " ".join(element.get("class") or []) + " " + (element.get("id") or "")
+        if _BOILERPLATE_PATTERN.search(names):
+            element.decompose()
+
+    root = soup.body or soup
+    for candidate in content_roots:
+        if candidate.decomposed:
+            continue
+        if len(candidate.get_text(strip=True)) >= 200:
+            root = candidate
+            break
+
+    lines = (re.sub(r"\s+", " ", line).strip() for line in root.get_text("\n").splitlines())
+    return title, "\n".join(line for line in lines if line)
+
+async def _fetch_document(url: str, client: httpx.AsyncClient) -> Document:
+    async with client.stream("GET", url) as response:
+        response.raise_for_status()
+        body = bytearray()
+        async for chunk in response.aiter_bytes():
+            body.extend(chunk)
+            if len(body) > MAX_DOCUMENT_BYTES:
+                raise ValueError(f"Document larger than {MAX_DOCUMENT_BYTES} bytes")
+        content_type = response.headers.get("content-type", "").lower()
+        declared_encoding = response.charset_encoding
+
+    args = (bytes(body), content_type, declared_encoding)
+    try:
+        title, text = await asyncio.get_running_loop().run_in_executor(
+            _get_extraction_pool(), extract_readable_text, *args
+        )
+    except BrokenProcessPool:
+        title, text = await asyncio.to_thread(extract_readable_text, *args)
+
+    return Document(
+        page_content=text,
+        metadata={
+            "title": title or url,
+            "url": url
+        }
+    )
+
+async def iter_documents_from_links(
+    urls: List[str],
+    max_concurrency: int = FETCH_CONCURRENCY,
+    timeout: float = FETCH_TIMEOUT
+) -> AsyncIterator[Document]:
+    """Fetch URLs concurrently and yield their documents as they complete.
+
+    Args:
+        urls: List of URLs
+        max_concurrency: Maximum number of URLs fetched at once
+        timeout: Seconds allowed per URL, including extraction
+
+    Yields:
+        Documents in completion order; failed URLs are logged and skipped
     """
-    docs = []
-    
-    async with httpx.AsyncClient() as client:
-        for url in urls:
+    urls = list(dict.fromkeys(url.strip() for url in urls if url and url.strip()))
+    if not urls:
+        return
+
+    client = _get_http_client()
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch(url: str) -> Optional[Document]:
+        async with semaphore:
             try:
-                response = await client.get(url)
-                response.raise_for_status()
-                
-                # TODO: Add proper HTML/text extraction
-                content = response.text
-                
-                docs.append(Document(
-                    page_content=content,
-                    metadata={
-                        "title": url,
-                        "url": url
-                    }
-                ))
+                return await asyncio.wait_for(_fetch_document(url, client), timeout)
             except Exception as e:
-                print(f"Error getting document from URL {url}: {e}")
-                continue
-    
-    return docs 
\ No newline at end of file
+                logger.warning(f"Error getting document from URL {url}: {e!r}")
+                return None
+
+    tasks = [asyncio.create_task(fetch(url)) for url in urls]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            doc = await next_done
+            if doc is not None:
+                yield doc
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def get_documents_from_links(
+    urls: List[str],
+    max_concurrency: int = FETCH_CONCURRENCY,
+    timeout: float = FETCH_TIMEOUT
+) -> List[Document]:
+    """Get documents from URLs.
+
+    Fetches concurrently, see `iter_documents_from_links`.
+
+    Args:
+        urls: List of URLs
+        max_concurrency: Maximum number of URLs fetched at once
+        timeout: Seconds allowed per URL
+
+    Returns:
+        List of documents, in completion order
+    """
+    return [
+        doc async for doc in iter_documents_from_links(urls, max_concurrency, timeout)
+    ]
@@ -4,11 +4,14 @@ File handling feature module for processing uploaded files
 
 from .router import router
 from .service import FileService
-from .schemas import FileResponse, FileUploadResponse
+from .schemas import FileResponse, FileSearchRequest, FileSearchResponse, FileUploadResponse, IngestionStatus
 
 __all__ = [
     "router",
     "FileService",
     "FileResponse",
-    "FileUploadResponse"
+    "FileUploadResponse",
+    "FileSearchRequest",
+    "FileSearchResponse",
+    "IngestionStatus"
 ] 
\ No newline at end of file
@@ -0,0 +1,283 @@
+"""BM25 lexical index of uploaded file chunks.
+
+Embedding similarity alone misses exact matches such as tickers, codes and
+names, so every upload also gets an inverted index, built at ingest time and
+stored as ``{file_id}-bm25.npz`` next to its embeddings:
+
+- ``terms``: vocabulary, sorted
+- ``offsets``: int64 start of the postings of each term
+- ``chunks`` / ``tfs``: chunk index and term frequency of each posting
+- ``lengths``: number of tokens of each chunk
+
+Latin words and numbers are lowercased and kept whole (``600519.SH`` also
+yields ``600519`` and ``sh``); runs of CJK characters yield unigrams and
+bigrams, which needs no dictionary. IDF and the average chunk length are
+computed at query time over the files being searched.
+"""
+import json
+import os
+import re
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+_TOKEN_PATTERN = re.compile(
+    f"[{_CJK}]+|[^\\W_{_CJK}]+(?:[.\\-][^\\W_{_CJK}]+)*"
+)
+_CJK_PATTERN = re.compile(f"[{_CJK}]")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into BM25 terms.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        Terms in order of appearance, with repetitions
+    """
+    terms = []
+    for match in _TOKEN_PATTERN.finditer(text.lower()):
+        token = match.group()
+        if _CJK_PATTERN.match(token):
+            terms.extend(token)
+            terms.extend(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            terms.append(token)
+            if "." in token or "-" in token:
+                terms.extend(part for part in re.split(r"[.\-]", token) if part)
+    return terms
+
+
+@dataclass
+class FileLexicalIndex:
+    """Inverted index of the chunks of one uploaded file."""
+    file_id: str
+    term_ids: Dict[str, int]
+    offsets: np.ndarray
+    chunks: np.ndarray
+    tfs: np.ndarray
+    lengths: np.ndarray
+
+    def __len__(self) -> int:
+        return self.lengths.shape[0]
+
+    @classmethod
+    def build(cls, file_id: str, contents: Sequence[str]) -> "FileLexicalIndex":
+        """Index chunk texts.
+
+        Args:
+            file_id: File ID
+            contents: Chunk texts
+
+        Returns:
+            FileLexicalIndex of the chunks
+        """
+        postings: Dict[str, List[tuple]] = {}
+        lengths = np.zeros(len(contents), dtype=np.float32)
+        for chunk_index, content in enumerate(contents):
+            terms = tokenize(content)
+            lengths[chunk_index] = len(terms)
+            for term, tf in Counter(terms).items():
+                postings.setdefault(term, []).append((chunk_index, tf))
+
+        terms = sorted(postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum([len(postings[term]) for term in terms], out=offsets[1:])
+        flat = [posting for term in terms for posting in postings[term]]
+        return cls(
+            file_id=file_id,
+            term_ids={term: i for i, term in enumerate(terms)},
+            offsets=offsets,
+            chunks=np.array([chunk for chunk, _ in flat], dtype=np.int32),
+            tfs=np.array([tf for _, tf in flat], dtype=np.float32),
+            lengths=lengths
+        )
+
+    def postings(self, term: str) -> tuple:
+        """Chunk indices and term frequencies of a term, empty arrays if absent."""
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            return self.chunks[:0], self.tfs[:0]
+        start, end = self.offsets[term_id], self.offsets[term_id + 1]
+        return self.chunks[start:end], self.tfs[start:end]
+
+
+def bm25_scores(
+    indexes: Sequence[FileLexicalIndex],
+    query: str,
+    k1: float = 1.2,
+    b: float = 0.75
+) -> np.ndarray:
+    """BM25 score of every chunk of the given files.
+
+    Args:
+        indexes: Lexical indexes of the searched files
+        query: Search query
+        k1: Term frequency saturation
+        b: Chunk length normalization
+
+    Returns:
+        Array of scores, the chunks of all files concatenated in order
+    """
+    sizes = [len(index) for index in indexes]
+    scores = np.zeros(sum(sizes), dtype=np.float32)
+    terms = set(tokenize(query))
+    if not terms or scores.size == 0:
+        return scores
+
+    num_chunks = scores.size
+    average_length = max(float(sum(index.lengths.sum() for index in indexes)) / num_chunks, 1.0)
+    starts = np.cumsum([0] + sizes)
+    for term in terms:
+        postings = [index.postings(term) for index in indexes]
+        document_frequency = sum(chunks.size for chunks, _ in postings)
+        if document_frequency == 0:
+            continue
+        idf = np.log(1.0 + (num_chunks - document_frequency + 0.5) / (document_frequency + 0.5))
+        for index, start, (chunks, tfs) in zip(indexes, starts, postings):
+            if chunks.size == 0:
+                continue
+            norm = k1 * (1.0 - b + b * index.lengths[chunks] / average_length)
+            scores[start + chunks] += idf * tfs * (k1 + 1.0) / (tfs + norm)
+    return scores
+
+
+def fuse_scores(
+    vector_scores: np.ndarray,
+    lexical_scores: np.ndarray,
+    lexical_weight: float
+) -> np.ndarray:
+    """Blend cosine similarities with BM25 scores.
+
+    BM25 scores are divided by their maximum, so the best lexical match of the
+    query contributes `lexical_weight` in full and cosine thresholds keep their
+    meaning when no chunk matches lexically.
+
+    Args:
+        vector_scores: Cosine similarities
+        lexical_scores: BM25 scores of the same chunks
+        lexical_weight: Weight of the lexical scores, between 0 and 1
+
+    Returns:
+        Fused scores
+    """
+    vector_scores = np.nan_to_num(vector_scores, nan=0.0)
+    best = float(lexical_scores.max()) if lexical_scores.size else 0.0
+    if best <= 0.0 or lexical_weight <= 0.0:
+        return vector_scores
+    return (1.0 - lexical_weight) * vector_scores + lexical_weight * (lexical_scores / best)
+
+
+class LexicalIndexStore:
+    """Writes and lazily loads the lexical indexes of uploaded files."""
+
+    def __init__(self, base_dir: str = "uploads", max_open_files: int = 64):
+        """Initialize lexical index store.
+
+        Args:
+            base_dir: Directory holding the uploads
+            max_open_files: Number of recently used indexes kept in memory
+        """
+        self.base_dir = base_dir
+        self.max_open_files = max_open_files
+        self._open_files: "OrderedDict[str, FileLexicalIndex]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _path(self, file_id: str) -> str:
+        return os.path.join(self.base_dir, f"{file_id}-bm25.npz")
+
+    def exists(self, file_id: str) -> bool:
+        return os.path.exists(self._path(file_id))
+
+    def write(self, file_id: str, contents: Sequence[str]) -> FileLexicalIndex:
+        """Build and store the index of a file's chunks (blocking).
+
+        Args:
+            file_id: File ID
+            contents: Chunk texts
+
+        Returns:
+            The built index
+        """
+        index = FileLexicalIndex.build(file_id, contents)
+        terms = sorted(index.term_ids, key=index.term_ids.get)
+        os.makedirs(self.base_dir, exist_ok=True)
+        temp_path = f"{self._path(file_id)}.{uuid.uuid4()}.tmp.npz"
+        np.savez(
+            temp_path,
+            terms=np.array(terms, dtype=str),
+            offsets=index.offsets,
+            chunks=index.chunks,
+            tfs=index.tfs,
+            lengths=index.lengths
+        )
+        os.replace(temp_path, self._path(file_id))
+        with self._lock:
+            self._open_files.pop(file_id, None)
+        return index
+
+    def _build_from_chunks_json(self, file_id: str) -> Optional[FileLexicalIndex]:
+        content_path = os.path.join(self.base_dir, f"{file_id}.json")
+        if not os.path.exists(content_path):
+            return None
+        with open(content_path, encoding="utf-8") as f:
+            contents = json.load(f)["contents"]
+        logger.info(f"Building missing lexical index of {file_id}")
+        return self.write(file_id, contents)
+
+    def load(self, file_id: str) -> Optional[FileLexicalIndex]:
+        """Load the index of a file, from the LRU when it is hot.
+
+        Files ingested before lexical indexing are indexed from their chunks on first use.
+
+        Args:
+            file_id: File ID
+
+        Returns:
+            FileLexicalIndex, or None when the file has no extracted chunks
+        """
+        with self._lock:
+            loaded = self._open_files.get(file_id)
+            if loaded is not None:
+                self._open_files.move_to_end(file_id)
+                return loaded
+
+            if self.exists(file_id):
+                with np.load(self._path(file_id)) as data:
+                    loaded = FileLexicalIndex(
+                        file_id=file_id,
+                        term_ids={term: i for i, term in enumerate(data["terms"].tolist())},
+                        offsets=data["offsets"],
+                        chunks=data["chunks"],
+                        tfs=data["tfs"],
+                        lengths=data["lengths"]
+                    )
+            else:
+                loaded = self._build_from_chunks_json(file_id)
+                if loaded is None:
+                    return None
+            self._open_files[file_id] = loaded
+            while len(self._open_files) > self.max_open_files:
+                self._open_files.popitem(last=False)
+            return loaded
+
+    def delete(self, file_id: str) -> None:
+        """Remove the stored index of a file."""
+        with self._lock:
+            self._open_files.pop(file_id, None)
+        if self.exists(file_id):
+            os.remove(self._path(file_id))
+
+
+@lru_cache()
+def get_lexical_store() -> LexicalIndexStore:
+    """Get the process wide lexical index store."""
+    return LexicalIndexStore()
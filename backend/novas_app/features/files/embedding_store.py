@@ -0,0 +1,292 @@
+"""Binary embedding store for uploaded files.
+
+Each upload is stored as
+
+- ``{file_id}-embeddings.npy``: float32 matrix of L2-normalized chunk embeddings
+- ``{file_id}-chunks.bin``: UTF-8 chunk texts, concatenated
+- ``{file_id}-chunks.npy``: int64 byte offsets of the chunks in the blob
+- ``{file_id}-meta.json``: title and shape
+
+Files are opened lazily with mmap and the most recently used ones are kept
+open, so a query only reads the pages it touches instead of parsing JSON.
+"""
+import json
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import BinaryIO, Callable, List, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+
+
+@dataclass
+class FileEmbeddings:
+    """Memory-mapped embeddings and chunk texts of one uploaded file."""
+    file_id: str
+    title: str
+    embeddings: np.ndarray
+    offsets: np.ndarray
+    texts: mmap.mmap
+
+    def __len__(self) -> int:
+        return self.embeddings.shape[0]
+
+    def chunk(self, index: int) -> str:
+        """Get the text of a chunk.
+
+        Args:
+            index: Chunk index
+
+        Returns:
+            Chunk text
+        """
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        return self.texts[start:end].decode("utf-8")
+
+    def similarities(self, query_embedding: Sequence[float]) -> np.ndarray:
+        """Cosine similarity of every chunk with the query.
+
+        Args:
+            query_embedding: Query vector
+
+        Returns:
+            Array of similarities, one per chunk
+        """
+        query_vector = np.asarray(query_embedding, dtype=np.float32)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (self.embeddings @ query_vector) / np.linalg.norm(query_vector)
+
+
+class EmbeddingStore:
+    """Writes and lazily loads binary embeddings of uploaded files."""
+
+    def __init__(self, base_dir: str = "uploads", max_open_files: int = 32):
+        """Initialize embedding store.
+
+        Args:
+            base_dir: Directory holding the uploads
+            max_open_files: Number of recently used files kept mapped
+        """
+        self.base_dir = base_dir
+        self.max_open_files = max_open_files
+        self._open_files: "OrderedDict[str, FileEmbeddings]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _path(self, file_id: str, suffix: str) -> str:
+        return os.path.join(self.base_dir, f"{file_id}{suffix}")
+
+    @staticmethod
+    def _write_temp(path: str, write: Callable[[BinaryIO], object]) -> str:
+        """Write the content of a file to a temp file next to it.
+
+        Returns:
+            Path of the temp file, to be moved into place with ``os.replace``
+        """
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                write(f)
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return tmp_path
+
+    def exists(self, file_id: str) -> bool:
+        return os.path.exists(self._path(file_id, "-meta.json"))
+
+    def write(
+        self,
+        file_id: str,
+        title: str,
+        contents: List[str],
+        embeddings: Sequence[Sequence[float]]
+    ) -> None:
+        """Store the chunks and embeddings of a file.
+
+        Args:
+            file_id: File ID
+            title: File title
+            contents: Chunk texts
+            embeddings: One embedding per chunk
+        """
+        if len(contents) != len(embeddings):
+            raise ValueError(
+                f"{len(contents)} chunks but {len(embeddings)} embeddings for {file_id}"
+            )
+        matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2:
+            matrix = matrix.reshape(len(contents), -1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+
+        encoded = [content.encode("utf-8") for content in contents]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+
+        os.makedirs(self.base_dir, exist_ok=True)
+        meta = {
+            "title": title,
+            "count": matrix.shape[0],
+            "dim": matrix.shape[1] if matrix.size else 0
+        }
+        writers = [
+            ("-embeddings.npy", lambda f: np.save(f, matrix)),
+            ("-chunks.npy", lambda f: np.save(f, offsets)),
+            ("-chunks.bin", lambda f: f.write(b"".join(encoded))),
+            # Moved into place last, so a file is only visible once complete
+            ("-meta.json", lambda f: f.write(json.dumps(meta, ensure_ascii=False).encode("utf-8"))),
+        ]
+        tmp_paths = []
+        try:
+            for suffix, write in writers:
+                tmp_paths.append((self._write_temp(self._path(file_id, suffix), write), suffix))
+        except BaseException:
+            for tmp_path, _ in tmp_paths:
+                os.remove(tmp_path)
+            raise
+
+        # Readers already holding the previous mappings keep them and load() takes
+        # the same lock. The old meta goes first, so a crash between the renames
+        # leaves the file missing rather than mixing old and new parts.
+        with self._lock:
+            meta_path = self._path(file_id, "-meta.json")
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
+            for tmp_path, suffix in tmp_paths:
+                os.replace(tmp_path, self._path(file_id, suffix))
+            self.evict(file_id)
+
+    def _migrate_legacy_json(self, file_id: str) -> bool:
+        content_path = self._path(file_id, ".json")
+        embeddings_path = self._path(file_id, "-embeddings.json")
+        if not (os.path.exists(content_path) and os.path.exists(embeddings_path)):
+            return False
+        with open(content_path) as f:
+            content = json.load(f)
+        with open(embeddings_path) as f:
+            emb = json.load(f)
+        count = min(len(content["contents"]), len(emb["embeddings"]))
+        self.write(
+            file_id,
+            content["title"],
+            content["contents"][:count],
+            emb["embeddings"][:count]
+        )
+        logger.info(f"Migrated JSON embeddings of {file_id} to the binary store")
+        return True
+
+    def _open(self, file_id: str) -> FileEmbeddings:
+        with open(self._path(file_id, "-meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        embeddings = np.load(self._path(file_id, "-embeddings.npy"), mmap_mode="r")
+        offsets = np.load(self._path(file_id, "-chunks.npy"))
+        with open(self._path(file_id, "-chunks.bin"), "rb") as f:
+            if os.fstat(f.fileno()).st_size > 0:
+                texts = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                texts = mmap.mmap(-1, 1)
+        return FileEmbeddings(
+            file_id=file_id,
+            title=meta["title"],
+            embeddings=embeddings,
+            offsets=offsets,
+            texts=texts
+        )
+
+    def load(self, file_id: str) -> Optional[FileEmbeddings]:
+        """Load a file, from the LRU when it is hot.
+
+        Files only available in the legacy JSON format are converted on first use.
+
+        Args:
+            file_id: File ID
+
+        Returns:
+            FileEmbeddings, or None when the file has no embeddings
+        """
+        with self._lock:
+            loaded = self._open_files.get(file_id)
+            if loaded is not None:
+                self._open_files.move_to_end(file_id)
+                return loaded
+
+            if not self.exists(file_id) and not self._migrate_legacy_json(file_id):
+                return None
+            loaded = self._open(file_id)
+            self._open_files[file_id] = loaded
+            while len(self._open_files) > self.max_open_files:
+                self._open_files.popitem(last=False)
+            return loaded
+
+    def evict(self, file_id: str) -> None:
+        """Drop a file from the LRU, e.g. after it was rewritten or deleted.
+
+        The mappings are released once no caller references them anymore.
+        """
+        self._open_files.pop(file_id, None)
+
+    def delete(self, file_id: str) -> None:
+        """Remove the stored embeddings of a file."""
+        with self._lock:
+            self.evict(file_id)
+        for suffix in ("-meta.json", "-embeddings.npy", "-chunks.npy", "-chunks.bin"):
+            path = self._path(file_id, suffix)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+@lru_cache()
+def get_embedding_store() -> EmbeddingStore:
+    """Get the process wide embedding store."""
+    return EmbeddingStore()
+
+
+if __name__ == "__main__":
+    # Query latency with 10 files of 5k chunks each: legacy JSON vs binary store.
+    import tempfile
+    import time
+
+    from novas_app.core.utils.compute_similarity import compute_similarity, top_k_indices
+
+    num_files, num_chunks, dim = 10, 5000, 1024
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as base_dir:
+        store = EmbeddingStore(base_dir)
+        file_ids = [f"file-{i}" for i in range(num_files)]
+        for file_id in file_ids:
+            vectors = rng.normal(size=(num_chunks, dim)).astype(np.float32)
+            contents = [f"{file_id} chunk {j} " * 20 for j in range(num_chunks)]
+            with open(os.path.join(base_dir, f"{file_id}.json"), "w") as f:
+                json.dump({"title": file_id, "contents": contents}, f)
+            with open(os.path.join(base_dir, f"{file_id}-embeddings.json"), "w") as f:
+                json.dump({"embeddings": vectors.tolist()}, f)
+        query = rng.normal(size=dim).tolist()
+
+        start = time.perf_counter()
+        scores = []
+        for file_id in file_ids:
+            with open(os.path.join(base_dir, f"{file_id}.json")) as f:
+                content = json.load(f)
+            with open(os.path.join(base_dir, f"{file_id}-embeddings.json")) as f:
+                emb = json.load(f)
+            scores.extend(compute_similarity(query, e) for e in emb["embeddings"])
+        sorted(scores, reverse=True)[:15]
+        print(f"legacy json + pairwise: {time.perf_counter() - start:.3f}s")
+
+        for file_id in file_ids:
+            store.load(file_id)
+        store = EmbeddingStore(base_dir)
+
+        for label in ("binary store (first load)", "binary store (hot LRU)"):
+            start = time.perf_counter()
+            loaded = [store.load(file_id) for file_id in file_ids]
+            similarities = np.concatenate([f.similarities(query) for f in loaded])
+            top = top_k_indices(similarities, 15, 0.0)
+            print(f"{label}: {time.perf_counter() - start:.4f}s")
@@ -0,0 +1,256 @@
+"""Streaming upload writes and background ingestion of uploaded files."""
+import asyncio
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import anyio
+from fastapi import HTTPException, UploadFile
+from loguru import logger
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from novas_app.core.embeddings import get_embedding_service
+from .bm25_index import get_lexical_store
+from .embedding_store import get_embedding_store
+from .schemas import IngestionStatus
+
+INGESTIBLE_EXTENSIONS = ("pdf", "docx", "txt")
+# Finished ingestions are forgotten after this long, and at most this many statuses are kept
+INGESTION_STATUS_TTL = timedelta(hours=1)
+MAX_INGESTION_STATUSES = 10000
+# Room for the multipart boundaries and part headers around the uploaded bytes
+MULTIPART_OVERHEAD = 1024 * 1024
+
+_ingestion_statuses: Dict[str, IngestionStatus] = {}
+
+
+class UploadSizeLimitMiddleware:
+    """Reject upload requests whose body exceeds a size limit.
+
+    Form parsing spools the whole body to disk before an endpoint runs, so the
+    limit checked while streaming an upload comes too late to protect the disk.
+    This middleware checks Content-Length up front and counts the bytes of
+    bodies sent without one, failing the request with 413 as soon as the
+    limit is crossed.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int, path_suffix: str = "/uploads"):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.path_suffix = path_suffix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not scope["path"].rstrip("/").endswith(self.path_suffix)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Upload request exceeds the {self.max_body_size} bytes limit"
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > self.max_body_size:
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    # Re-raised by the request handler as it parses the form
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def stream_upload_to_disk(
+    file: UploadFile,
+    file_path: str,
+    max_bytes: int,
+    chunk_size: int = 1024 * 1024
+) -> Tuple[int, str]:
+    """Write an upload to disk in fixed-size chunks while hashing it.
+
+    Args:
+        file: Uploaded file
+        file_path: Destination path
+        max_bytes: Maximum accepted size of the file
+        chunk_size: Bytes read and written per step
+
+    Returns:
+        Tuple of the file size in bytes and its sha256 hex digest
+
+    Raises:
+        HTTPException: 413 if the file is larger than `max_bytes`
+    """
+    sha256 = hashlib.sha256()
+    size = 0
+    try:
+        async with await anyio.open_file(file_path, "wb") as f:
+            while chunk := await file.read(chunk_size):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Upload {file.filename} exceeds the {max_bytes} bytes limit"
+                    )
+                sha256.update(chunk)
+                await f.write(chunk)
+    except BaseException:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
+    return size, sha256.hexdigest()
+
+
+def get_ingestion_status(file_id: str) -> Optional[IngestionStatus]:
+    """Get the ingestion status of an uploaded file.
+
+    Args:
+        file_id: File ID
+
+    Returns:
+        IngestionStatus, or None if the file was never scheduled
+    """
+    return _ingestion_statuses.get(file_id)
+
+
+def _prune_statuses() -> None:
+    """Forget finished ingestions older than INGESTION_STATUS_TTL, and the oldest
+    finished ones beyond MAX_INGESTION_STATUSES.
+
+    A forgotten file that is uploaded again is scheduled again, and its
+    ingestion reuses the chunks and embeddings already stored.
+    """
+    expired_before = datetime.now() - INGESTION_STATUS_TTL
+    finished = sorted(
+        (status for status in _ingestion_statuses.values() if status.status in ("completed", "failed")),
+        key=lambda status: status.updatedAt
+    )
+    # Room for the status about to be registered
+    overflow = len(_ingestion_statuses) + 1 - MAX_INGESTION_STATUSES
+    for status in finished:
+        if status.updatedAt >= expired_before and overflow <= 0:
+            break
+        del _ingestion_statuses[status.fileId]
+        overflow -= 1
+
+
+def register_ingestion(file_id: str, file_name: str) -> Optional[IngestionStatus]:
+    """Record a file as waiting for ingestion.
+
+    Returns None when the file is already queued, being parsed or ingested,
+    in which case no new ingestion should be scheduled.
+    """
+    _prune_statuses()
+    status = _ingestion_statuses.get(file_id)
+    if status is not None and status.status != "failed":
+        return None
+    status = IngestionStatus(fileId=file_id, fileName=file_name, status="pending")
+    _ingestion_statuses[file_id] = status
+    return status
+
+
+def forget_ingestion(file_id: str) -> None:
+    """Drop the ingestion status of a file whose artifacts were deleted."""
+    _ingestion_statuses.pop(file_id, None)
+
+
+def _update_status(file_id: str, **changes) -> None:
+    status = _ingestion_statuses.get(file_id)
+    if status is not None:
+        _ingestion_statuses[file_id] = status.model_copy(
+            update={**changes, "updatedAt": datetime.now()}
+        )
+
+
+def _extract_texts(file_path: str, file_extension: str, file_id: str) -> List[str]:
+    """Extract the text of a file page by page (blocking)."""
+    if file_extension == "pdf":
+        from pypdf import PdfReader
+
+        reader = PdfReader(file_path)
+        texts = []
+        num_pages = len(reader.pages)
+        for i, page in enumerate(reader.pages):
+            texts.append(page.extract_text() or "")
+            _update_status(file_id, progress=0.8 * (i + 1) / max(num_pages, 1))
+        return texts
+    if file_extension == "docx":
+        from docx import Document as DocxDocument
+
+        document = DocxDocument(file_path)
+        return ["\n".join(paragraph.text for paragraph in document.paragraphs)]
+    with open(file_path, encoding="utf-8", errors="replace") as f:
+        return [f.read()]
+
+
+def _split_texts(texts: List[str]) -> List[str]:
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=100)
+    return [chunk for text in texts for chunk in splitter.split_text(text) if chunk.strip()]
+
+
+async def ingest_file(
+    file_id: str,
+    file_path: str,
+    file_name: str,
+    file_extension: str
+) -> None:
+    """Parse an uploaded file into text chunks, written to `{file_id}.json` next to it,
+    index them for BM25 and embed them into the embedding store when an
+    embedding provider is set.
+
+    Parsing runs in a worker thread. File ids are content hashes, so chunks and
+    embeddings already produced for an identical upload are reused as they are.
+
+    Args:
+        file_id: File ID
+        file_path: Path of the stored upload
+        file_name: Original file name, used as title
+        file_extension: pdf, docx or txt
+    """
+    output_path = os.path.join(os.path.dirname(file_path), f"{file_id}.json")
+    _update_status(file_id, status="parsing", progress=0.0)
+    try:
+        if os.path.exists(output_path):
+            async with await anyio.open_file(output_path, encoding="utf-8") as f:
+                contents = json.loads(await f.read())["contents"]
+            logger.info(f"Reusing extracted chunks of {file_id}")
+        else:
+            texts = await asyncio.to_thread(_extract_texts, file_path, file_extension, file_id)
+            _update_status(file_id, progress=0.8)
+            contents = await asyncio.to_thread(_split_texts, texts)
+
+            temp_path = f"{output_path}.{uuid.uuid4()}.tmp"
+            async with await anyio.open_file(temp_path, "w", encoding="utf-8") as f:
+                await f.write(json.dumps({"title": file_name, "contents": contents}, ensure_ascii=False))
+            os.replace(temp_path, output_path)
+
+        lexical_store = get_lexical_store()
+        if not lexical_store.exists(file_id):
+            await asyncio.to_thread(lexical_store.write, file_id, contents)
+
+        embedding_store = get_embedding_store()
+        embedding_service = get_embedding_service()
+        if embedding_service is not None and contents and not embedding_store.exists(file_id):
+            _update_status(file_id, status="embedding", progress=0.9)
+            vectors = await embedding_service.embed_documents(contents)
+            await asyncio.to_thread(embedding_store.write, file_id, file_name, contents, vectors)
+
+        _update_status(file_id, status="completed", progress=1.0, chunks=len(contents))
+        logger.info(f"Ingested {file_name} ({file_id}) into {len(contents)} chunks")
+    except Exception as e:
+        logger.error(f"Error ingesting {file_name} ({file_id}): {e}")
+        _update_status(file_id, status="failed", error=str(e))
@@ -0,0 +1,111 @@
+"""Offline relevance benchmark of hybrid retrieval over uploaded files.
+
+Scores the labelled queries of ``relevance_benchmark.json`` against its chunks
+with every lexical weight from 0 (embeddings only) to 1 (BM25 only) and
+reports MRR@10, Recall@5 and nDCG@10, to tune `HYBRID_LEXICAL_WEIGHT`.
+
+Vectors are read from the embedding cache (`EMBEDDING_CACHE_PATH`,
+`EMBEDDING_MODEL`), so no service is called. Run once with ``--embed`` to fill
+the cache through the configured embedding provider; until then a hashed
+character n-gram embedding stands in, which only exercises the pipeline.
+
+    python -m novas_app.features.files.relevance_benchmark [--embed] [dataset.json]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+from typing import Dict, List
+
+import numpy as np
+
+from novas_app.core.config import get_settings
+from novas_app.core.embeddings import EmbeddingCache, EmbeddingService, get_embedding_service
+from .bm25_index import FileLexicalIndex, bm25_scores, fuse_scores, tokenize
+
+DEFAULT_DATASET = os.path.join(os.path.dirname(__file__), "relevance_benchmark.json")
+
+
+def _hashed_embedding(text: str, dim: int = 512) -> List[float]:
+    vector = np.zeros(dim, dtype=np.float32)
+    for term in tokenize(text):
+        for gram in {term[i:i + 3] for i in range(max(len(term) - 2, 1))}:
+            vector[int(hashlib.md5(gram.encode("utf-8")).hexdigest(), 16) % dim] += 1.0
+    return vector.tolist()
+
+
+def _load_vectors(texts: List[str], embed: bool) -> Dict[str, List[float]]:
+    settings = get_settings()
+    service = get_embedding_service() if embed else None
+    if service is not None:
+        asyncio.run(service.embed_documents(texts))
+    if settings.EMBEDDING_CACHE_PATH and os.path.exists(settings.EMBEDDING_CACHE_PATH):
+        cache = EmbeddingCache(settings.EMBEDDING_CACHE_PATH)
+        hashes = [EmbeddingService.text_hash(text) for text in texts]
+        cached = cache.get_many(settings.EMBEDDING_MODEL, hashes)
+        if len(cached) == len(set(hashes)):
+            print(f"vectors: {settings.EMBEDDING_MODEL} (embedding cache)")
+            return {text: cached[text_hash] for text, text_hash in zip(texts, hashes)}
+    print("vectors: hashed n-grams (run with --embed to use the embedding model)")
+    return {text: _hashed_embedding(text) for text in texts}
+
+
+def evaluate(dataset: dict, vectors: Dict[str, List[float]], lexical_weight: float) -> Dict[str, float]:
+    """Retrieval metrics of one lexical weight, averaged over the queries.
+
+    Args:
+        dataset: Files with chunks and labelled queries
+        vectors: Embedding of every chunk and query text
+        lexical_weight: Weight of BM25 in the fused score
+
+    Returns:
+        MRR@10, Recall@5 and nDCG@10
+    """
+    chunk_ids = [chunk["id"] for f in dataset["files"] for chunk in f["chunks"]]
+    lexical_indexes = [
+        FileLexicalIndex.build(f["file_id"], [chunk["text"] for chunk in f["chunks"]])
+        for f in dataset["files"]
+    ]
+    matrix = np.array(
+        [vectors[chunk["text"]] for f in dataset["files"] for chunk in f["chunks"]],
+        dtype=np.float32
+    )
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+
+    totals = {"mrr@10": 0.0, "recall@5": 0.0, "ndcg@10": 0.0}
+    for labelled in dataset["queries"]:
+        query_vector = np.asarray(vectors[labelled["query"]], dtype=np.float32)
+        similarities = matrix @ (query_vector / np.linalg.norm(query_vector))
+        scores = fuse_scores(similarities, bm25_scores(lexical_indexes, labelled["query"]), lexical_weight)
+        ranking = [chunk_ids[i] for i in np.argsort(-scores, kind="stable")[:10]]
+
+        relevant = set(labelled["relevant"])
+        hits = [i for i, chunk_id in enumerate(ranking) if chunk_id in relevant]
+        totals["mrr@10"] += 1.0 / (hits[0] + 1) if hits else 0.0
+        totals["recall@5"] += len([i for i in hits if i < 5]) / len(relevant)
+        ideal = sum(1.0 / np.log2(i + 2) for i in range(min(len(relevant), 10)))
+        totals["ndcg@10"] += sum(1.0 / np.log2(i + 2) for i in hits) / ideal
+    return {name: total / len(dataset["queries"]) for name, total in totals.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("dataset", nargs="?", default=DEFAULT_DATASET)
+    parser.add_argument("--embed", action="store_true", help="fill the embedding cache first")
+    args = parser.parse_args()
+
+    with open(args.dataset, encoding="utf-8") as f:
+        dataset = json.load(f)
+    texts = [chunk["text"] for f in dataset["files"] for chunk in f["chunks"]]
+    texts += [labelled["query"] for labelled in dataset["queries"]]
+    vectors = _load_vectors(texts, args.embed)
+
+    print(f"{'weight':>6} {'mrr@10':>7} {'recall@5':>8} {'ndcg@10':>7}")
+    results = {}
+    for weight in np.round(np.linspace(0.0, 1.0, 11), 1):
+        results[weight] = evaluate(dataset, vectors, float(weight))
+        metrics = results[weight]
+        print(f"{weight:>6.1f} {metrics['mrr@10']:>7.3f} {metrics['recall@5']:>8.3f} {metrics['ndcg@10']:>7.3f}")
+    best = max(results, key=lambda weight: results[weight]["ndcg@10"])
+    print(f"best lexical weight by nDCG@10: {best:.1f} (HYBRID_LEXICAL_WEIGHT={get_settings().HYBRID_LEXICAL_WEIGHT})")
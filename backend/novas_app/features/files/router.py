@@ -1,16 +1,59 @@
 from typing import List
-from fastapi import APIRouter, Depends, File, UploadFile
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile
+from novas_app.db.schemas import User
+from novas_app.core.current_user import get_current_user
 from .service import FileService
-from .schemas import FileUploadResponse
+from .schemas import FileSearchRequest, FileSearchResponse, FileUploadResponse, IngestionStatus
 
 router = APIRouter(prefix="/uploads", tags=["files"])
 
 @router.post("", response_model=FileUploadResponse)
 async def upload_files(
+    background_tasks: BackgroundTasks,
     files: List[UploadFile] = File(...),
-    file_service: FileService = Depends(FileService)
+    file_service: FileService = Depends(FileService),
+    user: User = Depends(get_current_user)
 ) -> FileUploadResponse:
     """Upload and process files."""
     return await file_service.process_files(
         files,
-    ) 
\ No newline at end of file
+        background_tasks,
+        user,
+    )
+
+@router.post("/search", response_model=FileSearchResponse)
+async def search_files(
+    request: FileSearchRequest,
+    file_service: FileService = Depends(FileService),
+    user: User = Depends(get_current_user)
+) -> FileSearchResponse:
+    """Search the chunks of uploaded files."""
+    return await file_service.search_files(
+        request.query,
+        user,
+        request.fileIds,
+        request.topK,
+    )
+
+@router.get("/{file_id}/status", response_model=IngestionStatus)
+async def get_file_ingestion_status(
+    file_id: str,
+    file_service: FileService = Depends(FileService),
+    user: User = Depends(get_current_user)
+) -> IngestionStatus:
+    """Get the ingestion progress of an uploaded file."""
+    status = await file_service.get_ingestion_status(file_id, user)
+    if status is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    return status
+
+@router.delete("/{file_id}")
+async def release_file(
+    file_id: str,
+    file_service: FileService = Depends(FileService),
+    user: User = Depends(get_current_user)
+) -> dict:
+    """Release an uploaded file; unreferenced files are garbage collected."""
+    if not await file_service.release_file(file_id, user):
+        raise HTTPException(status_code=404, detail="File not found")
+    return {"message": "File released"}
@@ -1,10 +1,37 @@
-from typing import List
+from typing import List, Literal, Optional
+from datetime import datetime
 from pydantic import BaseModel, Field
 
 class FileResponse(BaseModel):
     fileName: str = Field(..., description="Original file name")
     fileExtension: str = Field(..., description="File extension")
     fileId: str = Field(..., description="Unique file identifier")
+    fileSize: Optional[int] = Field(default=None, description="File size in bytes")
+    fileHash: Optional[str] = Field(default=None, description="SHA-256 of the file content")
 
 class FileUploadResponse(BaseModel):
-    files: List[FileResponse] = Field(..., description="List of processed files") 
\ No newline at end of file
+    files: List[FileResponse] = Field(..., description="List of processed files")
+
+class IngestionStatus(BaseModel):
+    fileId: str = Field(..., description="Unique file identifier")
+    fileName: str = Field(..., description="Original file name")
+    status: Literal["pending", "parsing", "embedding", "completed", "failed"] = Field(..., description="Ingestion state")
+    progress: float = Field(default=0.0, description="Ingestion progress between 0 and 1")
+    chunks: Optional[int] = Field(default=None, description="Number of extracted text chunks")
+    error: Optional[str] = Field(default=None, description="Error message if ingestion failed")
+    updatedAt: datetime = Field(default_factory=datetime.now, description="Last status change")
+
+class FileSearchRequest(BaseModel):
+    query: str = Field(..., description="Search query")
+    fileIds: Optional[List[str]] = Field(default=None, description="Files to search, all of the user's files when omitted")
+    topK: int = Field(default=10, ge=1, le=100, description="Number of chunks to return")
+
+class FileSearchResult(BaseModel):
+    fileId: str = Field(..., description="Unique file identifier")
+    title: str = Field(..., description="File title")
+    chunkIndex: int = Field(..., description="Index of the chunk in the file")
+    content: str = Field(..., description="Chunk text")
+    score: float = Field(..., description="Cosine similarity with the query")
+
+class FileSearchResponse(BaseModel):
+    results: List[FileSearchResult] = Field(..., description="Most similar chunks, best first")
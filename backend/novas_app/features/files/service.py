@@ -1,9 +1,18 @@
+import asyncio
 import os
-import uuid
-from typing import List
-from fastapi import HTTPException, UploadFile
+from typing import List, Optional, Tuple
+import numpy as np
+from fastapi import BackgroundTasks, HTTPException, UploadFile
 from novas_app.core.config import get_settings
-from .schemas import FileUploadResponse, FileResponse
+from novas_app.core.embeddings import get_embedding_service
+from novas_app.db.schemas import User
+from novas_app.core.utils.compute_similarity import top_k_indices
+from .ann_index import AnnIndex, get_user_ann_index, index_user_files
+from .bm25_index import bm25_scores, fuse_scores, get_lexical_store
+from .embedding_store import get_embedding_store
+from .ingestion import INGESTIBLE_EXTENSIONS, get_ingestion_status, ingest_file, register_ingestion
+from .schemas import FileUploadResponse, FileResponse, FileSearchResponse, FileSearchResult, IngestionStatus
+from .storage import fetch_user_file_ids, release_upload, store_upload
 
 class FileService:
     """Service for handling file uploads and processing."""
@@ -19,12 +28,21 @@ class FileService:
     async def process_files(
         self,
         files: List[UploadFile],
+        background_tasks: BackgroundTasks,
+        user: User,
     ) -> FileUploadResponse:
         """
         Process uploaded files.
+
+        Files are streamed into the content-addressed store, their SHA-256 is
+        the file id, and new content is parsed into text chunks by a background
+        ingestion job whose progress is reported by `/uploads/{file_id}/status`.
+        Once embedded, the chunks are added to the user's ANN index.
         
         Args:
             files: List of uploaded files
+            background_tasks: Background tasks running the ingestion
+            user: User owning the uploads
             
         Returns:
             FileUploadResponse containing processed file information
@@ -33,45 +51,224 @@ class FileService:
             HTTPException: If file processing fails
         """
         processed_files = []
+        remaining_bytes = self.settings.MAX_UPLOAD_REQUEST_SIZE
 
         for file in files:
             file_extension = file.filename.split(".")[-1].lower()
             
-            if file_extension not in ["pdf", "docx", "txt"]:
+            if file_extension not in INGESTIBLE_EXTENSIONS:
                 raise HTTPException(
                     status_code=400,
                     detail="File type not supported"
                 )
 
-            # Generate unique file ID and save file
-            file_id = str(uuid.uuid4())
-            file_path = os.path.join(
-                self.upload_dir,
-                f"{file_id}.{file_extension}"
-            )
-            
             try:
-                # Save uploaded file
-                content = await file.read()
-                with open(file_path, "wb") as f:
-                    f.write(content)
+                # Save uploaded file, the content hash is the file ID
+                stored = await store_upload(
+                    file,
+                    user.id,
+                    self.upload_dir,
+                    file_extension,
+                    max_bytes=min(self.settings.MAX_UPLOAD_FILE_SIZE, remaining_bytes),
+                    chunk_size=self.settings.UPLOAD_CHUNK_SIZE
+                )
+                remaining_bytes -= stored.size
+
+                if register_ingestion(stored.sha256, file.filename) is not None:
+                    background_tasks.add_task(
+                        ingest_file,
+                        stored.sha256,
+                        stored.file_path,
+                        file.filename,
+                        file_extension
+                    )
+                # Runs after the ingestion; files still being embedded elsewhere
+                # are indexed on first search instead
+                background_tasks.add_task(index_user_files, user.id, [stored.sha256])
 
                 processed_files.append(
                     FileResponse(
                         fileName=file.filename,
                         fileExtension=file_extension,
-                        fileId=file_id
+                        fileId=stored.sha256,
+                        fileSize=stored.size,
+                        fileHash=stored.sha256
                     )
                 )
 
+            except HTTPException:
+                raise
             except Exception as e:
-                # Clean up files in case of error
-                for path in [file_path]:
-                    if os.path.exists(path):
-                        os.remove(path)
                 raise HTTPException(
                     status_code=500,
                     detail=f"Error processing file: {str(e)}"
                 )
 
-        return FileUploadResponse(files=processed_files) 
\ No newline at end of file
+        return FileUploadResponse(files=processed_files)
+
+    async def release_file(self, file_id: str, user: User) -> bool:
+        """
+        Release one of the user's references to an uploaded file.
+
+        Args:
+            file_id: File ID
+            user: User owning the reference
+
+        Returns:
+            True if a reference was released
+        """
+        return await release_upload(file_id, user.id)
+
+    async def get_ingestion_status(self, file_id: str, user: User) -> Optional[IngestionStatus]:
+        """
+        Get the ingestion progress of one of the user's files.
+
+        Args:
+            file_id: File ID
+            user: User expected to reference the file
+
+        Returns:
+            IngestionStatus, or None if the user has no such file or it was never scheduled
+        """
+        if file_id not in await fetch_user_file_ids(user.id, [file_id]):
+            return None
+        return get_ingestion_status(file_id)
+
+    async def search_files(
+        self,
+        query: str,
+        user: User,
+        file_ids: Optional[List[str]] = None,
+        top_k: int = 10
+    ) -> FileSearchResponse:
+        """
+        Search the chunks of the user's uploaded files.
+
+        Candidates from the ANN index and from BM25 are merged and ranked by
+        their fused score, so exact matches of codes and names are kept.
+        Requested files that are embedded but not indexed yet are indexed first.
+
+        Args:
+            query: Search query
+            user: User owning the files
+            file_ids: Files to search, all indexed files of the user when None
+            top_k: Number of chunks to return
+
+        Returns:
+            FileSearchResponse with the best matching chunks
+
+        Raises:
+            HTTPException: 404 if a requested file is not one of the user's,
+                503 if no embedding provider is configured
+        """
+        if file_ids:
+            # File ids are content hashes shared across users, only referenced ones are searchable
+            file_ids = list(dict.fromkeys(file_ids))
+            owned = await fetch_user_file_ids(user.id, file_ids)
+            if len(owned) < len(file_ids):
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Files not found: {', '.join(f for f in file_ids if f not in owned)}"
+                )
+
+        embedding_service = get_embedding_service()
+        if embedding_service is None:
+            raise HTTPException(
+                status_code=503,
+                detail="No embedding provider configured"
+            )
+
+        index = await asyncio.to_thread(get_user_ann_index, user.id)
+        if file_ids:
+            missing = [file_id for file_id in file_ids if file_id not in index]
+            if missing:
+                await asyncio.to_thread(index_user_files, user.id, missing)
+
+        query_embedding = await embedding_service.embed_query(query)
+        store = get_embedding_store()
+        results = []
+        # Off the event loop, the index may be training in an indexing thread
+        matches = await asyncio.to_thread(
+            _hybrid_search,
+            index,
+            query,
+            query_embedding,
+            file_ids or None,
+            top_k,
+            self.settings.HYBRID_LEXICAL_WEIGHT
+        )
+        for file_id, chunk_index, score in matches:
+            loaded = store.load(file_id)
+            if loaded is None:
+                continue
+            results.append(
+                FileSearchResult(
+                    fileId=file_id,
+                    title=loaded.title,
+                    chunkIndex=chunk_index,
+                    content=loaded.chunk(chunk_index),
+                    score=score
+                )
+            )
+        return FileSearchResponse(results=results)
+
+
+def _hybrid_search(
+    index: AnnIndex,
+    query: str,
+    query_embedding: List[float],
+    file_ids: Optional[List[str]],
+    top_k: int,
+    lexical_weight: float
+) -> List[Tuple[str, int, float]]:
+    """Merge ANN and BM25 candidates and rank them by fused score (blocking).
+
+    BM25 scores the requested files, or the files of the ANN candidates when
+    none were requested, so a query does not load every file of the user.
+    """
+    ann_matches = index.search(query_embedding, 4 * top_k, file_ids)
+    if not file_ids:
+        file_ids = list(dict.fromkeys(file_id for file_id, _, _ in ann_matches))
+
+    store = get_embedding_store()
+    lexical_store = get_lexical_store()
+    files = []
+    for file_id in file_ids:
+        loaded = store.load(file_id)
+        lexical_index = lexical_store.load(file_id)
+        if loaded is not None and lexical_index is not None and len(loaded) == len(lexical_index):
+            files.append((loaded, lexical_index))
+    if not files:
+        return ann_matches[:top_k]
+
+    file_positions = {loaded.file_id: i for i, (loaded, _) in enumerate(files)}
+    file_starts = np.cumsum([0] + [len(loaded) for loaded, _ in files])
+    lexical = bm25_scores([lexical_index for _, lexical_index in files], query)
+
+    # Rows into the concatenated chunks of `files`
+    candidates = {
+        int(file_starts[file_positions[file_id]]) + chunk_index
+        for file_id, chunk_index, _ in ann_matches
+        if file_id in file_positions
+    }
+    candidates.update(top_k_indices(lexical, 4 * top_k, 0.0))
+    rows = np.array(sorted(candidates), dtype=np.int64)
+    if rows.size == 0:
+        return []
+
+    query_vector = np.asarray(query_embedding, dtype=np.float32)
+    query_vector = query_vector / (np.linalg.norm(query_vector) or 1.0)
+    row_files = np.searchsorted(file_starts, rows, side="right") - 1
+    similarities = np.array([
+        float(files[f][0].embeddings[row - file_starts[f]] @ query_vector)
+        for f, row in zip(row_files, rows)
+    ], dtype=np.float32)
+    scores = fuse_scores(similarities, lexical[rows], lexical_weight)
+    return [
+        (
+            files[row_files[i]][0].file_id,
+            int(rows[i] - file_starts[row_files[i]]),
+            float(scores[i])
+        )
+        for i in top_k_indices(scores, top_k)
+    ]
@@ -0,0 +1,205 @@
+"""Content-addressed storage of uploaded files.
+
+Uploads are stored once per SHA-256 as ``{upload_dir}/{sha256}.{extension}``
+and the hash doubles as the file id, so identical files share the stored
+bytes, the extracted chunks (``{sha256}.json``), the embeddings and the lexical
+index across chats and users. Each upload adds a reference in the app
+database; blobs left without references are removed by
+`collect_unreferenced_blobs`.
+
+Storing an upload and collecting a blob both run under `_blob_lock`, so an
+upload never trusts bytes the collector is about to delete. The lock is per
+process, uploads and garbage collection are expected to run in one process.
+"""
+import asyncio
+import os
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Set
+
+from fastapi import UploadFile
+from loguru import logger
+
+from novas_app.core.config import get_settings
+from novas_app.db.database import get_app_session
+from novas_app.db.service import FileBlobDbService
+from .ann_index import unindex_file, unindex_user_file
+from .bm25_index import get_lexical_store
+from .embedding_store import get_embedding_store
+from .ingestion import forget_ingestion, stream_upload_to_disk
+
+_blob_lock = asyncio.Lock()
+
+
+@dataclass
+class StoredUpload:
+    """Result of storing an upload."""
+    sha256: str
+    size: int
+    file_path: str
+    reference_id: str
+    created: bool
+
+
+def blob_path(upload_dir: str, sha256: str, file_extension: str) -> str:
+    """Path of the stored bytes of a blob."""
+    if not file_extension:
+        return os.path.join(upload_dir, sha256)
+    return os.path.join(upload_dir, f"{sha256}.{file_extension}")
+
+
+async def store_upload(
+    file: UploadFile,
+    user_id: str,
+    upload_dir: str,
+    file_extension: str,
+    max_bytes: int,
+    chunk_size: int = 1024 * 1024
+) -> StoredUpload:
+    """Stream an upload into the content-addressed store and reference it.
+
+    Args:
+        file: Uploaded file
+        user_id: Owner of the new reference
+        upload_dir: Upload directory
+        file_extension: Extension without dot
+        max_bytes: Maximum accepted size of the file
+        chunk_size: Bytes read and written per step
+
+    Returns:
+        StoredUpload describing the blob and the new reference
+    """
+    temp_path = os.path.join(upload_dir, f".{uuid.uuid4()}.part")
+    size, sha256 = await stream_upload_to_disk(file, temp_path, max_bytes, chunk_size)
+    file_path = blob_path(upload_dir, sha256, file_extension)
+    try:
+        async with _blob_lock:
+            if os.path.exists(file_path):
+                os.remove(temp_path)
+            else:
+                os.replace(temp_path, file_path)
+
+            async with get_app_session() as session:
+                reference, created = await FileBlobDbService(session).add_reference(
+                    sha256, size, file_extension, user_id, file.filename
+                )
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    if not created:
+        logger.info(f"Upload {file.filename} deduplicated to existing blob {sha256}")
+    return StoredUpload(
+        sha256=sha256,
+        size=size,
+        file_path=file_path,
+        reference_id=reference.id,
+        created=created
+    )
+
+
+async def release_upload(sha256: str, user_id: str) -> bool:
+    """Drop one of a user's references to an upload.
+
+    The file leaves the user's search index once the user holds no other
+    reference to it. The blob itself is only removed by the garbage collector.
+
+    Args:
+        sha256: File id (content hash)
+        user_id: Owner of the reference
+
+    Returns:
+        True if a reference was removed
+    """
+    async with get_app_session() as session:
+        service = FileBlobDbService(session)
+        if not await service.remove_reference(sha256, user_id):
+            return False
+        still_referenced = await service.fetch_referenced_sha256s(user_id, [sha256])
+    if not still_referenced:
+        await asyncio.to_thread(unindex_user_file, user_id, sha256)
+    return True
+
+
+async def fetch_user_file_ids(user_id: str, file_ids: List[str]) -> Set[str]:
+    """Keep the file ids the user holds a reference to.
+
+    File ids are content hashes shared across users, so knowing one does not
+    grant access to it.
+
+    Args:
+        user_id: User ID
+        file_ids: Candidate file ids
+
+    Returns:
+        The referenced subset of `file_ids`
+    """
+    async with get_app_session() as session:
+        return await FileBlobDbService(session).fetch_referenced_sha256s(user_id, file_ids)
+
+
+def _delete_blob_files(upload_dir: str, sha256: str, file_extension: str) -> None:
+    for path in (
+        blob_path(upload_dir, sha256, file_extension),
+        os.path.join(upload_dir, f"{sha256}.json"),
+        os.path.join(upload_dir, f"{sha256}-embeddings.json"),
+    ):
+        if os.path.exists(path):
+            os.remove(path)
+    get_embedding_store().delete(sha256)
+    get_lexical_store().delete(sha256)
+    unindex_file(sha256)
+    forget_ingestion(sha256)
+
+
+async def collect_unreferenced_blobs(
+    upload_dir: str = "uploads",
+    grace_period: Optional[timedelta] = None
+) -> int:
+    """Delete blobs and their derived artifacts once nothing references them.
+
+    Args:
+        upload_dir: Upload directory
+        grace_period: How long a blob stays unreferenced before it is deleted
+
+    Returns:
+        Number of deleted blobs
+    """
+    settings = get_settings()
+    if grace_period is None:
+        grace_period = timedelta(seconds=settings.UPLOAD_GC_GRACE_PERIOD)
+    unreferenced_before = datetime.now(timezone.utc) - grace_period
+
+    async with get_app_session() as session:
+        blobs = await FileBlobDbService(session).fetch_unreferenced_blobs(unreferenced_before)
+
+    deleted = 0
+    for blob in blobs:
+        async with _blob_lock:
+            # Deleted only if still unreferenced, an upload may have referenced it since
+            async with get_app_session() as session:
+                if not await FileBlobDbService(session).delete_blob(blob.sha256):
+                    continue
+            try:
+                await asyncio.to_thread(
+                    _delete_blob_files, upload_dir, blob.sha256, blob.file_extension
+                )
+                deleted += 1
+            except Exception as e:
+                logger.error(f"Error deleting blob {blob.sha256}: {e}")
+    if deleted:
+        logger.info(f"Garbage collected {deleted} unreferenced upload blobs")
+    return deleted
+
+
+async def run_blob_gc_periodically(upload_dir: str = "uploads") -> None:
+    """Background task running `collect_unreferenced_blobs` every UPLOAD_GC_INTERVAL seconds."""
+    settings = get_settings()
+    while True:
+        try:
+            await collect_unreferenced_blobs(upload_dir)
+        except Exception as e:
+            logger.error(f"Error during upload garbage collection: {e}")
+        await asyncio.sleep(settings.UPLOAD_GC_INTERVAL)
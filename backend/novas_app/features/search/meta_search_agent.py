@@ -6,10 +6,16 @@ from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from pathlib import Path
 
-from novas_app.core.utils.compute_similarity import compute_similarity
+import numpy as np
+
+from novas_app.core.config import get_settings
+from novas_app.core.embeddings import embedding_model_name, get_embedding_service
+from novas_app.core.utils.compute_similarity import compute_similarities, top_k_indices
 from novas_app.core.utils.format_history import format_chat_history_as_string
 from novas_app.features.searxng import search_searxng
 from novas_app.features.documents import Document, get_documents_from_links
+from novas_app.features.files.bm25_index import FileLexicalIndex, bm25_scores, fuse_scores, get_lexical_store
+from novas_app.features.files.embedding_store import FileEmbeddings, get_embedding_store
 
 # @register_agent_type("meta_search_agent")
 # class MetaSearchAgent (Agent, DeclarativeSpecMixin):
@@ -20,7 +26,7 @@ class MetaSearchAgent:
     query_generator_prompt: str
     response_prompt: str
     rerank: bool
-    rerank_threshold: float
+    rerank_threshold: float  # minimum cosine score fused with BM25, for web documents and file chunks alike
     search_web: bool
     summarizer: bool
 
@@ -74,15 +80,8 @@ class MetaSearchAgent:
                 start = question.find("<think>", end) + 7
                 end = question.find("</think>", start)
 
-            # Get documents from URLs
-            docs = []
-            for url in urls:
-                try:
-                    doc = await get_documents_from_links([url])
-                    if doc:
-                        docs.extend(doc)
-                except Exception as e:
-                    print(f"Error getting document from URL {url}: {e}")
+            # Get documents from URLs, fetched concurrently
+            docs = await get_documents_from_links(urls)
 
             return {"query": question, "docs": docs}
         else:
@@ -221,30 +220,17 @@ class MetaSearchAgent:
         if not docs and not file_ids:
             return docs
 
-        # Load file data
-        files_data = []
-        for file_id in file_ids:
-            try:
-                file_path = Path("uploads") / file_id
-                content_path = file_path.with_suffix(".json")
-                embeddings_path = file_path.with_name(f"{file_path.stem}-embeddings.json")
-
-                if content_path.exists() and embeddings_path.exists():
-                    with open(content_path) as f:
-                        content = json.load(f)
-                    with open(embeddings_path) as f:
-                        emb = json.load(f)
-
-                    files_data.extend([
-                        {
-                            "fileName": content["title"],
-                            "content": c,
-                            "embeddings": e
-                        }
-                        for c, e in zip(content["contents"], emb["embeddings"])
-                    ])
-            except Exception as e:
-                print(f"Error loading file data for {file_id}: {e}")
+        # The embedding service batches and caches across searches, but only stands
+        # in for the selected model when it runs the same one
+        embedding_service = get_embedding_service()
+        if (
+            embedding_service is not None
+            and embedding_service.model == embedding_model_name(embeddings)
+        ):
+            embeddings = embedding_service
+
+        # Load file data, off the event loop
+        files_data = await asyncio.to_thread(self._load_files, file_ids)
 
         if query.lower() == "summarize":
             return docs[:15]
@@ -254,34 +240,16 @@ class MetaSearchAgent:
         if optimization_mode == "speed" or not self.rerank:
             if files_data:
                 query_embedding = await embeddings.embed_query(query)
-                
-                file_docs = [
-                    Document(
-                        page_content=data["content"],
-                        metadata={
-                            "title": data["fileName"],
-                            "url": "File"
-                        }
-                    )
-                    for data in files_data
-                ]
+                files_data = self._files_matching(files_data, query_embedding)
 
-                similarities = [
-                    {
-                        "index": i,
-                        "similarity": compute_similarity(query_embedding, data["embeddings"])
-                    }
-                    for i, data in enumerate(files_data)
-                ]
+                similarities = await asyncio.to_thread(
+                    self._hybrid_scores, query, query_embedding, files_data
+                )
 
-                sorted_docs = [
-                    file_docs[sim["index"]]
-                    for sim in sorted(
-                        [s for s in similarities if s["similarity"] > self.rerank_threshold],
-                        key=lambda x: x["similarity"],
-                        reverse=True
-                    )[:15]
-                ]
+                sorted_docs = self._file_chunk_docs(
+                    files_data,
+                    top_k_indices(similarities, 15, self.rerank_threshold)
+                )
 
                 if docs_with_content:
                     sorted_docs = sorted_docs[:8]
@@ -295,41 +263,156 @@ class MetaSearchAgent:
             [doc.page_content for doc in docs_with_content]
         )
         query_embedding = await embeddings.embed_query(query)
+        files_data = self._files_matching(files_data, query_embedding)
 
-        # Add file documents
-        docs_with_content.extend([
-            Document(
-                page_content=data["content"],
-                metadata={
-                    "title": data["fileName"],
-                    "url": "File"
-                }
-            )
-            for data in files_data
-        ])
-        doc_embeddings.extend([data["embeddings"] for data in files_data])
-
-        # Calculate similarities
-        similarities = [
-            {
-                "index": i,
-                "similarity": compute_similarity(query_embedding, emb)
-            }
-            for i, emb in enumerate(doc_embeddings)
-        ]
+        # Web documents and file chunks are fused with BM25 over all of them, so
+        # rerank_threshold applies to the same fused score for both; file chunks
+        # follow the web documents
+        similarities = await asyncio.to_thread(
+            self._hybrid_scores,
+            query,
+            query_embedding,
+            files_data,
+            [doc.page_content for doc in docs_with_content],
+            compute_similarities(query_embedding, doc_embeddings)
+        )
 
         # Sort and filter documents
+        num_web_docs = len(docs_with_content)
+        top_indices = top_k_indices(similarities, 15, self.rerank_threshold)
+        file_docs = iter(self._file_chunk_docs(
+            files_data,
+            [i - num_web_docs for i in top_indices if i >= num_web_docs]
+        ))
         sorted_docs = [
-            docs_with_content[sim["index"]]
-            for sim in sorted(
-                [s for s in similarities if s["similarity"] > self.rerank_threshold],
-                key=lambda x: x["similarity"],
-                reverse=True
-            )[:15]
+            docs_with_content[i] if i < num_web_docs else next(file_docs)
+            for i in top_indices
         ]
 
         return sorted_docs
 
+    def _load_files(self, file_ids: List[str]) -> List[FileEmbeddings]:
+        """Load the embeddings of the requested files (blocking).
+
+        Args:
+            file_ids: List of file IDs
+
+        Returns:
+            Loaded files that have chunks, in request order
+        """
+        files_data: List[FileEmbeddings] = []
+        embedding_store = get_embedding_store()
+        for file_id in file_ids:
+            try:
+                file_embeddings = embedding_store.load(file_id)
+                if file_embeddings is not None and len(file_embeddings) > 0:
+                    files_data.append(file_embeddings)
+            except Exception as e:
+                print(f"Error loading file data for {file_id}: {e}")
+        return files_data
+
+    def _files_matching(
+        self,
+        files_data: List[FileEmbeddings],
+        query_embedding: List[float]
+    ) -> List[FileEmbeddings]:
+        """Keep the files embedded with the dimension of the query.
+
+        Files embedded by another model than the selected one cannot be
+        compared with the query and are skipped.
+        """
+        matching = []
+        for data in files_data:
+            if data.embeddings.shape[1] == len(query_embedding):
+                matching.append(data)
+            else:
+                print(
+                    f"Skipping file {data.file_id}: embedded with dimension "
+                    f"{data.embeddings.shape[1]}, the query has {len(query_embedding)}"
+                )
+        return matching
+
+    def _hybrid_scores(
+        self,
+        query: str,
+        query_embedding: List[float],
+        files_data: List[FileEmbeddings],
+        web_texts: Optional[List[str]] = None,
+        web_similarities: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Score web documents and file chunks by cosine similarity fused with BM25 (blocking).
+
+        Exact matches such as tickers or codes can score low on embeddings
+        alone; the lexical score lifts them over the rerank threshold. BM25 is
+        computed over the web documents and the file chunks together and
+        normalized by one maximum, so both get the same lexical bonus and
+        rerank_threshold compares the same fused score.
+
+        Args:
+            query: Search query
+            query_embedding: Query vector
+            files_data: Loaded file embeddings
+            web_texts: Texts of the web documents, if any
+            web_similarities: Cosine similarities of the web documents
+
+        Returns:
+            Array of scores, the web documents followed by the chunks of all
+            files, in order
+        """
+        similarities = []
+        lexical_indexes = []
+        if web_texts:
+            similarities.append(np.asarray(web_similarities, dtype=np.float32))
+            lexical_indexes.append(FileLexicalIndex.build("web", web_texts))
+        similarities.extend(data.similarities(query_embedding) for data in files_data)
+        if not similarities:
+            return np.empty(0, dtype=np.float32)
+
+        lexical_store = get_lexical_store()
+        for data in files_data:
+            lexical_index = lexical_store.load(data.file_id)
+            if lexical_index is None or len(lexical_index) != len(data):
+                lexical_index = lexical_store.write(
+                    data.file_id, [data.chunk(i) for i in range(len(data))]
+                )
+            lexical_indexes.append(lexical_index)
+
+        return fuse_scores(
+            np.concatenate(similarities),
+            bm25_scores(lexical_indexes, query),
+            get_settings().HYBRID_LEXICAL_WEIGHT
+        )
+
+    def _file_chunk_docs(
+        self,
+        files_data: List[FileEmbeddings],
+        indices: List[int]
+    ) -> List[Document]:
+        """Build documents for chunks addressed by their index across all files.
+
+        Args:
+            files_data: Loaded file embeddings, in scoring order
+            indices: Indices into the concatenated chunks of `files_data`
+
+        Returns:
+            One document per index, in the same order
+        """
+        file_starts = np.cumsum([0] + [len(data) for data in files_data])
+        file_docs = []
+        for index in indices:
+            file_index = int(np.searchsorted(file_starts, index, side="right")) - 1
+            data = files_data[file_index]
+            file_docs.append(
+                Document(
+                    page_content=data.chunk(index - int(file_starts[file_index])),
+                    metadata={
+                        "title": data.title,
+                        "url": "File"
+                    }
+                )
+            )
+        return file_docs
+
     def _process_docs(self, docs: List[Document]) -> str:
         """Process documents into string format.
         
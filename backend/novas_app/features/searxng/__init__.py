@@ -9,11 +9,8 @@ from .schemas import SearchResponse, SearchResult, SearchOptions
 __all__ = ["router", "SearxngService", "SearchResponse", "SearchResult", "SearchOptions"]
 
 from typing import Dict, List, Optional, Any
-from urllib.parse import urljoin
-
-import httpx
-
 from novas_app.core.config import get_settings
+from novas_mcp.searxng_client import get_searxng_client
 
 async def search_searxng(
     query: str,
@@ -36,29 +33,25 @@ async def search_searxng(
     if not settings.SEARXNG_API_ENDPOINT:
         return {"results": [], "suggestions": []}
 
-    params = {
-        "q": query,
-        "format": "json",
-        "language": language,
-        "pageno": page
-    }
-
-    if engines:
-        params["engines"] = ",".join(engines)
-
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                urljoin(settings.SEARXNG_API_ENDPOINT, "search"),
-                params=params
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            return {
-                "results": data.get("results", []),
-                "suggestions": data.get("suggestions", [])
-            }
+        client = get_searxng_client(
+            settings.SEARXNG_API_ENDPOINT,
+            redis_url=settings.REDIS_URL
+            if settings.SEARXNG_CACHE_BACKEND == "redis"
+            else None,
+            cache_ttl=settings.SEARXNG_CACHE_TTL,
+        )
+        data = await client.search(
+            query,
+            engines=",".join(engines) if engines else None,
+            language=language,
+            pageno=page
+        )
+
+        return {
+            "results": data.get("results", []),
+            "suggestions": data.get("suggestions", [])
+        }
     except Exception as e:
         print(f"Error searching with SearxNG: {e}")
         return {"results": [], "suggestions": []} 
\ No newline at end of file
@@ -1,6 +1,8 @@
-from typing import Optional
+from typing import Any, Dict, Optional
 from fastapi import APIRouter, Depends
 
+from novas_mcp.searxng_client import get_searxng_metrics
+
 from .schemas import SearchResponse
 from .service import SearxngService
 
@@ -24,4 +26,11 @@ async def search(
         engines=engines,
         language=language,
         pageno=pageno
-    ) 
\ No newline at end of file
+    ) 
+
+@router.get("/metrics")
+async def search_metrics() -> Dict[str, Dict[str, Any]]:
+    """
+    Cache hit-rate metrics of the shared SearXNG clients.
+    """
+    return get_searxng_metrics()
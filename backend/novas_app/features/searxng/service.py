@@ -1,9 +1,9 @@
 from typing import Optional
 import httpx
-from urllib.parse import urljoin
 from fastapi import HTTPException
 
 from novas_app.core.config import get_settings
+from novas_mcp.searxng_client import SearxngClient, get_searxng_client
 from .schemas import SearchResponse, SearchResult
 
 class SearxngService:
@@ -12,6 +12,13 @@ class SearxngService:
     def __init__(self):
         self.settings = get_settings()
         self.base_url = self.settings.SEARXNG_API_URL
+        self.client: SearxngClient = get_searxng_client(
+            self.base_url,
+            redis_url=self.settings.REDIS_URL
+            if self.settings.SEARXNG_CACHE_BACKEND == "redis"
+            else None,
+            cache_ttl=self.settings.SEARXNG_CACHE_TTL,
+        )
 
     async def search(
         self,
@@ -37,36 +44,22 @@ class SearxngService:
         Raises:
             HTTPException: If the API call fails
         """
-        # Prepare search parameters
-        params = {"q": query, "format": "json"}
-        
-        if categories:
-            params["categories"] = categories
-        if engines:
-            params["engines"] = engines
-        if language:
-            params["language"] = language
-        if pageno:
-            params["pageno"] = str(pageno)
-
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    urljoin(self.base_url, "search"),
-                    params=params,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                return SearchResponse(
-                    results=[
-                        SearchResult(**result)
-                        for result in data.get("results", [])
-                    ],
-                    suggestions=data.get("suggestions", [])
-                )
-                
+            data = await self.client.search(
+                query,
+                engines=engines,
+                language=language,
+                categories=categories,
+                pageno=pageno,
+            )
+            return SearchResponse(
+                results=[
+                    SearchResult(**result)
+                    for result in data.get("results", [])
+                ],
+                suggestions=data.get("suggestions", [])
+            )
+
         except httpx.HTTPError as e:
             raise HTTPException(
                 status_code=500,
@@ -1,7 +1,9 @@
 """Uploads router module."""
 from typing import List
-from fastapi import APIRouter, Depends, File, UploadFile
+from fastapi import APIRouter, BackgroundTasks, Depends, File, UploadFile
 
+from novas_app.db.schemas import User
+from novas_app.depends import get_current_user
 from .service import UploadService
 from .schemas import UploadResponse
 
@@ -9,8 +11,10 @@ router = APIRouter(prefix="/uploads", tags=["uploads"])
 
 @router.post("", response_model=UploadResponse)
 async def upload_files(
+    background_tasks: BackgroundTasks,
     files: List[UploadFile] = File(...),
-    upload_service: UploadService = Depends(UploadService)
+    upload_service: UploadService = Depends(UploadService),
+    user: User = Depends(get_current_user)
 ) -> UploadResponse:
     """Upload files."""
-    return await upload_service.upload_files(files) 
\ No newline at end of file
+    return await upload_service.upload_files(files, background_tasks, user) 
\ No newline at end of file
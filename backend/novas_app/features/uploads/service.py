@@ -1,10 +1,17 @@
 """Uploads service module."""
 import os
-import uuid
 from typing import List
 from datetime import datetime
-from fastapi import UploadFile
+from fastapi import BackgroundTasks, UploadFile
 
+from novas_app.core.config import get_settings
+from novas_app.db.schemas import User
+from novas_app.features.files.ingestion import (
+    INGESTIBLE_EXTENSIONS,
+    ingest_file,
+    register_ingestion,
+)
+from novas_app.features.files.storage import store_upload
 from .schemas import UploadResponse, UploadedFile
 
 class UploadService:
@@ -12,37 +19,58 @@ class UploadService:
     
     def __init__(self):
         """Initialize upload service."""
+        self.settings = get_settings()
         self.upload_dir = "uploads"
         os.makedirs(self.upload_dir, exist_ok=True)
     
-    async def upload_files(self, files: List[UploadFile]) -> UploadResponse:
-        """Upload files and return their information."""
+    async def upload_files(
+        self,
+        files: List[UploadFile],
+        background_tasks: BackgroundTasks,
+        user: User
+    ) -> UploadResponse:
+        """Upload files and return their information.
+
+        Files are stored content-addressed, the SHA-256 is the file ID. New
+        PDF, DOCX and TXT content is also scheduled for background ingestion.
+        """
         uploaded_files = []
+        remaining_bytes = self.settings.MAX_UPLOAD_REQUEST_SIZE
         
         for file in files:
-            # Generate unique file ID
-            file_id = str(uuid.uuid4())
-            
             # Get file extension
             _, ext = os.path.splitext(file.filename)
+            extension = ext.lstrip(".").lower()
             
-            # Create unique filename
-            unique_filename = f"{file_id}{ext}"
-            file_path = os.path.join(self.upload_dir, unique_filename)
-            
-            # Save file
-            with open(file_path, "wb") as f:
-                content = await file.read()
-                f.write(content)
+            # Save file, the content hash is the file ID
+            stored = await store_upload(
+                file,
+                user.id,
+                self.upload_dir,
+                extension,
+                max_bytes=min(self.settings.MAX_UPLOAD_FILE_SIZE, remaining_bytes),
+                chunk_size=self.settings.UPLOAD_CHUNK_SIZE
+            )
+            remaining_bytes -= stored.size
+
+            if extension in INGESTIBLE_EXTENSIONS and register_ingestion(stored.sha256, file.filename) is not None:
+                background_tasks.add_task(
+                    ingest_file,
+                    stored.sha256,
+                    stored.file_path,
+                    file.filename,
+                    extension
+                )
             
             # Create file record
             uploaded_file = UploadedFile(
-                id=file_id,
+                id=stored.sha256,
                 filename=file.filename,
                 content_type=file.content_type,
-                size=os.path.getsize(file_path),
-                url=f"/uploads/{unique_filename}",
-                uploaded_at=datetime.now()
+                size=stored.size,
+                url=f"/uploads/{os.path.basename(stored.file_path)}",
+                uploaded_at=datetime.now(),
+                metadata={"sha256": stored.sha256, "deduplicated": not stored.created}
             )
             uploaded_files.append(uploaded_file)
         
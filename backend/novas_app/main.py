@@ -1,5 +1,6 @@
 """Main application module."""
 
+import asyncio
 from contextlib import asynccontextmanager
 import logging
 from fastapi import FastAPI
@@ -10,6 +11,10 @@ from novas_app.db.init_db import init_app_db
 from novas_app.db.database import close_db_connections
 from novas_app.features.chat.router_stream import router as chat_stream_router
 from novas_app.features.chat.admin_router import router as chat_admin_router
+from novas_app.features.documents import close_document_fetching
+from novas_app.features.files.ingestion import MULTIPART_OVERHEAD, UploadSizeLimitMiddleware
+from novas_app.features.files.storage import run_blob_gc_periodically
+from novas_app.core.config import get_settings
 # from novas_app.core.background_tasks import start_background_tasks
 
 dotenv.load_dotenv()
@@ -22,8 +27,11 @@ async def lifespan(app: FastAPI):
     logger.info("Starting up...")
     await init_app_db()
     # await start_background_tasks()
+    blob_gc_task = asyncio.create_task(run_blob_gc_periodically())
     yield
     logger.info("Shutting down...")
+    blob_gc_task.cancel()
+    await close_document_fetching()
     await close_db_connections()
 
 
@@ -44,6 +52,12 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+
+    # Reject oversized uploads before their body is spooled to disk
+    app.add_middleware(
+        UploadSizeLimitMiddleware,
+        max_body_size=get_settings().MAX_UPLOAD_REQUEST_SIZE + MULTIPART_OVERHEAD,
+    )
     
     # Include routers
     app.include_router(api_v1_router, prefix="/api/v1")
@@ -19,6 +19,11 @@ def setup_mcp_servers(app: FastAPI):
         sse_app = mcp.sse_app()
         app.mount(f"/{mcp.name}", sse_app)
 
+@app.on_event("shutdown")
+async def close_http_clients():
+    from novas_mcp.trading.trading_em_http import close_em_http_client
+    await close_em_http_client()
+
 @app.get("/")
 async def root():
     return {"message": "Hello World"}
@@ -0,0 +1,299 @@
+"""Shared SearXNG client.
+
+Used by the app search feature and by the MCP web search tool. The client keeps
+one pooled `httpx.AsyncClient` per SearXNG instance, coalesces identical
+in-flight queries into a single upstream request and caches responses for a
+short TTL, either in process memory or in Redis.
+
+It lives in `novas_mcp`, which is packaged on its own, and only depends on
+httpx (and optionally redis); the app imports it from here.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urljoin
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+SearxngCacheKey = Tuple[str, str, str, str, int]
+
+
+@dataclass
+class SearxngClientMetrics:
+    """Counters describing how queries were served."""
+
+    requests: int = 0
+    cache_hits: int = 0
+    coalesced: int = 0
+    upstream_calls: int = 0
+    upstream_errors: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of requests that did not reach SearXNG."""
+        if self.requests == 0:
+            return 0.0
+        return (self.cache_hits + self.coalesced) / self.requests
+
+    def __add__(self, other: "SearxngClientMetrics") -> "SearxngClientMetrics":
+        return SearxngClientMetrics(
+            requests=self.requests + other.requests,
+            cache_hits=self.cache_hits + other.cache_hits,
+            coalesced=self.coalesced + other.coalesced,
+            upstream_calls=self.upstream_calls + other.upstream_calls,
+            upstream_errors=self.upstream_errors + other.upstream_errors,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["hit_rate"] = round(self.hit_rate, 4)
+        return data
+
+
+class SearxngClient:
+    """Pooled, caching SearXNG client."""
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 30.0,
+        cache_ttl: float = 300.0,
+        cache_max_entries: int = 1024,
+        redis_url: Optional[str] = None,
+        max_connections: int = 20,
+    ):
+        """
+        Args:
+            base_url: SearXNG base URL, e.g. http://searxng:8080
+            timeout: Per request timeout in seconds
+            cache_ttl: Seconds a response is served from cache, 0 disables caching
+            cache_max_entries: Size bound of the in-memory cache
+            redis_url: When set, responses are cached in Redis instead of memory
+            max_connections: Connection pool size of the shared http client
+        """
+        self.base_url = base_url
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.cache_max_entries = cache_max_entries
+        self.redis_url = redis_url
+        self.max_connections = max_connections
+        self.metrics = SearxngClientMetrics()
+
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._redis = None
+        self._memory_cache: "OrderedDict[SearxngCacheKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._in_flight: Dict[SearxngCacheKey, asyncio.Task] = {}
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._http_client
+
+    def _get_redis(self):
+        if self._redis is None:
+            from redis.asyncio import Redis
+
+            self._redis = Redis.from_url(
+                self.redis_url, encoding="utf-8", decode_responses=True
+            )
+        return self._redis
+
+    @staticmethod
+    def make_cache_key(
+        query: str,
+        engines: Optional[str] = None,
+        language: Optional[str] = None,
+        categories: Optional[str] = None,
+        pageno: Optional[int] = None,
+    ) -> SearxngCacheKey:
+        """Normalize search parameters into a cache key."""
+        return (
+            query.strip(),
+            ",".join(sorted(e.strip() for e in engines.split(",") if e.strip()))
+            if engines
+            else "",
+            language or "",
+            ",".join(sorted(c.strip() for c in categories.split(",") if c.strip()))
+            if categories
+            else "",
+            pageno or 1,
+        )
+
+    @staticmethod
+    def _redis_key(key: SearxngCacheKey) -> str:
+        digest = hashlib.sha256(
+            json.dumps(key, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        return f"searxng:search:{digest}"
+
+    async def _cache_get(self, key: SearxngCacheKey) -> Optional[Dict[str, Any]]:
+        if self.cache_ttl <= 0:
+            return None
+        if self.redis_url:
+            try:
+                cached = await self._get_redis().get(self._redis_key(key))
+            except Exception as e:
+                logger.warning(f"SearXNG redis cache read failed: {e}")
+                return None
+            return json.loads(cached) if cached else None
+
+        entry = self._memory_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if expires_at < time.monotonic():
+            self._memory_cache.pop(key, None)
+            return None
+        self._memory_cache.move_to_end(key)
+        return data
+
+    async def _cache_set(self, key: SearxngCacheKey, data: Dict[str, Any]) -> None:
+        if self.cache_ttl <= 0:
+            return
+        if self.redis_url:
+            try:
+                await self._get_redis().set(
+                    self._redis_key(key),
+                    json.dumps(data, ensure_ascii=False),
+                    ex=max(1, int(self.cache_ttl)),
+                )
+            except Exception as e:
+                logger.warning(f"SearXNG redis cache write failed: {e}")
+            return
+
+        self._memory_cache[key] = (time.monotonic() + self.cache_ttl, data)
+        self._memory_cache.move_to_end(key)
+        while len(self._memory_cache) > self.cache_max_entries:
+            self._memory_cache.popitem(last=False)
+
+    async def _fetch(self, key: SearxngCacheKey) -> Dict[str, Any]:
+        query, engines, language, categories, pageno = key
+        params: Dict[str, Any] = {"q": query, "format": "json"}
+        if engines:
+            params["engines"] = engines
+        if language:
+            params["language"] = language
+        if categories:
+            params["categories"] = categories
+        if pageno and pageno > 1:
+            params["pageno"] = str(pageno)
+
+        self.metrics.upstream_calls += 1
+        try:
+            response = await self._get_http_client().get(
+                urljoin(self.base_url, "search"), params=params
+            )
+            response.raise_for_status()
+            data = response.json()
+        except Exception:
+            self.metrics.upstream_errors += 1
+            raise
+        await self._cache_set(key, data)
+        return data
+
+    async def search(
+        self,
+        query: str,
+        engines: Optional[str] = None,
+        language: Optional[str] = None,
+        categories: Optional[str] = None,
+        pageno: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Search SearXNG and return its raw JSON response.
+
+        Args:
+            query: Search query
+            engines: Comma-separated list of engines
+            language: Search language
+            categories: Comma-separated list of categories
+            pageno: Page number
+
+        Returns:
+            The decoded SearXNG JSON response
+
+        Raises:
+            httpx.HTTPError: If the upstream call fails
+        """
+        key = self.make_cache_key(query, engines, language, categories, pageno)
+        self.metrics.requests += 1
+
+        cached = await self._cache_get(key)
+        if cached is not None:
+            self.metrics.cache_hits += 1
+            return cached
+
+        # Concurrent identical searches share one upstream call, run in its own task
+        # and shielded, so a caller that is cancelled (e.g. its per query deadline
+        # fired) does not cancel the call for the others
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+            # Nobody may be left waiting when it fails
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        else:
+            self.metrics.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+_clients: Dict[Tuple[str, Optional[str]], SearxngClient] = {}
+
+
+def get_searxng_client(
+    base_url: str,
+    redis_url: Optional[str] = None,
+    cache_ttl: float = 300.0,
+    timeout: float = 30.0,
+) -> SearxngClient:
+    """Get the process wide client for a SearXNG instance.
+
+    Args:
+        base_url: SearXNG base URL
+        redis_url: Optional Redis URL for the shared result cache
+        cache_ttl: Cache TTL in seconds, used when the client is first created
+        timeout: Request timeout in seconds, used when the client is first created
+
+    Returns:
+        SearxngClient instance
+    """
+    client = _clients.get((base_url, redis_url))
+    if client is None:
+        client = SearxngClient(
+            base_url, timeout=timeout, cache_ttl=cache_ttl, redis_url=redis_url
+        )
+        _clients[(base_url, redis_url)] = client
+    return client
+
+
+def get_searxng_metrics() -> Dict[str, Dict[str, Any]]:
+    """Hit-rate metrics per SearXNG instance, summed over its clients in this process."""
+    metrics: Dict[str, SearxngClientMetrics] = {}
+    for client in _clients.values():
+        metrics[client.base_url] = (
+            metrics.get(client.base_url, SearxngClientMetrics()) + client.metrics
+        )
+    return {base_url: m.to_dict() for base_url, m in metrics.items()}
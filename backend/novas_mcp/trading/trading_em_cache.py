@@ -0,0 +1,281 @@
+"""
+东方财富数据源的异步 TTL 缓存。
+
+`em_cached` 装饰器按规范化后的参数缓存异步取数函数的结果：
+- 参数按函数签名绑定（含默认值），枚举取值、字符串去空白后序列化为缓存键
+- TTL 可按数据特性计算，例如季度财报缓存数小时，盘中 K 线缓存数分钟
+- 并发的相同调用只会请求一次东方财富（single-flight）
+- 结果以 pickle 存储，每次命中都返回新对象，调用方修改 DataFrame 不会污染缓存
+- 过期的结果再保留 EM_CACHE_STALE_SECONDS，东方财富请求失败（例如域名熔断）时返回过期结果
+
+后端由环境变量选择：
+- EM_CACHE_BACKEND: memory（默认）、disk、redis 或 none
+- EM_CACHE_DIR: disk 后端目录，默认 ./data/em_cache
+- EM_CACHE_REDIS_URL: redis 后端地址
+- EM_CACHE_MAX_ENTRIES: memory 后端的最大条目数，默认 1024
+- EM_CACHE_STALE_SECONDS: 过期结果的保留秒数，默认一天，0 表示不使用过期结果
+"""
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import pickle
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, time as dt_time, timedelta, timezone
+from enum import Enum
+from typing import Any, Awaitable, Callable, Optional, Union
+
+import httpx
+
+from novas_mcp.trading.trading_em_http import record_em_http_event
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+EM_CACHE_BACKEND = os.environ.get("EM_CACHE_BACKEND", "memory")
+EM_CACHE_DIR = os.environ.get("EM_CACHE_DIR", "./data/em_cache")
+EM_CACHE_REDIS_URL = os.environ.get("EM_CACHE_REDIS_URL")
+EM_CACHE_MAX_ENTRIES = int(os.environ.get("EM_CACHE_MAX_ENTRIES", "1024"))
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+EM_CACHE_STALE_SECONDS = float(os.environ.get("EM_CACHE_STALE_SECONDS", str(DAY)))
+
+# 北京时间，交易日和"今天"都按它计算
+CN_TZ = timezone(timedelta(hours=8))
+
+
+def is_cn_trading_hours(now: Optional[datetime] = None) -> bool:
+    """是否处于 A 股交易时段（工作日 9:15-15:05，北京时间，不含节假日判断）"""
+    now = (now or datetime.now(CN_TZ)).astimezone(CN_TZ)
+    return now.weekday() < 5 and dt_time(9, 15) <= now.time() <= dt_time(15, 5)
+
+
+def kline_ttl(arguments: dict) -> float:
+    """K 线 TTL：区间已结束的历史数据缓存一天，包含今天时盘中缓存一分钟、盘后缓存一小时"""
+    end_date = str(arguments.get("end_date") or "")
+    today = datetime.now(CN_TZ).strftime("%Y-%m-%d")
+    if end_date and end_date < today:
+        return DAY
+    return MINUTE if is_cn_trading_hours() else HOUR
+
+
+class _MemoryBackend:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[float, bytes]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[tuple[float, bytes]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] + EM_CACHE_STALE_SECONDS < time.time():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, payload: bytes, ttl: float) -> None:
+        self._entries[key] = (time.time() + ttl, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class _DiskBackend:
+    def __init__(self, base_dir: str):
+        self.base_dir = base_dir
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.base_dir, key[:2], f"{key}.pkl")
+
+    def _read(self, key: str) -> Optional[tuple[float, bytes]]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                expires_at, payload = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        if expires_at + EM_CACHE_STALE_SECONDS < time.time():
+            os.remove(path)
+            return None
+        return expires_at, payload
+
+    def _write(self, key: str, payload: bytes, ttl: float) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4()}.tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump((time.time() + ttl, payload), f)
+        os.replace(temp_path, path)
+
+    async def get(self, key: str) -> Optional[tuple[float, bytes]]:
+        return await asyncio.to_thread(self._read, key)
+
+    async def set(self, key: str, payload: bytes, ttl: float) -> None:
+        await asyncio.to_thread(self._write, key, payload, ttl)
+
+
+class _RedisBackend:
+    def __init__(self, redis_url: str):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(redis_url)
+
+    async def get(self, key: str) -> Optional[tuple[float, bytes]]:
+        entry = await self._redis.get(f"em_cache:{key}")
+        return None if entry is None else pickle.loads(entry)
+
+    async def set(self, key: str, payload: bytes, ttl: float) -> None:
+        entry = pickle.dumps((time.time() + ttl, payload))
+        await self._redis.set(f"em_cache:{key}", entry, ex=max(int(ttl + EM_CACHE_STALE_SECONDS), 1))
+
+
+_backend: Any = None
+_in_flight: dict[str, asyncio.Future] = {}
+
+
+def _get_backend():
+    global _backend
+    if _backend is None:
+        if EM_CACHE_BACKEND == "redis" and EM_CACHE_REDIS_URL:
+            _backend = _RedisBackend(EM_CACHE_REDIS_URL)
+        elif EM_CACHE_BACKEND == "disk":
+            _backend = _DiskBackend(EM_CACHE_DIR)
+        else:
+            _backend = _MemoryBackend(EM_CACHE_MAX_ENTRIES)
+    return _backend
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _is_empty(result: Any) -> bool:
+    """None、空容器或空 DataFrame，通常是东方财富暂时没有返回数据"""
+    if result is None:
+        return True
+    if isinstance(result, (dict, list, tuple)):
+        return not result
+    return getattr(result, "empty", False) is True
+
+
+def make_cache_key(name: str, arguments: dict) -> str:
+    """由函数名和规范化后的参数生成缓存键"""
+    normalized = json.dumps(
+        {k: _normalize(v) for k, v in arguments.items()},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(f"{name}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+def em_cached(
+    ttl: Union[float, Callable[[dict], float]],
+    exclude: tuple[str, ...] = (),
+) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """
+    缓存东方财富异步取数函数的结果。
+
+    Args:
+        ttl: 缓存秒数，或根据绑定后的参数计算秒数的函数
+        exclude: 不参与缓存键的参数名
+
+    结果为 None、空容器、空 DataFrame 或抛出异常时不缓存，上游暂时无数据时不会把空结果
+    固定到 TTL 结束，也不会在之后作为过期结果返回。取数时东方财富请求失败（httpx.HTTPError，包括熔断）
+    且有保留期内的过期结果时，返回过期结果。
+    """
+
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        signature = inspect.signature(func)
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if EM_CACHE_BACKEND == "none":
+                return await func(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = {k: v for k, v in bound.arguments.items() if k not in exclude}
+            key = make_cache_key(name, arguments)
+            backend = _get_backend()
+
+            try:
+                entry = await backend.get(key)
+            except Exception as e:
+                logger.warning(f"em cache read failed for {name}: {e}")
+                entry = None
+            stale_payload = None
+            if entry is not None:
+                expires_at, payload = entry
+                if expires_at >= time.time():
+                    logger.debug(f"em cache hit: {name} {arguments}")
+                    return pickle.loads(payload)
+                stale_payload = payload
+
+            in_flight = _in_flight.get(key)
+            if in_flight is not None:
+                try:
+                    return pickle.loads(await asyncio.shield(in_flight))
+                except asyncio.CancelledError:
+                    if not in_flight.cancelled():
+                        raise
+                    # 发起请求的调用被取消，自行请求
+                    return await func(*args, **kwargs)
+
+            future = asyncio.get_running_loop().create_future()
+            _in_flight[key] = future
+            try:
+                try:
+                    result = await func(*args, **kwargs)
+                    payload = pickle.dumps(result)
+                except httpx.HTTPError as e:
+                    if stale_payload is None:
+                        raise
+                    logger.warning(f"em request failed for {name}, serving stale cache: {e!r}")
+                    record_em_http_event("em_cache", "stale_served")
+                    # 过期结果不回写
+                    result = None
+                    payload = stale_payload
+                future.set_result(payload)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except BaseException as e:
+                future.set_exception(e)
+                # 没有其他等待者时避免 "exception was never retrieved"
+                future.exception()
+                raise
+            finally:
+                _in_flight.pop(key, None)
+
+            if not _is_empty(result):
+                seconds = ttl(arguments) if callable(ttl) else ttl
+                try:
+                    await backend.set(key, payload, seconds)
+                except Exception as e:
+                    logger.warning(f"em cache write failed for {name}: {e}")
+            return pickle.loads(payload)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,299 @@
+"""
+东方财富原始响应的抓取（capture）模式。
+
+默认关闭，关闭时共用客户端上不会挂任何钩子，取数热路径没有额外开销。
+开启后按采样率记录原始 HTTP 往返（请求方法、URL、状态码、响应头和响应体），
+由后台线程写入 gzip 压缩的 JSONL 文件，请求协程只负责把记录放入队列。
+抓取的文件可以通过 CaptureReplayTransport 回放，用作离线测试和基准数据；
+需要完整录制时使用 CaptureRecordingTransport（见 novas_mcp.trading_bench）。
+
+- EM_CAPTURE_ENABLED: 是否开启抓取，默认 false
+- EM_CAPTURE_DIR: 抓取文件目录，默认 ./logs/em_capture
+- EM_CAPTURE_SAMPLE_RATE: 采样率，0~1，默认 1
+- EM_CAPTURE_MAX_FILE_BYTES: 单个文件写满后轮转，默认 16MB
+- EM_CAPTURE_MAX_BYTES: 目录总大小上限，超出后删除最早的文件，默认 256MB
+- EM_CAPTURE_QUEUE_SIZE: 待写入队列长度，写入跟不上时丢弃新记录，默认 1000
+"""
+import base64
+import glob
+import gzip
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from typing import Iterable, Iterator, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+EM_CAPTURE_ENABLED = os.environ.get("EM_CAPTURE_ENABLED", "false").lower() in ("1", "true", "yes")
+EM_CAPTURE_DIR = os.environ.get("EM_CAPTURE_DIR", "./logs/em_capture")
+EM_CAPTURE_SAMPLE_RATE = float(os.environ.get("EM_CAPTURE_SAMPLE_RATE", "1"))
+EM_CAPTURE_MAX_FILE_BYTES = int(os.environ.get("EM_CAPTURE_MAX_FILE_BYTES", str(16 * 1024 * 1024)))
+EM_CAPTURE_MAX_BYTES = int(os.environ.get("EM_CAPTURE_MAX_BYTES", str(256 * 1024 * 1024)))
+EM_CAPTURE_QUEUE_SIZE = int(os.environ.get("EM_CAPTURE_QUEUE_SIZE", "1000"))
+
+# 只保留回放需要的响应头
+_CAPTURED_RESPONSE_HEADERS = ("content-type", "location")
+
+
+def capture_enabled() -> bool:
+    return EM_CAPTURE_ENABLED and EM_CAPTURE_SAMPLE_RATE > 0
+
+
+class _CaptureWriter(threading.Thread):
+    """后台写入线程：gzip JSONL，按单文件大小轮转，按目录总大小淘汰最早的文件"""
+
+    def __init__(self, directory: str, max_file_bytes: int, max_bytes: int, queue_size: int):
+        super().__init__(name="em-capture-writer", daemon=True)
+        self._directory = directory
+        self._max_file_bytes = max_file_bytes
+        self._max_bytes = max_bytes
+        self._queue: "queue.Queue[Optional[dict]]" = queue.Queue(maxsize=queue_size)
+        self._file: Optional[gzip.GzipFile] = None
+        self._raw_file = None
+        self._dropped = 0
+
+    def submit(self, record: dict) -> None:
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self._dropped += 1
+            if self._dropped % 100 == 1:
+                logger.warning(f"Capture queue is full, dropped {self._dropped} records")
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """等待队列中的记录全部写入"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        self._queue.put(None)
+        self.join()
+
+    def run(self) -> None:
+        os.makedirs(self._directory, exist_ok=True)
+        try:
+            while True:
+                record = self._queue.get()
+                try:
+                    if record is None:
+                        return
+                    self._write(record)
+                except Exception as e:
+                    logger.warning(f"Failed to write capture record: {e!r}")
+                finally:
+                    self._queue.task_done()
+        finally:
+            self._close_file()
+
+    def _write(self, record: dict) -> None:
+        if self._file is None:
+            self._open_file()
+        self._file.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+        # 以落盘的压缩后大小计算轮转
+        self._file.flush()
+        if self._raw_file.tell() >= self._max_file_bytes:
+            self._close_file()
+            self._enforce_max_bytes()
+
+    def _open_file(self) -> None:
+        name = f"em_capture_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{time.monotonic_ns()}.jsonl.gz"
+        self._raw_file = open(os.path.join(self._directory, name), "wb")
+        self._file = gzip.GzipFile(fileobj=self._raw_file, mode="wb")
+        self._enforce_max_bytes()
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._raw_file.close()
+            self._file = None
+            self._raw_file = None
+
+    def _enforce_max_bytes(self) -> None:
+        current = self._raw_file.name if self._raw_file is not None else None
+        files = sorted(glob.glob(os.path.join(self._directory, "em_capture_*.jsonl.gz")), key=os.path.getmtime)
+        total = sum(os.path.getsize(path) for path in files)
+        for path in files:
+            if total <= self._max_bytes:
+                break
+            if path == current:
+                continue
+            total -= os.path.getsize(path)
+            os.remove(path)
+
+
+_writer: Optional[_CaptureWriter] = None
+_writer_lock = threading.Lock()
+
+
+def _get_writer() -> _CaptureWriter:
+    global _writer
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = _CaptureWriter(EM_CAPTURE_DIR, EM_CAPTURE_MAX_FILE_BYTES, EM_CAPTURE_MAX_BYTES, EM_CAPTURE_QUEUE_SIZE)
+            _writer.start()
+        return _writer
+
+
+def flush_capture(timeout: Optional[float] = None) -> None:
+    if _writer is not None:
+        _writer.flush(timeout)
+
+
+def close_capture() -> None:
+    """写完队列中的记录并关闭当前文件"""
+    global _writer
+    with _writer_lock:
+        if _writer is not None and _writer.is_alive():
+            _writer.stop()
+        _writer = None
+
+
+def _encode_body(content: bytes, content_type: str) -> dict:
+    if "json" in content_type or "text" in content_type or "javascript" in content_type:
+        try:
+            return {"text": content.decode("utf-8")}
+        except UnicodeDecodeError:
+            pass
+    return {"base64": base64.b64encode(content).decode("ascii")}
+
+
+def _decode_body(body: dict) -> bytes:
+    if "text" in body:
+        return body["text"].encode("utf-8")
+    return base64.b64decode(body["base64"])
+
+
+def _exchange_record(request: httpx.Request, response: httpx.Response, content: bytes) -> dict:
+    return {
+        "captured_at": time.time(),
+        "method": request.method,
+        "url": str(request.url),
+        "status_code": response.status_code,
+        "headers": {k: response.headers[k] for k in _CAPTURED_RESPONSE_HEADERS if k in response.headers},
+        "body": _encode_body(content, response.headers.get("content-type", "")),
+    }
+
+
+async def capture_response_hook(response: httpx.Response) -> None:
+    """httpx 的 response 事件钩子，只在开启抓取时挂到共用客户端上"""
+    if EM_CAPTURE_SAMPLE_RATE < 1 and random.random() >= EM_CAPTURE_SAMPLE_RATE:
+        return
+    # 取数函数本来就会读取完整响应体，这里提前读取不会多发请求
+    content = await response.aread()
+    _get_writer().submit(_exchange_record(response.request, response, content))
+
+
+class CaptureRecordingTransport(httpx.AsyncBaseTransport):
+    """
+    录制经过的全部往返，不采样、不限大小，用于生成回放用的测试数据。
+
+    响应体在传输层读取完毕后原样返回给调用方，录制结果通过 exchanges 获取，
+    再用 write_captured_exchanges 写入文件。
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+        self.exchanges: list[dict] = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self._transport.handle_async_request(request)
+        # 传输层拿到的是未解压的响应体，借助 httpx.Response 按 Content-Encoding 解码
+        decoded = httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=response.stream,
+            request=request,
+        )
+        try:
+            content = await decoded.aread()
+        finally:
+            await decoded.aclose()
+        self.exchanges.append(_exchange_record(request, response, content))
+        headers = [(k, v) for k, v in response.headers.multi_items() if k not in ("content-encoding", "content-length")]
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=headers,
+            content=content,
+            extensions=response.extensions,
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def write_captured_exchanges(path: str, exchanges: Iterable[dict]) -> None:
+    """把往返记录写成与抓取模式相同格式的 gzip JSONL 文件"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for exchange in exchanges:
+            f.write(json.dumps(exchange, ensure_ascii=False))
+            f.write("\n")
+
+
+def iter_captured_exchanges(paths: Iterable[str] | str) -> Iterator[dict]:
+    """按顺序读取抓取文件中的记录，paths 可以是目录、文件或文件列表"""
+    if isinstance(paths, str):
+        if os.path.isdir(paths):
+            paths = sorted(glob.glob(os.path.join(paths, "em_capture_*.jsonl.gz")), key=os.path.getmtime)
+        else:
+            paths = [paths]
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+            except EOFError:
+                # 进程异常退出时最后一个文件可能不完整
+                logger.warning(f"Truncated capture file: {path}")
+
+
+class CaptureReplayTransport(httpx.AsyncBaseTransport):
+    """
+    用抓取的记录回放响应。
+
+    按请求方法和 URL 匹配；同一 URL 抓取了多次时按抓取顺序依次返回，最后一条重复使用。
+    ignore_query_params 中的参数（例如时间戳、jsonp 回调名）不参与匹配。
+    """
+
+    def __init__(self, exchanges: Iterable[dict], ignore_query_params: Iterable[str] = ("_", "cb", "callback")):
+        self._ignore_query_params = frozenset(ignore_query_params)
+        self._exchanges: dict[tuple[str, str], list[dict]] = {}
+        for exchange in exchanges:
+            key = self._key(exchange["method"], httpx.URL(exchange["url"]))
+            self._exchanges.setdefault(key, []).append(exchange)
+        self._cursors: dict[tuple[str, str], int] = {}
+
+    @classmethod
+    def from_path(cls, paths: Iterable[str] | str, **kwargs) -> "CaptureReplayTransport":
+        return cls(iter_captured_exchanges(paths), **kwargs)
+
+    def _key(self, method: str, url: httpx.URL) -> tuple[str, str]:
+        params = sorted((k, v) for k, v in url.params.multi_items() if k not in self._ignore_query_params)
+        return method.upper(), str(url.copy_with(query=None).copy_merge_params(params))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = self._key(request.method, request.url)
+        exchanges = self._exchanges.get(key)
+        if not exchanges:
+            raise httpx.ConnectError(f"No captured response for {request.method} {request.url}", request=request)
+        cursor = self._cursors.get(key, 0)
+        self._cursors[key] = cursor + 1
+        exchange = exchanges[min(cursor, len(exchanges) - 1)]
+        return httpx.Response(
+            status_code=exchange["status_code"],
+            headers=exchange["headers"],
+            content=_decode_body(exchange["body"]),
+            request=request,
+        )
@@ -0,0 +1,414 @@
+"""
+东方财富请求共用的 HTTP 客户端。
+
+所有东方财富取数函数共用一个带连接池的 httpx.AsyncClient，避免每次调用都重新建立 TCP/TLS 连接。
+客户端按域名限流，批量接口并发请求多只股票时不会对同一域名发起过多请求：
+- EM_HOST_MAX_CONCURRENCY: 同一域名同时进行的请求数，默认 10
+- EM_HOST_RATE_PER_SECOND: 同一域名每秒发起的请求数，默认 20
+
+连接失败、超时和 429/5xx 响应按带抖动的指数退避重试，重试次数受全局预算约束，
+上游被限流时不会因为重试放大请求量：
+- EM_RETRY_MAX_ATTEMPTS: 单个请求最多尝试次数（含首次），默认 3
+- EM_RETRY_BACKOFF_SECONDS: 退避基数，第 n 次重试在 0~基数*2^(n-1) 秒间随机等待，默认 0.5
+- EM_RETRY_BUDGET_RATIO: 每个请求为预算增加的重试次数，默认 0.2，即重试不超过请求数的 20%
+- EM_RETRY_BUDGET_MIN_PER_SECOND: 请求很少时每秒保底的重试次数，默认 1
+
+同一域名连续失败后熔断，熔断期间直接抛出 EmHostUnavailableError，由 em_cached 改用过期缓存：
+- EM_BREAKER_FAILURE_THRESHOLD: 连续失败多少次后熔断，默认 5，0 表示不熔断
+- EM_BREAKER_RESET_SECONDS: 熔断多久后放行一个探测请求，探测成功即恢复，默认 30
+
+限速等待、429、重试、预算耗尽和熔断的次数可以通过 get_em_http_metrics 按域名查看。
+开启 EM_CAPTURE_ENABLED 时客户端会挂上抓取钩子，见 trading_em_capture。
+"""
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from novas_mcp.trading.trading_em_capture import capture_enabled, capture_response_hook, close_capture
+
+EM_HTTP_HEADERS_DEFAULT = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
+}
+EM_HOST_MAX_CONCURRENCY = int(os.environ.get("EM_HOST_MAX_CONCURRENCY", "10"))
+EM_HOST_RATE_PER_SECOND = float(os.environ.get("EM_HOST_RATE_PER_SECOND", "20"))
+EM_RETRY_MAX_ATTEMPTS = int(os.environ.get("EM_RETRY_MAX_ATTEMPTS", "3"))
+EM_RETRY_BACKOFF_SECONDS = float(os.environ.get("EM_RETRY_BACKOFF_SECONDS", "0.5"))
+EM_RETRY_BUDGET_RATIO = float(os.environ.get("EM_RETRY_BUDGET_RATIO", "0.2"))
+EM_RETRY_BUDGET_MIN_PER_SECOND = float(os.environ.get("EM_RETRY_BUDGET_MIN_PER_SECOND", "1"))
+EM_BREAKER_FAILURE_THRESHOLD = int(os.environ.get("EM_BREAKER_FAILURE_THRESHOLD", "5"))
+EM_BREAKER_RESET_SECONDS = float(os.environ.get("EM_BREAKER_RESET_SECONDS", "30"))
+
+# 限流和网关、服务暂时不可用的响应可以重试
+_RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# Retry-After 超过这个秒数时不再等待，交给熔断和缓存处理
+_MAX_RETRY_AFTER_SECONDS = 10.0
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class EmHostUnavailableError(httpx.TransportError):
+    """域名处于熔断状态，请求没有发出"""
+
+
+_metrics: "defaultdict[str, Counter]" = defaultdict(Counter)
+
+
+def record_em_http_event(host: str, event: str, count: int = 1) -> None:
+    _metrics[host][event] += count
+
+
+def get_em_http_metrics() -> dict[str, dict[str, int]]:
+    """
+    按域名统计的计数：
+    requests（发出的请求，含重试）、throttled（本地限速等待）、upstream_throttled（429 响应）、
+    failures、retries、retry_budget_exhausted、breaker_opened、breaker_rejected；
+    em_cache 下的 stale_served 为上游失败时改用过期缓存的次数。
+    """
+    return {host: dict(counter) for host, counter in _metrics.items()}
+
+
+def reset_em_http_metrics() -> None:
+    _metrics.clear()
+
+
+class _HostRateLimiter:
+    """单个域名的并发数限制和令牌桶限速"""
+
+    def __init__(self, max_concurrency: int, rate_per_second: float):
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._rate = rate_per_second
+        self._tokens = rate_per_second
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def _take_token(self) -> bool:
+        if self._rate <= 0:
+            return False
+        waited = False
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self._rate, self._tokens + (now - self._updated_at) * self._rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                waited = True
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+    async def acquire(self) -> bool:
+        """获取并发名额和令牌，返回是否因限速等待过"""
+        await self._semaphore.acquire()
+        try:
+            return await self._take_token()
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    def release(self) -> None:
+        self._semaphore.release()
+
+
+class _RetryBudget:
+    """
+    所有域名共用的重试预算。
+
+    每个新请求存入 ratio 个令牌，另外按时间补充保底额度，每次重试消耗一个令牌；
+    上游大面积失败时重试量被限制在请求量的固定比例内。
+    """
+
+    def __init__(self, ratio: float, min_per_second: float):
+        self._ratio = ratio
+        self._min_per_second = min_per_second
+        self._max_tokens = max(10.0, 10 * min_per_second)
+        self._tokens = self._max_tokens
+        self._updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._max_tokens, self._tokens + (now - self._updated_at) * self._min_per_second)
+        self._updated_at = now
+
+    def deposit(self) -> None:
+        self._refill()
+        self._tokens = min(self._max_tokens, self._tokens + self._ratio)
+
+    def try_withdraw(self) -> bool:
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+
+class _CircuitBreaker:
+    """
+    单个域名的熔断器。
+
+    连续失败达到阈值后熔断，冷却期内的请求直接失败；冷却结束后只放行一个探测请求，
+    探测成功恢复正常，失败则重新开始冷却。
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self._failure_threshold = failure_threshold
+        self._reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    def before_request(self, request: httpx.Request) -> bool:
+        """熔断中抛出 EmHostUnavailableError，返回本次请求是否为探测请求"""
+        if self._opened_at is None:
+            return False
+        if self._probing or time.monotonic() - self._opened_at < self._reset_seconds:
+            raise EmHostUnavailableError(f"Circuit breaker is open for {request.url.host}", request=request)
+        self._probing = True
+        return True
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> bool:
+        """记录一次失败，返回是否因此熔断"""
+        self._failures += 1
+        if self._probing:
+            self._probing = False
+            self._opened_at = time.monotonic()
+            return True
+        if self._opened_at is None and 0 < self._failure_threshold <= self._failures:
+            self._opened_at = time.monotonic()
+            return True
+        return False
+
+    def abandon_probe(self) -> None:
+        """探测请求被取消，允许下一个请求重新探测"""
+        self._probing = False
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """响应体读取完毕或关闭时释放域名的并发名额"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, limiter: _HostRateLimiter):
+        self._stream = stream
+        self._limiter: Optional[_HostRateLimiter] = limiter
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._limiter is not None:
+                self._limiter.release()
+                self._limiter = None
+
+
+class _RateLimitedTransport(httpx.AsyncBaseTransport):
+    """按域名限流、熔断，失败的幂等请求在重试预算内退避重试"""
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        max_concurrency: int,
+        rate_per_second: float,
+        max_attempts: int = 1,
+        backoff_seconds: float = 0.0,
+        retry_budget: Optional[_RetryBudget] = None,
+        breaker_failure_threshold: int = 0,
+        breaker_reset_seconds: float = 0.0,
+    ):
+        self._transport = transport
+        self._max_concurrency = max_concurrency
+        self._rate_per_second = rate_per_second
+        self._max_attempts = max_attempts
+        self._backoff_seconds = backoff_seconds
+        self._retry_budget = retry_budget
+        self._breaker_failure_threshold = breaker_failure_threshold
+        self._breaker_reset_seconds = breaker_reset_seconds
+        self._limiters: dict[str, _HostRateLimiter] = {}
+        self._breakers: dict[str, _CircuitBreaker] = {}
+
+    def _limiter(self, host: str) -> _HostRateLimiter:
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            limiter = _HostRateLimiter(self._max_concurrency, self._rate_per_second)
+            self._limiters[host] = limiter
+        return limiter
+
+    def _breaker(self, host: str) -> _CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = _CircuitBreaker(self._breaker_failure_threshold, self._breaker_reset_seconds)
+            self._breakers[host] = breaker
+        return breaker
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        limiter = self._limiter(host)
+        if await limiter.acquire():
+            record_em_http_event(host, "throttled")
+        record_em_http_event(host, "requests")
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            limiter.release()
+            raise
+        if response.is_stream_consumed:
+            # 响应体已在传输层读取完毕，不会再有关闭回调
+            limiter.release()
+        else:
+            response.stream = _ReleasingStream(response.stream, limiter)
+        return response
+
+    def _record_failure(self, breaker: _CircuitBreaker, host: str) -> None:
+        record_em_http_event(host, "failures")
+        if breaker.record_failure():
+            record_em_http_event(host, "breaker_opened")
+            logger.warning(f"Circuit breaker opened for {host}, retry after {self._breaker_reset_seconds}s")
+
+    def _can_retry(self, request: httpx.Request, attempt: int) -> bool:
+        if request.method not in _IDEMPOTENT_METHODS or attempt >= self._max_attempts:
+            return False
+        if self._retry_budget is not None and not self._retry_budget.try_withdraw():
+            record_em_http_event(request.url.host, "retry_budget_exhausted")
+            return False
+        record_em_http_event(request.url.host, "retries")
+        return True
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        # full jitter，避免多个请求同时重试
+        delay = random.uniform(0, self._backoff_seconds * 2 ** (attempt - 1))
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get("retry-after", ""))
+            except ValueError:
+                retry_after = 0.0
+            delay = max(delay, min(retry_after, _MAX_RETRY_AFTER_SECONDS))
+        return delay
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        breaker = self._breaker(host)
+        if self._retry_budget is not None:
+            self._retry_budget.deposit()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                probe = breaker.before_request(request)
+            except EmHostUnavailableError:
+                record_em_http_event(host, "breaker_rejected")
+                raise
+            try:
+                response = await self._send(request)
+            except httpx.TransportError as e:
+                self._record_failure(breaker, host)
+                if not self._can_retry(request, attempt):
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.info(f"Retry {request.method} {request.url} in {delay:.2f}s after {e!r}")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                if probe:
+                    breaker.abandon_probe()
+                raise
+
+            if response.status_code not in _RETRYABLE_STATUS_CODES:
+                breaker.record_success()
+                return response
+            if response.status_code == 429:
+                record_em_http_event(host, "upstream_throttled")
+            self._record_failure(breaker, host)
+            if not self._can_retry(request, attempt):
+                return response
+            delay = self._retry_delay(attempt, response)
+            logger.info(f"Retry {request.method} {request.url} in {delay:.2f}s after HTTP {response.status_code}")
+            await response.aclose()
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_transport_override: Optional[httpx.AsyncBaseTransport] = None
+
+
+def create_em_http_transport() -> httpx.AsyncBaseTransport:
+    """默认传输：带连接池的 HTTP 传输，外层按域名限流、重试和熔断"""
+    return _RateLimitedTransport(
+        httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        ),
+        EM_HOST_MAX_CONCURRENCY,
+        EM_HOST_RATE_PER_SECOND,
+        max_attempts=EM_RETRY_MAX_ATTEMPTS,
+        backoff_seconds=EM_RETRY_BACKOFF_SECONDS,
+        retry_budget=_RetryBudget(EM_RETRY_BUDGET_RATIO, EM_RETRY_BUDGET_MIN_PER_SECOND),
+        breaker_failure_threshold=EM_BREAKER_FAILURE_THRESHOLD,
+        breaker_reset_seconds=EM_BREAKER_RESET_SECONDS,
+    )
+
+
+def get_em_http_client() -> httpx.AsyncClient:
+    """获取共用的东方财富客户端，事件循环变化（例如多次 asyncio.run）时重新创建"""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            headers=EM_HTTP_HEADERS_DEFAULT,
+            transport=_transport_override or create_em_http_transport(),
+            event_hooks={"response": [capture_response_hook]} if capture_enabled() else None,
+        )
+        _client_loop = loop
+    return _client
+
+
+@asynccontextmanager
+async def em_http_client() -> AsyncIterator[httpx.AsyncClient]:
+    """以 async with 的形式使用共用客户端，退出时不关闭连接池"""
+    yield get_em_http_client()
+
+
+@asynccontextmanager
+async def use_em_http_transport(transport: httpx.AsyncBaseTransport) -> AsyncIterator[None]:
+    """
+    在 async with 范围内让共用客户端改用指定的传输（例如录制或回放），退出时恢复默认传输。
+    进入和退出时都会关闭当前客户端，之后的请求使用新建的客户端。
+    """
+    global _transport_override
+    await _close_client()
+    _transport_override = transport
+    try:
+        yield
+    finally:
+        _transport_override = None
+        await _close_client()
+
+
+async def _close_client() -> None:
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        _client_loop = None
+
+
+async def close_em_http_client() -> None:
+    await _close_client()
+    await asyncio.to_thread(close_capture)
@@ -0,0 +1,228 @@
+"""
+本地 K 线列式存储。
+
+每个 (市场, 代码, 周期) 保存为一个 Parquet 文件
+``{EM_KLINE_STORE_DIR}/{period}/{market}_{symbol}.parquet``，文件元数据记录已覆盖的日期区间。
+查询时只向东方财富请求缺失的部分：
+- 早于已覆盖起点的区间（首次请求或向前扩展）
+- 最后一根已存 K 线之后的尾部（最后一根可能是未走完的当日/当周 K 线，会一并刷新）
+
+补取的区间总是与已覆盖区间相接，请求远离已覆盖区间时连同中间的空档一起获取，
+所以覆盖区间始终是连续的一段，其中没有未获取过的日期。
+东方财富对某个区间没有返回任何 K 线时（可能是临时故障）不扩展覆盖区间，下次请求会重新获取。
+"今天"按北京时间计算，与服务器所在时区无关。
+
+只存储不复权数据，除权除息不会改写历史，追加是安全的。
+"""
+import asyncio
+import io
+import json
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+import pandas as pd
+
+from novas_mcp.trading.trading_em_cache import CN_TZ
+
+EM_KLINE_STORE_DIR = os.environ.get("EM_KLINE_STORE_DIR", "./data/em_klines")
+
+KLINE_COLUMNS = [
+    "日期", "开盘", "收盘", "最高", "最低", "成交量", "成交额", "振幅", "涨跌幅", "涨跌额", "换手率",
+]
+_METADATA_KEY = b"novas_kline_coverage"
+
+
+def parse_klines(klines: list[str]) -> pd.DataFrame:
+    """
+    一次性解析东方财富 K 线字符串（"日期,开盘,收盘,..."），返回按日期升序的 DataFrame。
+
+    所有行拼接后交给 C 实现的 CSV 解析器，数值列直接解析为数字，无法解析的值为 NaN。
+    """
+    if not klines:
+        return pd.DataFrame({column: pd.Series(dtype="float64") for column in KLINE_COLUMNS}).astype({"日期": str})
+    df = pd.read_csv(
+        io.StringIO("\n".join(klines)),
+        header=None,
+        names=KLINE_COLUMNS,
+        usecols=range(len(KLINE_COLUMNS)),
+        dtype={"日期": str},
+        na_values=["-", ""],
+    )
+    for column in KLINE_COLUMNS[1:]:
+        if df[column].dtype == object:
+            df[column] = pd.to_numeric(df[column], errors="coerce")
+    return df.sort_values("日期", kind="stable").reset_index(drop=True)
+
+
+class KlineStore:
+    """按 (市场, 代码, 周期) 存储 K 线的本地 Parquet 存储"""
+
+    def __init__(self, base_dir: str = EM_KLINE_STORE_DIR):
+        self.base_dir = base_dir
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    def _path(self, market: str, symbol: str, period: str) -> str:
+        return os.path.join(self.base_dir, period, f"{market}_{symbol}.parquet")
+
+    def lock(self, market: str, symbol: str, period: str) -> asyncio.Lock:
+        """同一文件的读-补-写串行执行"""
+        return self._locks.setdefault(self._path(market, symbol, period), asyncio.Lock())
+
+    def load(self, market: str, symbol: str, period: str) -> tuple[Optional[pd.DataFrame], Optional[dict]]:
+        """读取已存 K 线和覆盖区间 {"from": 日期, "to": 日期}，不存在时返回 (None, None)"""
+        import pyarrow.parquet as pq
+
+        path = self._path(market, symbol, period)
+        if not os.path.exists(path):
+            return None, None
+        table = pq.read_table(path)
+        metadata = table.schema.metadata or {}
+        coverage = json.loads(metadata[_METADATA_KEY]) if _METADATA_KEY in metadata else None
+        return table.to_pandas(), coverage
+
+    def save(self, market: str, symbol: str, period: str, df: pd.DataFrame, coverage: dict) -> None:
+        """原子写入 K 线和覆盖区间"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path = self._path(market, symbol, period)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        table = pa.Table.from_pandas(df[KLINE_COLUMNS], preserve_index=False)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            _METADATA_KEY: json.dumps(coverage).encode("utf-8"),
+        })
+        temp_path = f"{path}.{uuid.uuid4()}.tmp"
+        pq.write_table(table, temp_path)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def missing_ranges(
+        stored: Optional[pd.DataFrame],
+        coverage: Optional[dict],
+        start_date: str,
+        end_date: str,
+        today: Optional[str] = None,
+    ) -> list[tuple[str, str]]:
+        """
+        计算需要从东方财富获取的日期区间（含两端，格式 YYYY-MM-DD）。
+
+        Args:
+            stored: 已存 K 线
+            coverage: 已覆盖区间
+            start_date: 请求起始日期
+            end_date: 请求结束日期
+            today: 今天的日期，默认取北京时间的当前日期
+        """
+        today = today or _cn_today()
+        end_date = min(end_date, today)
+        if start_date > end_date:
+            return []
+        if stored is None or coverage is None:
+            return [(start_date, end_date)]
+
+        # 区间都延伸到已覆盖区间为止，中间的空档一并获取，覆盖区间保持连续
+        ranges = []
+        if start_date < coverage["from"]:
+            day_before = (datetime.strptime(coverage["from"], "%Y-%m-%d") - timedelta(days=1)).strftime("%Y-%m-%d")
+            ranges.append((start_date, day_before))
+        # 覆盖到今天时最后一根 K 线可能还在变化
+        if end_date > coverage["to"] or (end_date == coverage["to"] and coverage["to"] >= today):
+            last_bar = stored["日期"].iloc[-1] if len(stored) else coverage["to"]
+            ranges.append((min(last_bar, coverage["to"]), end_date))
+        return ranges
+
+    @staticmethod
+    def merge(
+        stored: Optional[pd.DataFrame],
+        coverage: Optional[dict],
+        fetched: list[tuple[tuple[str, str], pd.DataFrame]],
+        today: Optional[str] = None,
+    ) -> tuple[pd.DataFrame, Optional[dict]]:
+        """
+        合并新获取的 K 线（同日期以新数据为准），返回合并结果和新的覆盖区间。
+        只有返回了 K 线的区间计入覆盖区间，没有任何覆盖时覆盖区间为 None。
+        """
+        today = today or _cn_today()
+        frames = [stored] if stored is not None else []
+        frames += [df for _, df in fetched if df is not None]
+        merged = pd.concat(frames, ignore_index=True) if frames else parse_klines([])
+        merged = merged.drop_duplicates("日期", keep="last").sort_values("日期", kind="stable").reset_index(drop=True)
+
+        covered = [(start, min(end, today)) for (start, end), df in fetched if df is not None and len(df)]
+        starts = [start for start, _ in covered] + ([coverage["from"]] if coverage else [])
+        ends = [end for _, end in covered] + ([coverage["to"]] if coverage else [])
+        if not starts:
+            return merged, None
+        return merged, {"from": min(starts), "to": max(ends)}
+
+
+def _cn_today() -> str:
+    return datetime.now(CN_TZ).strftime("%Y-%m-%d")
+
+
+_kline_store: Optional[KlineStore] = None
+
+
+def get_kline_store() -> KlineStore:
+    global _kline_store
+    if _kline_store is None:
+        _kline_store = KlineStore()
+    return _kline_store
+
+
+if __name__ == "__main__":
+    # 500 只股票 × 10 年日 K 线：逐字段 split 解析 vs 向量化解析，以及本地存储的写入与区间读取
+    import tempfile
+    import time
+
+    import numpy as np
+
+    num_symbols, num_days = 500, 2430
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2015-01-01", periods=num_days).strftime("%Y-%m-%d").tolist()
+    symbols = [f"{600000 + i}" for i in range(num_symbols)]
+    all_klines = []
+    for _ in symbols:
+        close = 10 + np.cumsum(rng.normal(0, 0.2, num_days))
+        all_klines.append([
+            f"{d},{c:.2f},{c:.2f},{c + 0.1:.2f},{c - 0.1:.2f},{v},{v * c:.1f},1.23,0.45,0.05,0.67"
+            for d, c, v in zip(dates, close, rng.integers(1000, 100000, num_days))
+        ])
+
+    start = time.perf_counter()
+    for symbol, klines in zip(symbols, all_klines):
+        rows = []
+        for kline in klines:
+            rows.append({
+                "日期": kline.split(",")[0], "股票代码": symbol, "开盘": kline.split(",")[1],
+                "收盘": kline.split(",")[2], "最高": kline.split(",")[3], "最低": kline.split(",")[4],
+                "成交量": kline.split(",")[5], "成交额": kline.split(",")[6], "振幅": kline.split(",")[7],
+                "涨跌幅": kline.split(",")[8], "涨跌额": kline.split(",")[9], "换手率": kline.split(",")[10],
+            })
+        df = pd.DataFrame(rows)
+        for column in KLINE_COLUMNS[1:]:
+            df[column] = pd.to_numeric(df[column], errors="coerce")
+    print(f"legacy split parse: {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    parsed = [parse_klines(klines) for klines in all_klines]
+    print(f"vectorized parse:   {time.perf_counter() - start:.2f}s")
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        store = KlineStore(base_dir)
+        coverage = {"from": dates[0], "to": dates[-1]}
+        start = time.perf_counter()
+        for symbol, df in zip(symbols, parsed):
+            store.save("SH", symbol, "daily", df, coverage)
+        print(f"store write:        {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        for symbol in symbols:
+            df, _ = store.load("SH", symbol, "daily")
+            df = df[(df["日期"] >= "2023-01-01") & (df["日期"] <= "2023-12-31")]
+        print(f"store read 1 year:  {time.perf_counter() - start:.2f}s")
+        stored, coverage = store.load("SH", symbols[0], "daily")
+        print("missing ranges, cached symbol up to today:", KlineStore.missing_ranges(stored, coverage, "2020-01-01", dates[-1], today=dates[-1]))
@@ -1,21 +1,22 @@
+import asyncio
+import os
 from novas_mcp.trading_core import MarketCode
-import httpx
+from novas_mcp.trading.trading_em_cache import DAY, HOUR, MINUTE, em_cached
+from novas_mcp.trading.trading_em_http import em_http_client
 import json
 from datetime import datetime, timedelta
 from typing import Optional
 import markdownify
 import re
 
-EM_HTTP_HEADERS_DEFAULT = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
-}
-
 from pydantic import BaseModel, Field
 import logging
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+EM_CONTENT_FETCH_CONCURRENCY = int(os.environ.get("EM_CONTENT_FETCH_CONCURRENCY", "10"))
+
 class EmNewsFetchResult(BaseModel):
     source: Optional[str] = Field(default=None, description="The source of the news")
     url: str = Field(description="The url of the news")
@@ -35,9 +36,8 @@ class EmNewsFetchResult(BaseModel):
     )
 
 
-async def em_fetch_news_content(
-    url: str, include_markdown: bool = True, redirect_count: int = 0
-) -> tuple[str, str, str]:
+def _clean_content_body(content_body_html, include_markdown: bool) -> tuple[str, str, str]:
+    """从正文节点提取文本、清理后的 HTML 和 Markdown"""
     import lxml.html
     from lxml.html.clean import Cleaner
 
@@ -47,8 +47,69 @@ async def em_fetch_news_content(
         style=False,
         inline_style=False,
     )
+    content_text = content_body_html.text_content()
+    if content_text:
+        content_text = re.sub(r' +', ' ', content_text)
+
+    content_html = cleaner.clean_html(
+        lxml.html.tostring(
+            content_body_html, pretty_print=True, encoding="unicode", method="html"
+        )
+    )
+    if include_markdown:
+        content_markdown = markdownify.markdownify(content_html)
+    else:
+        content_markdown = None
+    return content_text, content_html, content_markdown
+
+
+def _parse_news_content(html: str, include_markdown: bool) -> tuple[str, str, str]:
+    import lxml.html
+
+    doc = lxml.html.fromstring(html)
+    path = "//div[@class='main']/div[@class='contentwrap']/div[@class='contentbox']/div[@class='mainleft']"
+    path = path + "/div[@class='zwinfos']/div[@id='ContentBody']"
+    return _clean_content_body(doc.xpath(path)[0], include_markdown)
+
+
+def _parse_research_report_content(html: str, include_markdown: bool) -> tuple[str, str, str]:
+    import lxml.html
+
+    doc = lxml.html.fromstring(html)
+    # path = "//div[@class='main']/div[@class='main']/div[@class='zw-content']/div[@class='left']"
+    # path = path + "/div[@class='zwinfos']/div[@id='ContentBody']"
+    return _clean_content_body(doc.xpath("//div[@id='ctx-content']")[0], include_markdown)
+
+
+async def _fetch_contents(items: list, fetch_content) -> list:
+    """
+    并发获取正文并写入 content_text、content_html、content_markdown，保持原有顺序。
+
+    同时进行的请求数不超过 EM_CONTENT_FETCH_CONCURRENCY，同一域名还受共用客户端的限流约束。
+    获取或解析失败的条目会被跳过，不影响其他条目。
+    """
+    semaphore = asyncio.Semaphore(EM_CONTENT_FETCH_CONCURRENCY)
+
+    async def fetch_one(item):
+        async with semaphore:
+            try:
+                item.content_text, item.content_html, item.content_markdown = await fetch_content(item.url)
+                return item
+            except Exception as e:
+                logger.warning(f"Skip {item.url}, failed to fetch content: {e!r}")
+                return None
+
+    fetched = await asyncio.gather(*(fetch_one(item) for item in items))
+    return [item for item in fetched if item is not None]
+
+
+# 已发布的正文不会变化
+@em_cached(ttl=DAY)
+async def em_fetch_news_content(
+    url: str, include_markdown: bool = True, redirect_count: int = 0
+) -> tuple[str, str, str]:
     url = url.replace("http://", "https://")
-    async with httpx.AsyncClient(headers=EM_HTTP_HEADERS_DEFAULT) as client:
+    async with em_http_client() as client:
         response = await client.get(url)
         if response.status_code == 302:
             logger.info(f"302 redirect to {response.headers['Location']}")
@@ -59,29 +120,17 @@ async def em_fetch_news_content(
                 return await em_fetch_news_content(
                     response.headers["Location"], include_markdown, redirect_count + 1
                 )
+        response.raise_for_status()
 
-        doc = lxml.html.fromstring(response.text)
-        path = "//div[@class='main']/div[@class='contentwrap']/div[@class='contentbox']/div[@class='mainleft']"
-        path = path + "/div[@class='zwinfos']/div[@id='ContentBody']"
-        content_body_html = doc.xpath(path)[0]
-
-        content_text = content_body_html.text_content()
-        if content_text:
-            content_text = re.sub(r' +', ' ', content_text)
-            
-        content_html = cleaner.clean_html(
-            lxml.html.tostring(
-                content_body_html, pretty_print=True, encoding="unicode", method="html"
-            )
-        )
-        if include_markdown:
-            content_markdown = markdownify.markdownify(content_html)
-        else:
-            content_markdown = None
-        logger.info(f"{url}:\n{content_text}")
-        return content_text, content_html, content_markdown
+    # lxml 和 markdownify 的解析放到线程中，不阻塞事件循环
+    content_text, content_html, content_markdown = await asyncio.to_thread(
+        _parse_news_content, response.text, include_markdown
+    )
+    logger.info(f"{url}:\n{content_text}")
+    return content_text, content_html, content_markdown
 
 
+@em_cached(ttl=10 * MINUTE)
 async def em_retrieve_company_news(
     company_name: str,
     symbol: str,
@@ -115,7 +164,7 @@ async def em_retrieve_company_news(
     url = f"https://search-api-web.eastmoney.com/search/jsonp?cb=jQuery35107699970789290389_{_t}&param={params_encoded}&_={_t}"
     # print(url)
     results: list[EmNewsFetchResult] = []
-    async with httpx.AsyncClient(headers=EM_HTTP_HEADERS_DEFAULT) as client:
+    async with em_http_client() as client:
         response = await client.get(url)
         response.raise_for_status()
         # print(response.text)
@@ -139,33 +188,17 @@ async def em_retrieve_company_news(
             )
 
         for r in results:
-            if r.url is None:
-                continue
             if r.snippet is not None:
                 r.snippet = r.snippet.replace("<em>", "").replace("</em>", "")
-            content_text, content_html, content_markdown = await em_fetch_news_content(
-                r.url
-            )
-            r.content_text = content_text
-            r.content_html = content_html
-            r.content_markdown = content_markdown
 
-    return results
+    return await _fetch_contents(results, em_fetch_news_content)
 
 
+@em_cached(ttl=DAY)
 async def em_fetch_research_report_content(
     url: str, include_markdown: bool = True, redirect_count: int = 0
 ) -> tuple[str, str, str]:
-    import lxml.html
-    from lxml.html.clean import Cleaner
-    cleaner = Cleaner(
-        scripts=False,
-        javascript=False,
-        style=False,
-        inline_style=False,
-    )
-
-    async with httpx.AsyncClient(headers=EM_HTTP_HEADERS_DEFAULT) as client:
+    async with em_http_client() as client:
         response = await client.get(url)
         if response.status_code == 302:
             logger.info(f"302 redirect to {response.headers['Location']}")
@@ -176,28 +209,10 @@ async def em_fetch_research_report_content(
                 return await em_fetch_research_report_content(
                     response.headers["Location"], include_markdown, redirect_count + 1
                 )
-        else:
-            response.raise_for_status()
-            doc = lxml.html.fromstring(response.text)
-            # path = "//div[@class='main']/div[@class='main']/div[@class='zw-content']/div[@class='left']"
-            # path = path + "/div[@class='zwinfos']/div[@id='ContentBody']"
-            content_body_html = doc.xpath("//div[@id='ctx-content']")[0]
-            content_text = content_body_html.text_content()
-            if content_text:
-                content_text = re.sub(r' +', ' ', content_text)
-            
-            content_html = cleaner.clean_html(
-                lxml.html.tostring(
-                    content_body_html, pretty_print=True, encoding="unicode", method="html"
-                )
-            )
-            if include_markdown:
-                content_markdown = markdownify.markdownify(content_html)
-            else:
-                content_markdown = None
-            
-            return content_text, content_html, content_markdown
-   
+        response.raise_for_status()
+
+    return await asyncio.to_thread(_parse_research_report_content, response.text, include_markdown)
+
 class EmResearchReport(BaseModel):
     title: Optional[str] = Field(default=None, description="The title of the research report")
     url: str = Field(description="The url of the research report")
@@ -210,6 +225,7 @@ class EmResearchReport(BaseModel):
     content_html: Optional[str] = Field(default=None, description="The content of the research report in html format")
     content_markdown: Optional[str] = Field(default=None, description="The content of the research report in markdown format")
 
+@em_cached(ttl=HOUR)
 async def em_retrieve_company_research_report(
     market_code: MarketCode,
     symbol: str,
@@ -228,13 +244,10 @@ async def em_retrieve_company_research_report(
         
     url = f"https://reportapi.eastmoney.com/report/list?cb=datatable1503839&pageNo=1&pageSize=50&code={symbol}&industryCode=*&industry=*&rating=*&ratingchange=*&beginTime={start_date}&endTime={end_date}&fields=&qType=0&p=1&pageNum=1&pageNumber=1&_={_t}"
 
-    async with httpx.AsyncClient(headers=EM_HTTP_HEADERS_DEFAULT) as client:
+    async with em_http_client() as client:
         response = await client.get(url)
         response.raise_for_status()
         response_text = response.text.replace("datatable1503839(", "").strip(")").strip(";")
-        with open(f"./logs/em_retrieve_company_research_report_{market_code.value}_{symbol}_{start_date}_{end_date}_raw.json", "w") as f:
-            f.write(response_text)
-            
         response_json = json.loads(response_text)
         if "data" in response_json:
             data = response_json["data"]
@@ -251,22 +264,11 @@ async def em_retrieve_company_research_report(
                     industry=item["indvInduName"],
                 )
                 results.append(r)
-            for r in results:
-                content_text, content_html, content_markdown = await em_fetch_research_report_content(
-                    r.url, include_markdown=True
-                )
-                r.content_text = content_text
-                r.content_html = content_html
-                r.content_markdown = content_markdown
-                # print(f"content_text: \n{content_text}")
-                # print(f"content_html: \n{content_html}")
-                # print(f"content_markdown: \n{content_markdown}")
-            return results
+            return await _fetch_contents(results, em_fetch_research_report_content)
         else:
             return []
 
 if __name__ == "__main__":
-    import asyncio
     logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
     # asyncio.run(em_retrieve_company_news("贵州茅台", "600519"))
     asyncio.run(em_retrieve_company_research_report(MarketCode.SH, "600519"))
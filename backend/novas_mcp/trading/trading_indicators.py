@@ -0,0 +1,358 @@
+"""
+向量化技术指标计算。
+
+用 NumPy 一次性计算请求的全部指标，计算口径与 stockstats 保持一致：
+- 移动平均、移动求和、移动标准差使用 min_periods=1（前几根 K 线用已有数据计算）
+- EMA 为 span 形式、adjust=True 的指数加权平均；RSI、ATR 使用 alpha=1/N 的平滑移动平均（SMMA）
+- 典型价格在有成交额时为 成交额/成交量，否则为 (最高+最低+收盘)/3
+- 差分、前收盘的第一根 K 线用自身补齐
+
+支持的指标：close_N_sma、close_N_ema、macd、macds、macdh、rsi、rsi_N、boll、boll_ub、boll_lb、
+atr、atr_N、vwma、vwma_N、mfi、mfi_N。
+
+计算结果按 (市场, 代码, 周期, 最后一根 K 线) 缓存在进程内，同一根 K 线上的重复请求不再计算。
+"""
+import re
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+MACD_WINDOWS = (12, 26, 9)
+BOLL_WINDOW = 20
+BOLL_STD_TIMES = 2
+DEFAULT_WINDOWS = {"rsi": 14, "atr": 14, "vwma": 14, "mfi": 14}
+
+_INDICATOR_PATTERN = re.compile(
+    r"^(?:close_(?P<ma_window>\d+)_(?P<ma>sma|ema)|(?P<macd>macd[sh]?)|(?P<boll>boll(?:_ub|_lb)?)|"
+    r"(?P<name>rsi|atr|vwma|mfi)(?:_(?P<window>\d+))?)$"
+)
+
+
+def is_supported_indicator(indicator: str) -> bool:
+    """指标名是否可以由本模块计算"""
+    match = _INDICATOR_PATTERN.match(indicator)
+    if match is None:
+        return False
+    window = match.group("ma_window") or match.group("window")
+    return window is None or int(window) > 0
+
+
+def indicator_warmup_bars(indicators: Iterable[str]) -> int:
+    """指标收敛所需的 K 线根数，用于在展示区间之前多取历史数据"""
+    bars = 0
+    for indicator in indicators:
+        match = _INDICATOR_PATTERN.match(indicator)
+        if match is None:
+            continue
+        if match.group("ma"):
+            window = int(match.group("ma_window"))
+            bars = max(bars, window if match.group("ma") == "sma" else 3 * window)
+        elif match.group("macd"):
+            bars = max(bars, 3 * (MACD_WINDOWS[1] + MACD_WINDOWS[2]))
+        elif match.group("boll"):
+            bars = max(bars, BOLL_WINDOW)
+        else:
+            window = int(match.group("window") or DEFAULT_WINDOWS[match.group("name")])
+            # SMMA 的 alpha 为 1/N，收敛比 EMA 慢
+            bars = max(bars, 6 * window if match.group("name") in ("rsi", "atr") else window)
+    return bars
+
+
+def _decayed_cumsum(values: np.ndarray, decay: float) -> np.ndarray:
+    """s[t] = values[t] + decay * s[t-1]，分块用 cumsum 计算以避免 decay 的负幂溢出"""
+    if decay <= 0.0:
+        return values.astype(np.float64, copy=True)
+    out = np.empty(len(values), dtype=np.float64)
+    block = max(1, int(300.0 / -np.log(decay)))
+    powers = decay ** -np.arange(min(block, len(values)), dtype=np.float64)
+    carry = 0.0
+    for start in range(0, len(values), block):
+        segment = values[start:start + block]
+        scale = powers[:len(segment)]
+        summed = np.cumsum(segment * scale) / scale + carry * decay / scale
+        out[start:start + block] = summed
+        carry = summed[-1]
+    return out
+
+
+def ewm_mean(values: np.ndarray, alpha: float) -> np.ndarray:
+    """等价于 pandas ewm(alpha=alpha, adjust=True, ignore_na=False).mean()"""
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    numerator = _decayed_cumsum(np.where(valid, values, 0.0), 1.0 - alpha)
+    denominator = _decayed_cumsum(valid.astype(np.float64), 1.0 - alpha)
+    return np.divide(numerator, denominator, out=np.full(len(values), np.nan), where=denominator > 0)
+
+
+def ema(values: np.ndarray, window: int) -> np.ndarray:
+    return ewm_mean(values, 2.0 / (window + 1.0))
+
+
+def smma(values: np.ndarray, window: int) -> np.ndarray:
+    return ewm_mean(values, 1.0 / window)
+
+
+def _rolling_sum_and_count(values: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    valid = ~np.isnan(values)
+    sums = np.cumsum(np.where(valid, values, 0.0))
+    counts = np.cumsum(valid, dtype=np.int64)
+    sums[window:] = sums[window:] - sums[:-window]
+    counts[window:] = counts[window:] - counts[:-window]
+    return sums, counts
+
+
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """等价于 pandas rolling(window, min_periods=1).sum()"""
+    sums, counts = _rolling_sum_and_count(np.asarray(values, dtype=np.float64), window)
+    return np.where(counts > 0, sums, np.nan)
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """等价于 pandas rolling(window, min_periods=1).mean()"""
+    sums, counts = _rolling_sum_and_count(np.asarray(values, dtype=np.float64), window)
+    return np.divide(sums, counts, out=np.full(len(sums), np.nan), where=counts > 0)
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """等价于 pandas rolling(window, min_periods=1).std()（ddof=1），按窗口去均值后计算以保证精度"""
+    values = np.asarray(values, dtype=np.float64)
+    padded = np.concatenate([np.full(window - 1, np.nan), values])
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window)
+    valid = ~np.isnan(windows)
+    counts = valid.sum(axis=1)
+    means = np.divide(np.where(valid, windows, 0.0).sum(axis=1), counts, out=np.zeros(len(values)), where=counts > 0)
+    squares = np.where(valid, windows - means[:, None], 0.0) ** 2
+    return np.sqrt(np.divide(squares.sum(axis=1), counts - 1, out=np.full(len(values), np.nan), where=counts > 1))
+
+
+def _previous(values: np.ndarray) -> np.ndarray:
+    """上一根 K 线的值，第一根用自身补齐"""
+    out = np.empty_like(values)
+    if len(values):
+        out[0] = values[0]
+        out[1:] = values[:-1]
+    return out
+
+
+class IndicatorEngine:
+    """
+    对一段 K 线计算技术指标，指标之间共享中间结果（典型价格、真实波幅、MACD 等）。
+
+    Args:
+        close: 收盘价
+        high: 最高价
+        low: 最低价
+        volume: 成交量
+        amount: 成交额，为 None 时典型价格按 (最高+最低+收盘)/3 计算
+    """
+
+    def __init__(
+        self,
+        close: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        volume: np.ndarray,
+        amount: Optional[np.ndarray] = None,
+    ):
+        self.close = np.asarray(close, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+        self.amount = None if amount is None else np.asarray(amount, dtype=np.float64)
+        self._results: dict[str, np.ndarray] = {}
+        self._tp: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_kline_data(cls, kline_data: pd.DataFrame) -> "IndicatorEngine":
+        """由东方财富 K 线 DataFrame（收盘、最高、最低、成交量、成交额列）构造"""
+        return cls(
+            kline_data["收盘"].to_numpy(),
+            kline_data["最高"].to_numpy(),
+            kline_data["最低"].to_numpy(),
+            kline_data["成交量"].to_numpy(),
+            kline_data["成交额"].to_numpy() if "成交额" in kline_data else None,
+        )
+
+    def typical_price(self) -> np.ndarray:
+        if self._tp is None:
+            if self.amount is not None:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    self._tp = self.amount / self.volume
+            else:
+                self._tp = (self.close + self.high + self.low) / 3.0
+        return self._tp
+
+    def true_range(self) -> np.ndarray:
+        prev_close = _previous(self.close)
+        tr = np.maximum(self.high - self.low, np.maximum(np.abs(self.high - prev_close), np.abs(self.low - prev_close)))
+        return np.nan_to_num(tr)
+
+    def _macd(self) -> None:
+        short_window, long_window, signal_window = MACD_WINDOWS
+        macd = ema(self.close, short_window) - ema(self.close, long_window)
+        macds = ema(macd, signal_window)
+        self._results.update(macd=macd, macds=macds, macdh=macd - macds)
+
+    def _boll(self) -> None:
+        middle = rolling_mean(self.close, BOLL_WINDOW)
+        width = BOLL_STD_TIMES * rolling_std(self.close, BOLL_WINDOW)
+        self._results.update(boll=middle, boll_ub=middle + width, boll_lb=middle - width)
+
+    def _rsi(self, window: int) -> np.ndarray:
+        diff = self.close - _previous(self.close)
+        up = smma(np.where(diff > 0, diff, 0.0), window)
+        down = smma(np.where(diff < 0, -diff, 0.0), window)
+        total = up + down
+        rsi = np.divide(100.0 * up, total, out=np.full(len(total), 50.0), where=total != 0)
+        if len(rsi):
+            rsi[0] = 50.0
+        return rsi
+
+    def _vwma(self, window: int) -> np.ndarray:
+        volume_sum = rolling_sum(self.volume, window)
+        price_volume_sum = rolling_sum(self.volume * self.typical_price(), window)
+        return np.divide(price_volume_sum, volume_sum, out=np.zeros(len(volume_sum)), where=volume_sum != 0)
+
+    def _mfi(self, window: int) -> np.ndarray:
+        tp = self.typical_price()
+        money_flow = tp * self.volume
+        tp_diff = tp - _previous(tp)
+        positive = np.cumsum(np.where(tp_diff > 0, money_flow, 0.0))
+        negative = np.cumsum(np.where(tp_diff < 0, money_flow, 0.0))
+        positive[window:] = positive[window:] - positive[:-window]
+        negative[window:] = negative[window:] - negative[:-window]
+        total = positive + negative
+        mfi = np.divide(positive, total, out=np.full(len(total), 0.5), where=total > 0)
+        mfi[:window] = 0.5
+        return mfi
+
+    def compute(self, indicator: str) -> np.ndarray:
+        """计算单个指标，不支持的指标抛出 ValueError"""
+        if indicator in self._results:
+            return self._results[indicator]
+        match = _INDICATOR_PATTERN.match(indicator)
+        if match is None or not is_supported_indicator(indicator):
+            raise ValueError(f"Unsupported indicator: {indicator}")
+
+        if match.group("ma"):
+            window = int(match.group("ma_window"))
+            compute = rolling_mean if match.group("ma") == "sma" else ema
+            self._results[indicator] = compute(self.close, window)
+        elif match.group("macd"):
+            self._macd()
+        elif match.group("boll"):
+            self._boll()
+        else:
+            name = match.group("name")
+            window = int(match.group("window") or DEFAULT_WINDOWS[name])
+            if name == "rsi":
+                self._results[indicator] = self._rsi(window)
+            elif name == "atr":
+                self._results[indicator] = smma(self.true_range(), window)
+            elif name == "vwma":
+                self._results[indicator] = self._vwma(window)
+            else:
+                self._results[indicator] = self._mfi(window)
+        return self._results[indicator]
+
+    def compute_many(self, indicators: Iterable[str]) -> dict[str, np.ndarray]:
+        """计算多个指标，跳过不支持的指标"""
+        return {
+            indicator: self.compute(indicator)
+            for indicator in dict.fromkeys(indicators)
+            if is_supported_indicator(indicator)
+        }
+
+
+INDICATOR_CACHE_MAX_ENTRIES = 256
+_indicator_cache: "OrderedDict[tuple, tuple[IndicatorEngine, pd.Index]]" = OrderedDict()
+
+
+def compute_kline_indicators(
+    key: tuple,
+    kline_data: pd.DataFrame,
+    indicators: Iterable[str],
+) -> dict[str, pd.Series]:
+    """
+    计算 K 线的技术指标，结果以日期为索引。
+
+    同一 (key, 最后一根 K 线) 复用已计算的指标：最后一根 K 线的日期、收盘价或成交量变化后重新计算。
+
+    Args:
+        key: 标识 K 线序列的键，例如 (市场, 代码, 周期, 起始日期)
+        kline_data: 按日期升序的东方财富 K 线数据
+        indicators: 指标名列表，不支持的指标被忽略
+    """
+    if kline_data is None or kline_data.empty:
+        return {}
+    last_bar = kline_data.iloc[-1]
+    cache_key = (*key, len(kline_data), str(last_bar["日期"]), float(last_bar["收盘"]), float(last_bar["成交量"]))
+    cached = _indicator_cache.get(cache_key)
+    if cached is None:
+        index = pd.Index(kline_data["日期"].astype(str).to_numpy(), name="date")
+        cached = (IndicatorEngine.from_kline_data(kline_data), index)
+        _indicator_cache[cache_key] = cached
+        while len(_indicator_cache) > INDICATOR_CACHE_MAX_ENTRIES:
+            _indicator_cache.popitem(last=False)
+    _indicator_cache.move_to_end(cache_key)
+
+    engine, index = cached
+    return {
+        indicator: pd.Series(values, index=index, name=indicator)
+        for indicator, values in engine.compute_many(indicators).items()
+    }
+
+
+if __name__ == "__main__":
+    # 500 只股票 × 10 年日 K 线的计算耗时，与 stockstats 的一致性由 tests/test_trading_indicators.py 校验
+    import time
+
+    from stockstats import wrap
+
+    indicators = [
+        "close_50_sma", "close_200_sma", "close_10_ema", "macd", "macds", "macdh", "rsi",
+        "boll", "boll_ub", "boll_lb", "atr", "vwma", "mfi",
+    ]
+    num_symbols, num_days = 500, 2430
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2015-01-01", periods=num_days).strftime("%Y-%m-%d")
+    frames = []
+    for i in range(num_symbols):
+        close = np.round(20 + np.cumsum(rng.normal(0, 0.3, num_days)).clip(-15, None), 2)
+        volume = rng.integers(0 if i % 50 == 0 else 1000, 100000, num_days).astype(np.int64)
+        frames.append(pd.DataFrame({
+            "日期": dates,
+            "收盘": close,
+            "最高": close + rng.uniform(0, 0.5, num_days).round(2),
+            "最低": close - rng.uniform(0, 0.5, num_days).round(2),
+            "成交量": volume,
+            "成交额": (volume * close * 100).round(1),
+        }))
+    for i in range(0, num_symbols, 100):
+        frames[i].loc[[5, 6], "收盘"] = frames[i].loc[[4, 4], "收盘"].to_numpy()
+
+    def stockstats_indicators(kline_data: pd.DataFrame) -> dict[str, np.ndarray]:
+        kdf = pd.DataFrame({
+            "date": kline_data["日期"], "amount": kline_data["成交额"], "close": kline_data["收盘"],
+            "high": kline_data["最高"], "low": kline_data["最低"], "volume": kline_data["成交量"],
+        })
+        sdf = wrap(kdf)
+        return {indicator: sdf[indicator].to_numpy(dtype=np.float64) for indicator in indicators}
+
+    start = time.perf_counter()
+    for kline_data in frames:
+        stockstats_indicators(kline_data)
+    print(f"stockstats:       {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    for i, kline_data in enumerate(frames):
+        compute_kline_indicators(("SH", str(i), "daily"), kline_data, indicators)
+    print(f"numpy engine:     {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    recent = range(num_symbols - INDICATOR_CACHE_MAX_ENTRIES, num_symbols)
+    for i in recent:
+        compute_kline_indicators(("SH", str(i), "daily"), frames[i], indicators)
+    print(f"cached, same bar: {(time.perf_counter() - start) / len(recent) * 1000:.2f}ms per symbol")
@@ -0,0 +1,371 @@
+"""
+交易 MCP 工具的录制/回放与离线基准测试。
+
+先联网录制一次东方财富的原始响应，之后的基准测试完全通过回放运行，不访问网络：
+
+    # 录制（需要联网），生成 manifest.json 和 exchanges.jsonl.gz
+    python -m novas_mcp.trading_bench record --fixtures ./data/em_fixtures --symbols SH.600519 SZ.000001
+
+    # 离线回放，统计每个工具的耗时、内存分配和返回内容大小
+    python -m novas_mcp.trading_bench run --fixtures ./data/em_fixtures --repeat 5 --output bench.json
+
+仓库中提交了一份合成数据（novas_mcp/bench_fixtures，由 novas_mcp.trading_bench_fixtures 生成），
+不联网也可以直接运行：
+
+    python -m novas_mcp.trading_bench run --fixtures novas_mcp/bench_fixtures
+
+录制和回放时时钟固定在录制时刻，缓存关闭，K 线存储使用临时目录，
+保证每次运行发出的请求与录制时一致，测到的是冷路径（取数、解析、格式化）的开销。
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Awaitable, Callable, Iterator, Optional
+
+import httpx
+from pydantic import BaseModel
+
+from novas_mcp.trading_core import (
+    MarketCode,
+    ReportDateType,
+    RetrieveCompanyBalanceSheetRequest,
+    RetrieveCompanyCashFlowStatementRequest,
+    RetrieveCompanyFinancialAnalysisIndicatorsRequest,
+    RetrieveCompanyIncomeStatementRequest,
+    RetrieveStockKlineDataRequest,
+    RetrieveStockStatsIndicatorsReportRequest,
+    StockRef,
+    _retrieve_company_balance_sheet,
+    _retrieve_company_cash_flow_statement,
+    _retrieve_company_financial_analysis_indicators,
+    _retrieve_company_income_statement,
+    _retrieve_stock_kline_data,
+    _retrieve_stock_stats_indicators_report,
+)
+from novas_mcp.trading import trading_em_cache, trading_em_kline_store, trading_indicators
+from novas_mcp.trading.trading_em_capture import (
+    CaptureRecordingTransport,
+    CaptureReplayTransport,
+    iter_captured_exchanges,
+    write_captured_exchanges,
+)
+from novas_mcp.trading.trading_em_http import create_em_http_transport, use_em_http_transport
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+MANIFEST_FILE = "manifest.json"
+EXCHANGES_FILE = "exchanges.jsonl.gz"
+
+# 取 datetime.now() 计算日期区间的模块，录制和回放时统一固定时钟
+_CLOCK_MODULES = (
+    "novas_mcp.trading_core",
+    "novas_mcp.trading.trading_em_financial",
+    "novas_mcp.trading.trading_em_kline_store",
+)
+
+
+def _kline_case(stock: StockRef, as_of: datetime) -> Awaitable[BaseModel]:
+    return _retrieve_stock_kline_data(
+        RetrieveStockKlineDataRequest(
+            market_code=stock.market_code,
+            symbol=stock.symbol,
+            interval="daily",
+            start_date=(as_of - timedelta(days=365)).strftime("%Y-%m-%d"),
+            end_date=as_of.strftime("%Y-%m-%d"),
+        )
+    )
+
+
+def _indicators_case(stock: StockRef, as_of: datetime) -> Awaitable[BaseModel]:
+    return _retrieve_stock_stats_indicators_report(
+        RetrieveStockStatsIndicatorsReportRequest(
+            market_code=stock.market_code,
+            symbol=stock.symbol,
+            indicators=["close_50_sma", "close_200_sma", "macd", "rsi", "boll", "atr", "mfi"],
+            look_back_days=180,
+        )
+    )
+
+
+def _balance_sheet_case(stock: StockRef, as_of: datetime) -> Awaitable[BaseModel]:
+    return _retrieve_company_balance_sheet(
+        RetrieveCompanyBalanceSheetRequest(
+            market_code=stock.market_code,
+            symbol=stock.symbol,
+            report_date_type=ReportDateType.BY_PERIOD,
+            include_yoy=True,
+            look_back_years=2,
+        )
+    )
+
+
+def _income_statement_case(stock: StockRef, as_of: datetime) -> Awaitable[BaseModel]:
+    return _retrieve_company_income_statement(
+        RetrieveCompanyIncomeStatementRequest(
+            market_code=stock.market_code,
+            symbol=stock.symbol,
+            report_date_type=ReportDateType.BY_PERIOD,
+            include_yoy=True,
+            include_qoq=False,
+            look_back_years=2,
+        )
+    )
+
+
+def _cash_flow_statement_case(stock: StockRef, as_of: datetime) -> Awaitable[BaseModel]:
+    return _retrieve_company_cash_flow_statement(
+        RetrieveCompanyCashFlowStatementRequest(
+            market_code=stock.market_code,
+            symbol=stock.symbol,
+            report_date_type=ReportDateType.ANNUAL,
+            include_yoy=True,
+            include_qoq=False,
+            look_back_years=3,
+        )
+    )
+
+
+def _financial_analysis_indicators_case(stock: StockRef, as_of: datetime) -> Awaitable[BaseModel]:
+    return _retrieve_company_financial_analysis_indicators(
+        RetrieveCompanyFinancialAnalysisIndicatorsRequest(
+            market_code=stock.market_code,
+            symbol=stock.symbol,
+            report_date_type=ReportDateType.BY_PERIOD,
+            look_back_years=2,
+        )
+    )
+
+
+# 工具名 -> 以固定参数调用该工具背后的实现
+BENCH_CASES: dict[str, Callable[[StockRef, datetime], Awaitable[BaseModel]]] = {
+    "retrieve_stock_historical_data": _kline_case,
+    "retrieve_stockstats_indicators_report": _indicators_case,
+    "retrieve_financial_balance_sheet": _balance_sheet_case,
+    "retrieve_financial_income_statement": _income_statement_case,
+    "retrieve_financial_cash_flow_statement": _cash_flow_statement_case,
+    "retrieve_financial_analysis_indicators": _financial_analysis_indicators_case,
+}
+
+
+class BenchCaseResult(BaseModel):
+    tool: str
+    calls: int
+    failures: int
+    latency_ms_median: float
+    latency_ms_p95: float
+    latency_ms_max: float
+    peak_alloc_kb: float
+    payload_bytes: int
+
+
+def parse_stock_ref(value: str) -> StockRef:
+    """解析 "SH.600519" 形式的股票"""
+    market_code, _, symbol = value.partition(".")
+    if not symbol:
+        raise ValueError(f"Invalid stock {value!r}, expected format like 'SH.600519'")
+    return StockRef(market_code=MarketCode(market_code.upper()), symbol=symbol)
+
+
+def _frozen_datetime(as_of: datetime) -> type:
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            # 按指定时区取时间时也返回同样的挂钟时间，回放结果与运行机器的时区无关
+            return as_of if tz is None else as_of.replace(tzinfo=tz)
+
+    return FrozenDatetime
+
+
+@contextmanager
+def _bench_environment(as_of: datetime) -> Iterator[None]:
+    """固定时钟、关闭缓存，退出时恢复时钟、缓存和 K 线存储"""
+    modules = [sys.modules[name] for name in _CLOCK_MODULES if name in sys.modules]
+    saved_datetimes = [module.datetime for module in modules]
+    saved_cache_backend = trading_em_cache.EM_CACHE_BACKEND
+    saved_kline_store = trading_em_kline_store._kline_store
+    frozen = _frozen_datetime(as_of)
+    try:
+        for module in modules:
+            module.datetime = frozen
+        trading_em_cache.EM_CACHE_BACKEND = "none"
+        yield
+    finally:
+        for module, saved in zip(modules, saved_datetimes):
+            module.datetime = saved
+        trading_em_cache.EM_CACHE_BACKEND = saved_cache_backend
+        trading_em_kline_store._kline_store = saved_kline_store
+
+
+def _reset_cold_state(store_dir_root: str, iteration: int) -> None:
+    """每次调用前换用空的 K 线存储并清空指标缓存，确保测的是冷路径"""
+    trading_em_kline_store._kline_store = trading_em_kline_store.KlineStore(
+        os.path.join(store_dir_root, str(iteration))
+    )
+    trading_indicators._indicator_cache.clear()
+
+
+def _import_fetchers() -> None:
+    # 取数模块在工具内部延迟导入，提前导入以便固定它们的时钟
+    import novas_mcp.trading.trading_em_financial  # noqa: F401
+    import novas_mcp.trading.trading_em_stock  # noqa: F401
+
+
+@asynccontextmanager
+async def _cold_calls(as_of: datetime) -> AsyncIterator[Callable[[], None]]:
+    _import_fetchers()
+    with _bench_environment(as_of), tempfile.TemporaryDirectory(prefix="em_bench_store_") as root:
+        counter = iter(range(sys.maxsize))
+        yield lambda: _reset_cold_state(root, next(counter))
+
+
+def _is_failure(response: BaseModel) -> bool:
+    return getattr(response, "success", True) is False
+
+
+async def record_fixtures(
+    fixtures_dir: str,
+    stocks: list[StockRef],
+    tools: list[str],
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+    as_of: Optional[datetime] = None,
+) -> None:
+    """
+    调用各工具一次，录制所有东方财富响应。
+    默认联网录制当前时刻的数据；传入 transport 和 as_of 时改为录制该传输在指定时刻的响应（例如合成数据）。
+    """
+    as_of = as_of or datetime.now().replace(microsecond=0)
+    recorder = CaptureRecordingTransport(transport or create_em_http_transport())
+    async with use_em_http_transport(recorder), _cold_calls(as_of) as reset:
+        for tool in tools:
+            for stock in stocks:
+                reset()
+                response = await BENCH_CASES[tool](stock, as_of)
+                if _is_failure(response):
+                    logger.warning(f"{tool} failed for {stock.key} while recording: {getattr(response, 'error_message', '')}")
+
+    write_captured_exchanges(os.path.join(fixtures_dir, EXCHANGES_FILE), recorder.exchanges)
+    with open(os.path.join(fixtures_dir, MANIFEST_FILE), "w") as f:
+        json.dump(
+            {
+                "as_of": as_of.isoformat(),
+                "stocks": [stock.key for stock in stocks],
+                "tools": tools,
+                "exchanges": len(recorder.exchanges),
+            },
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+    logger.info(f"Recorded {len(recorder.exchanges)} exchanges to {fixtures_dir}")
+
+
+async def run_benchmark(fixtures_dir: str, repeat: int = 5, tools: Optional[list[str]] = None) -> list[BenchCaseResult]:
+    """回放录制的数据，逐个工具统计耗时、内存分配峰值和返回内容大小"""
+    with open(os.path.join(fixtures_dir, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    as_of = datetime.fromisoformat(manifest["as_of"])
+    stocks = [parse_stock_ref(key) for key in manifest["stocks"]]
+    tools = tools or manifest["tools"]
+    replay = CaptureReplayTransport(list(iter_captured_exchanges(os.path.join(fixtures_dir, EXCHANGES_FILE))))
+
+    results = []
+    async with use_em_http_transport(replay), _cold_calls(as_of) as reset:
+        for tool in tools:
+            case = BENCH_CASES[tool]
+            latencies, failures, payload_bytes, peak_alloc = [], 0, 0, 0
+            for stock in stocks:
+                # 预热一次，排除首次导入等一次性开销
+                reset()
+                await case(stock, as_of)
+
+                for _ in range(repeat):
+                    reset()
+                    gc.collect()
+                    started = time.perf_counter()
+                    response = await case(stock, as_of)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    failures += _is_failure(response)
+
+                payload_bytes += len(response.model_dump_json().encode("utf-8"))
+
+                # tracemalloc 会明显拖慢执行，单独跑一次统计内存
+                reset()
+                gc.collect()
+                tracemalloc.start()
+                try:
+                    await case(stock, as_of)
+                    peak_alloc = max(peak_alloc, tracemalloc.get_traced_memory()[1])
+                finally:
+                    tracemalloc.stop()
+
+            latencies.sort()
+            results.append(
+                BenchCaseResult(
+                    tool=tool,
+                    calls=len(latencies),
+                    failures=failures,
+                    latency_ms_median=statistics.median(latencies),
+                    latency_ms_p95=latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                    latency_ms_max=latencies[-1],
+                    peak_alloc_kb=peak_alloc / 1024,
+                    payload_bytes=payload_bytes // len(stocks),
+                )
+            )
+    return results
+
+
+def _print_results(results: list[BenchCaseResult]) -> None:
+    print(
+        f"{'tool':<42}{'calls':>6}{'fail':>6}{'median ms':>11}{'p95 ms':>10}{'max ms':>10}{'peak KB':>10}{'payload B':>11}"
+    )
+    for r in results:
+        print(
+            f"{r.tool:<42}{r.calls:>6}{r.failures:>6}{r.latency_ms_median:>11.2f}{r.latency_ms_p95:>10.2f}"
+            f"{r.latency_ms_max:>10.2f}{r.peak_alloc_kb:>10.0f}{r.payload_bytes:>11}"
+        )
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Record EastMoney fixtures and benchmark trading tools offline")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="Call the tools live and record upstream responses")
+    record_parser.add_argument("--fixtures", required=True, help="Directory to write fixtures to")
+    record_parser.add_argument("--symbols", nargs="+", required=True, help="Stocks like SH.600519 SZ.000001")
+    record_parser.add_argument("--tools", nargs="+", choices=list(BENCH_CASES), default=list(BENCH_CASES))
+
+    run_parser = subparsers.add_parser("run", help="Benchmark the tools by replaying recorded fixtures")
+    run_parser.add_argument("--fixtures", required=True, help="Directory with recorded fixtures")
+    run_parser.add_argument("--repeat", type=int, default=5, help="Measured calls per tool and stock")
+    run_parser.add_argument("--tools", nargs="+", choices=list(BENCH_CASES), default=None)
+    run_parser.add_argument("--output", help="Write results as JSON to this file")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    if args.command == "record":
+        stocks = [parse_stock_ref(value) for value in args.symbols]
+        asyncio.run(record_fixtures(args.fixtures, stocks, args.tools))
+    else:
+        results = asyncio.run(run_benchmark(args.fixtures, args.repeat, args.tools))
+        _print_results(results)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump([r.model_dump() for r in results], f, ensure_ascii=False, indent=2)
+        if any(r.failures for r in results):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+生成 trading_bench 使用的合成回放数据。
+
+用一个模拟东方财富接口的传输代替真实网络，通过 trading_bench 的录制流程调用各工具，
+得到与联网录制相同格式（manifest.json + exchanges.jsonl.gz）的数据，用于离线运行基准测试：
+
+    python -m novas_mcp.trading_bench_fixtures --fixtures novas_mcp/bench_fixtures
+    python -m novas_mcp.trading_bench run --fixtures novas_mcp/bench_fixtures
+
+数据由股票代码、日期和列名确定性地生成，与真实行情无关，只保证接口格式和数据规模接近真实响应。
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import random
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+import httpx
+
+from novas_mcp.trading.trading_em_financial import (
+    _BALANCE_SHEET_COLUMN_MAPPING,
+    _CASH_FLOW_STATEMENT_COLUMN_MAPPING,
+    _FINANCIAL_INDICATOR_MAPPING,
+    _INCOME_STATEMENT_COLUMN_MAPPING,
+)
+from novas_mcp.trading_bench import BENCH_CASES, parse_stock_ref, record_fixtures
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+DEFAULT_FIXTURES_DIR = "novas_mcp/bench_fixtures"
+DEFAULT_SYMBOLS = ["SH.600519", "SZ.000001"]
+# 合成数据的时钟，固定后每次生成的数据相同
+DEFAULT_AS_OF = datetime(2025, 6, 30, 15, 0, 0)
+
+_KLINE_CALLBACK = "jsonp1755016757363"
+_QUARTER_ENDS = ("03-31", "06-30", "09-30", "12-31")
+_QUARTER_NAMES = {"03-31": "一季报", "06-30": "中报", "09-30": "三季报", "12-31": "年报"}
+
+# 报表数据接口 -> 该报表的列
+_STATEMENT_COLUMNS = {
+    "xjllbAjaxNew": _CASH_FLOW_STATEMENT_COLUMN_MAPPING,
+    "zcfzbAjaxNew": _BALANCE_SHEET_COLUMN_MAPPING,
+    "lrbAjaxNew": _INCOME_STATEMENT_COLUMN_MAPPING,
+}
+
+
+def _rng(*parts: object) -> random.Random:
+    """按给定的键生成确定的随机数，同一只股票同一天的数据在不同请求中保持一致"""
+    seed = hashlib.sha256("|".join(map(str, parts)).encode("utf-8")).digest()
+    return random.Random(int.from_bytes(seed[:8], "big"))
+
+
+def _trading_days(begin: date, end: date) -> list[date]:
+    days = []
+    day = begin
+    while day <= end:
+        if day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def _kline(secid: str, day: date) -> str:
+    rng = _rng(secid, day.isoformat())
+    base = 20 + int(secid.split(".")[1]) % 1500
+    ordinal = day.toordinal()
+    previous_close = base * (1 + 0.25 * math.sin((ordinal - 1) / 45) + 0.05 * math.sin((ordinal - 1) / 7))
+    close = base * (1 + 0.25 * math.sin(ordinal / 45) + 0.05 * math.sin(ordinal / 7)) * rng.uniform(0.99, 1.01)
+    open_ = previous_close * rng.uniform(0.98, 1.02)
+    high = max(open_, close) * rng.uniform(1.0, 1.03)
+    low = min(open_, close) * rng.uniform(0.97, 1.0)
+    volume = rng.randint(50_000, 2_000_000)
+    amount = volume * 100 * (open_ + close) / 2
+    change = close - previous_close
+    return ",".join(
+        [
+            day.isoformat(),
+            f"{open_:.2f}",
+            f"{close:.2f}",
+            f"{high:.2f}",
+            f"{low:.2f}",
+            str(volume),
+            f"{amount:.1f}",
+            f"{(high - low) / previous_close * 100:.2f}",
+            f"{change / previous_close * 100:.2f}",
+            f"{change:.2f}",
+            f"{rng.uniform(0.1, 5):.2f}",
+        ]
+    )
+
+
+def _klines_response(params: httpx.QueryParams) -> httpx.Response:
+    secid = params["secid"]
+    begin = datetime.strptime(params["beg"], "%Y%m%d").date()
+    end = datetime.strptime(params["end"], "%Y%m%d").date()
+    # 只覆盖 2015 年以来的交易日，更早的区间返回空数据，与新股的真实响应一致
+    days = _trading_days(max(begin, date(2015, 1, 5)), end)
+    data = {
+        "code": secid.split(".")[1],
+        "market": int(secid.split(".")[0]),
+        "name": "合成数据",
+        "klines": [_kline(secid, day) for day in days],
+    }
+    body = f"{_KLINE_CALLBACK}({json.dumps({'rc': 0, 'data': data if days else None}, ensure_ascii=False)});"
+    return httpx.Response(200, headers={"content-type": "application/javascript; charset=UTF-8"}, text=body)
+
+
+def _report_dates(as_of: date, annual_only: bool, years: int = 8) -> list[str]:
+    dates = []
+    for year in range(as_of.year, as_of.year - years, -1):
+        for month_day in reversed(_QUARTER_ENDS):
+            if annual_only and month_day != "12-31":
+                continue
+            # 报告期结束一个月后才有数据
+            if date.fromisoformat(f"{year}-{month_day}") + timedelta(days=30) <= as_of:
+                dates.append(f"{year}-{month_day} 00:00:00")
+    return dates
+
+
+def _report_record(code: str, report_date: str, columns: dict[str, str], with_changes: bool = True) -> dict:
+    record = {
+        "SECUCODE": f"{code[2:]}.{code[:2]}",
+        "SECURITY_CODE": code[2:],
+        "REPORT_DATE": report_date,
+        "REPORT_DATE_NAME": report_date[:4] + _QUARTER_NAMES[report_date[5:10]],
+    }
+    for column in columns:
+        if column in record or column in ("REPORT_DATE", "REPORT_DATE_NAME"):
+            continue
+        rng = _rng(code, report_date, column)
+        # 约一成的科目没有数据
+        record[column] = None if rng.random() < 0.1 else round(rng.uniform(-1e9, 5e10), 2)
+        if not with_changes:
+            continue
+        record[column + "_YOY"] = None if rng.random() < 0.1 else round(rng.uniform(-80, 120), 4)
+        record[column + "_QOQ"] = None if rng.random() < 0.1 else round(rng.uniform(-80, 120), 4)
+    return record
+
+
+def synthetic_em_transport(as_of: datetime) -> httpx.MockTransport:
+    """模拟 trading_bench 用到的东方财富接口：日 K 线、主要指标和三张报表"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        endpoint = request.url.path.rsplit("/", 1)[-1]
+        params = request.url.params
+        if request.url.path == "/api/qt/stock/kline/get":
+            return _klines_response(params)
+        if endpoint.endswith("DateAjaxNew"):
+            dates = _report_dates(as_of.date(), annual_only=params.get("reportDateType") == "1")
+            return httpx.Response(200, json={"data": [{"REPORT_DATE": d} for d in dates]})
+        if endpoint in _STATEMENT_COLUMNS:
+            records = [
+                _report_record(params["code"], f"{d} 00:00:00", _STATEMENT_COLUMNS[endpoint])
+                for d in params["dates"].split(",")
+            ]
+            return httpx.Response(200, json={"data": records})
+        if endpoint == "ZYZBAjaxNew":
+            # 主要指标接口一次返回全部报告期，指标本身已包含增长率，没有同比、环比列
+            dates = _report_dates(as_of.date(), annual_only=params.get("type") == "1", years=4)
+            records = [
+                _report_record(params["code"], d, _FINANCIAL_INDICATOR_MAPPING, with_changes=False) for d in dates
+            ]
+            return httpx.Response(200, json={"data": records})
+        logger.warning(f"No synthetic response for {request.url}")
+        return httpx.Response(404, json={"data": None})
+
+    return httpx.MockTransport(handler)
+
+
+async def generate_fixtures(
+    fixtures_dir: str,
+    symbols: list[str],
+    tools: Optional[list[str]] = None,
+    as_of: datetime = DEFAULT_AS_OF,
+) -> None:
+    """通过 trading_bench 的录制流程录制合成接口的响应"""
+    stocks = [parse_stock_ref(value) for value in symbols]
+    await record_fixtures(
+        fixtures_dir,
+        stocks,
+        tools or list(BENCH_CASES),
+        transport=synthetic_em_transport(as_of),
+        as_of=as_of,
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic EastMoney fixtures for the trading benchmark")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES_DIR, help="Directory to write fixtures to")
+    parser.add_argument("--symbols", nargs="+", default=DEFAULT_SYMBOLS, help="Stocks like SH.600519 SZ.000001")
+    parser.add_argument("--tools", nargs="+", choices=list(BENCH_CASES), default=None)
+    parser.add_argument("--as-of", default=DEFAULT_AS_OF.isoformat(), help="Clock of the synthetic data")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    asyncio.run(generate_fixtures(args.fixtures, args.symbols, args.tools, datetime.fromisoformat(args.as_of)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
+import asyncio
+import base64
+import json
 from enum import Enum
 from typing import Annotated, List, Optional
 from datetime import datetime, timedelta
 
 from novas_mcp.utils import format_pd_dataframe_to_markdown
-from pydantic import BaseModel, Field, ConfigDict, field_validator
+from pydantic import BaseModel, Field, ConfigDict, PrivateAttr, field_validator
 import logging
 import pandas as pd
 
@@ -11,18 +14,42 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
+class ColumnarTable(BaseModel):
+    columns: dict[str, list] = Field(
+        description="Column name to column values, all columns have the same length, missing values are null"
+    )
+
+
+def _to_columnar_table(df: Optional[pd.DataFrame], float_digits: Optional[int] = None) -> ColumnarTable:
+    if df is None or df.empty:
+        return ColumnarTable(columns={})
+    if float_digits is not None:
+        df = df.round(float_digits)
+    df = df.astype(object).where(df.notna(), None)
+    return ColumnarTable(columns={str(column): df[column].tolist() for column in df.columns})
+
+
+class ReportFormat(str, Enum):
+    MARKDOWN = "markdown"  # 给大模型阅读的 markdown 表格
+    COLUMNAR = "columnar"  # 按列组织的 JSON，供程序调用
+    ARROW = "arrow"  # base64 编码的 Arrow IPC stream
+
+
 class TradingReportResultPack(BaseModel):
+    """
+    一个报表分类的数据，只保存 DataFrame，markdown、JSON、列式表格和 Arrow 等表示在用到时才生成，
+    生成后缓存在实例上。
+    """
+
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     dataframe: Optional[pd.DataFrame] = Field(
         default=None, description="The dataframe of the report"
     )
-    markdown_table: Optional[str] = Field(
-        default=None, description="The markdown of the report"
-    )
-    json_dict: Optional[dict] = Field(
-        default=None, description="The json of the report"
+    column_mapping: Optional[dict[str, str]] = Field(
+        default=None, description="Display names of the dataframe columns"
     )
+    _markdown_table: Optional[str] = PrivateAttr(default=None)
 
     @field_validator("dataframe")
     @classmethod
@@ -33,6 +60,41 @@ class TradingReportResultPack(BaseModel):
             raise ValueError("dataframe must be a pandas DataFrame")
         return v
 
+    @property
+    def markdown_table(self) -> str:
+        if self._markdown_table is None:
+            if self.dataframe is None:
+                return ""
+            self._markdown_table = format_pd_dataframe_to_markdown(
+                self.dataframe, include_index=True, transpose=True, column_mapping=self.column_mapping or {}
+            )
+        return self._markdown_table
+
+    @property
+    def json_dict(self) -> Optional[dict]:
+        if self.dataframe is None:
+            return None
+        return json.loads(self.dataframe.to_json(force_ascii=False))
+
+    def display_dataframe(self) -> pd.DataFrame:
+        """使用显示列名、报告期作为第一列的 DataFrame"""
+        if self.dataframe is None:
+            return pd.DataFrame()
+        df = self.dataframe.rename(columns=self.column_mapping or {})
+        return df.rename_axis("报告期").reset_index()
+
+    def to_columnar_table(self) -> ColumnarTable:
+        return _to_columnar_table(self.display_dataframe())
+
+    def to_arrow_ipc(self) -> str:
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(self.display_dataframe(), preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return base64.b64encode(sink.getvalue().to_pybytes()).decode("ascii")
+
 
 class TradingReportResult(BaseModel):
     success: bool = Field(description="Whether the request is successful")
@@ -266,6 +328,80 @@ async def _retrieve_stock_kline_data(
         )
 
 
+STOCK_STATS_INDICATOR_DESCRIPTIONS = {
+    # Moving Averages
+    "close_50_sma": (
+        "50 SMA: A medium-term trend indicator. "
+        "Usage: Identify trend direction and serve as dynamic support/resistance. "
+        "Tips: It lags price; combine with faster indicators for timely signals."
+    ),
+    "close_200_sma": (
+        "200 SMA: A long-term trend benchmark. "
+        "Usage: Confirm overall market trend and identify golden/death cross setups. "
+        "Tips: It reacts slowly; best for strategic trend confirmation rather than frequent trading entries."
+    ),
+    "close_10_ema": (
+        "10 EMA: A responsive short-term average. "
+        "Usage: Capture quick shifts in momentum and potential entry points. "
+        "Tips: Prone to noise in choppy markets; use alongside longer averages for filtering false signals."
+    ),
+    # MACD Related
+    "macd": (
+        "MACD: Computes momentum via differences of EMAs. "
+        "Usage: Look for crossovers and divergence as signals of trend changes. "
+        "Tips: Confirm with other indicators in low-volatility or sideways markets."
+    ),
+    "macds": (
+        "MACD Signal: An EMA smoothing of the MACD line. "
+        "Usage: Use crossovers with the MACD line to trigger trades. "
+        "Tips: Should be part of a broader strategy to avoid false positives."
+    ),
+    "macdh": (
+        "MACD Histogram: Shows the gap between the MACD line and its signal. "
+        "Usage: Visualize momentum strength and spot divergence early. "
+        "Tips: Can be volatile; complement with additional filters in fast-moving markets."
+    ),
+    # Momentum Indicators
+    "rsi": (
+        "RSI: Measures momentum to flag overbought/oversold conditions. "
+        "Usage: Apply 70/30 thresholds and watch for divergence to signal reversals. "
+        "Tips: In strong trends, RSI may remain extreme; always cross-check with trend analysis."
+    ),
+    # Volatility Indicators
+    "boll": (
+        "Bollinger Middle: A 20 SMA serving as the basis for Bollinger Bands. "
+        "Usage: Acts as a dynamic benchmark for price movement. "
+        "Tips: Combine with the upper and lower bands to effectively spot breakouts or reversals."
+    ),
+    "boll_ub": (
+        "Bollinger Upper Band: Typically 2 standard deviations above the middle line. "
+        "Usage: Signals potential overbought conditions and breakout zones. "
+        "Tips: Confirm signals with other tools; prices may ride the band in strong trends."
+    ),
+    "boll_lb": (
+        "Bollinger Lower Band: Typically 2 standard deviations below the middle line. "
+        "Usage: Indicates potential oversold conditions. "
+        "Tips: Use additional analysis to avoid false reversal signals."
+    ),
+    "atr": (
+        "ATR: Averages true range to measure volatility. "
+        "Usage: Set stop-loss levels and adjust position sizes based on current market volatility. "
+        "Tips: It's a reactive measure, so use it as part of a broader risk management strategy."
+    ),
+    # Volume-Based Indicators
+    "vwma": (
+        "VWMA: A moving average weighted by volume. "
+        "Usage: Confirm trends by integrating price action with volume data. "
+        "Tips: Watch for skewed results from volume spikes; use in combination with other volume analyses."
+    ),
+    "mfi": (
+        "MFI: The Money Flow Index is a momentum indicator that uses both price and volume to measure buying and selling pressure. "
+        "Usage: Identify overbought (>80) or oversold (<20) conditions and confirm the strength of trends or reversals. "
+        "Tips: Use alongside RSI or MACD to confirm signals; divergence between price and MFI can indicate potential reversals."
+    ),
+}
+
+
 class RetrieveStockStatsIndicatorsReportRequest(BaseModel):
     market_code: MarketCode = Annotated[
         MarketCode, "The market code of provided stock symbol"
@@ -277,11 +413,32 @@ class RetrieveStockStatsIndicatorsReportRequest(BaseModel):
 
 class RetrieveNamedReportItem(BaseModel):
     name: str = Field(description="The name of the report category")
-    report_markdown_table: str = Field(
-        description="The markdown table of the report data"
+    report_markdown_table: Optional[str] = Field(
+        default=None, description="The markdown table of the report data, set when report_format is 'markdown'"
+    )
+    report_columnar: Optional[ColumnarTable] = Field(
+        default=None, description="The report data by column, set when report_format is 'columnar'"
+    )
+    report_arrow_ipc: Optional[str] = Field(
+        default=None, description="The report data as a base64 encoded Arrow IPC stream, set when report_format is 'arrow'"
     )
 
 
+def _named_report_items(
+    reports: dict[str, TradingReportResultPack], report_format: ReportFormat
+) -> List[RetrieveNamedReportItem]:
+    """只生成请求的那一种表示"""
+    items = []
+    for name, report in reports.items():
+        if report_format == ReportFormat.COLUMNAR:
+            items.append(RetrieveNamedReportItem(name=name, report_columnar=report.to_columnar_table()))
+        elif report_format == ReportFormat.ARROW:
+            items.append(RetrieveNamedReportItem(name=name, report_arrow_ipc=report.to_arrow_ipc()))
+        else:
+            items.append(RetrieveNamedReportItem(name=name, report_markdown_table=report.markdown_table))
+    return items
+
+
 class RetrieveStockStatsIndicatorsReportItem(BaseModel):
     indicator_name: str = Field(description="The name of the indicator")
     indicator_description: str = Field(description="The description of the indicator")
@@ -297,120 +454,57 @@ class RetrieveStockStatsIndicatorsReportResponse(BaseModel):
     )
 
 
-async def _retrieve_stock_stats_indicators_report(
-    request: RetrieveStockStatsIndicatorsReportRequest,
-) -> RetrieveStockStatsIndicatorsReportResponse:
-    best_ind_params = {
-        # Moving Averages
-        "close_50_sma": (
-            "50 SMA: A medium-term trend indicator. "
-            "Usage: Identify trend direction and serve as dynamic support/resistance. "
-            "Tips: It lags price; combine with faster indicators for timely signals."
-        ),
-        "close_200_sma": (
-            "200 SMA: A long-term trend benchmark. "
-            "Usage: Confirm overall market trend and identify golden/death cross setups. "
-            "Tips: It reacts slowly; best for strategic trend confirmation rather than frequent trading entries."
-        ),
-        "close_10_ema": (
-            "10 EMA: A responsive short-term average. "
-            "Usage: Capture quick shifts in momentum and potential entry points. "
-            "Tips: Prone to noise in choppy markets; use alongside longer averages for filtering false signals."
-        ),
-        # MACD Related
-        "macd": (
-            "MACD: Computes momentum via differences of EMAs. "
-            "Usage: Look for crossovers and divergence as signals of trend changes. "
-            "Tips: Confirm with other indicators in low-volatility or sideways markets."
-        ),
-        "macds": (
-            "MACD Signal: An EMA smoothing of the MACD line. "
-            "Usage: Use crossovers with the MACD line to trigger trades. "
-            "Tips: Should be part of a broader strategy to avoid false positives."
-        ),
-        "macdh": (
-            "MACD Histogram: Shows the gap between the MACD line and its signal. "
-            "Usage: Visualize momentum strength and spot divergence early. "
-            "Tips: Can be volatile; complement with additional filters in fast-moving markets."
-        ),
-        # Momentum Indicators
-        "rsi": (
-            "RSI: Measures momentum to flag overbought/oversold conditions. "
-            "Usage: Apply 70/30 thresholds and watch for divergence to signal reversals. "
-            "Tips: In strong trends, RSI may remain extreme; always cross-check with trend analysis."
-        ),
-        # Volatility Indicators
-        "boll": (
-            "Bollinger Middle: A 20 SMA serving as the basis for Bollinger Bands. "
-            "Usage: Acts as a dynamic benchmark for price movement. "
-            "Tips: Combine with the upper and lower bands to effectively spot breakouts or reversals."
-        ),
-        "boll_ub": (
-            "Bollinger Upper Band: Typically 2 standard deviations above the middle line. "
-            "Usage: Signals potential overbought conditions and breakout zones. "
-            "Tips: Confirm signals with other tools; prices may ride the band in strong trends."
-        ),
-        "boll_lb": (
-            "Bollinger Lower Band: Typically 2 standard deviations below the middle line. "
-            "Usage: Indicates potential oversold conditions. "
-            "Tips: Use additional analysis to avoid false reversal signals."
-        ),
-        "atr": (
-            "ATR: Averages true range to measure volatility. "
-            "Usage: Set stop-loss levels and adjust position sizes based on current market volatility. "
-            "Tips: It's a reactive measure, so use it as part of a broader risk management strategy."
-        ),
-        # Volume-Based Indicators
-        "vwma": (
-            "VWMA: A moving average weighted by volume. "
-            "Usage: Confirm trends by integrating price action with volume data. "
-            "Tips: Watch for skewed results from volume spikes; use in combination with other volume analyses."
-        ),
-        "mfi": (
-            "MFI: The Money Flow Index is a momentum indicator that uses both price and volume to measure buying and selling pressure. "
-            "Usage: Identify overbought (>80) or oversold (<20) conditions and confirm the strength of trends or reversals. "
-            "Tips: Use alongside RSI or MACD to confirm signals; divergence between price and MFI can indicate potential reversals."
-        ),
-    }
-
-    logger.info(f"Retrieving stock stats indicators report for {request}")
+async def _compute_stock_indicators(
+    market_code: MarketCode,
+    symbol: str,
+    indicators: List[str],
+    look_back_days: int,
+) -> dict[str, pd.Series]:
+    """计算最近 look_back_days 天的技术指标，不支持的指标不在结果中"""
     from novas_mcp.trading.trading_em_stock import em_retrieve_stock_kline_data
+    from novas_mcp.trading.trading_indicators import compute_kline_indicators, indicator_warmup_bars
 
-    start_date = datetime.now() - timedelta(days=request.look_back_days)
+    indicators = [indicator for indicator in indicators if indicator in STOCK_STATS_INDICATOR_DESCRIPTIONS]
     end_date = datetime.now()
+    start_date = end_date - timedelta(days=look_back_days)
+    # 多取预热区间的 K 线，使均线等指标在展示区间的第一天就已收敛
+    fetch_start_date = start_date - timedelta(days=indicator_warmup_bars(indicators) * 3 // 2 + 10)
 
     kline_data = await em_retrieve_stock_kline_data(
-        request.market_code,
-        request.symbol,
+        market_code,
+        symbol,
         "daily",
-        start_date.strftime("%Y-%m-%d"),
+        fetch_start_date.strftime("%Y-%m-%d"),
         end_date.strftime("%Y-%m-%d"),
     )
-    columns_mapping = {
-        "date": "日期",
-        "amount": "成交额",
-        "close": "收盘",
-        "high": "最高",
-        "low": "最低",
-        "volume": "成交量",
+    indicator_values = compute_kline_indicators(
+        (market_code.value, symbol, "daily", fetch_start_date.strftime("%Y-%m-%d")),
+        kline_data,
+        indicators,
+    )
+    return {
+        indicator: values[values.index >= start_date.strftime("%Y-%m-%d")]
+        for indicator, values in indicator_values.items()
     }
-    from stockstats import wrap
 
-    kdf = kline_data.copy()
-    for k, v in columns_mapping.items():
-        kdf[k] = kdf[v]
-    kdf = kdf[columns_mapping.keys()]
-    sdf = wrap(kdf)
+
+async def _retrieve_stock_stats_indicators_report(
+    request: RetrieveStockStatsIndicatorsReportRequest,
+) -> RetrieveStockStatsIndicatorsReportResponse:
+    logger.info(f"Retrieving stock stats indicators report for {request}")
+    indicator_values = await _compute_stock_indicators(
+        request.market_code, request.symbol, request.indicators, request.look_back_days
+    )
 
     reports = []
     for indicator in request.indicators:
-        if indicator in best_ind_params:
-            indicator_values = sdf[indicator]
+        if indicator in indicator_values:
+            values = indicator_values[indicator]
             reports.append(
                 RetrieveStockStatsIndicatorsReportItem(
                     indicator_name=indicator,
-                    indicator_description=best_ind_params[indicator],
-                    indicator_report_markdown_table=indicator_values.to_markdown(),
+                    indicator_description=STOCK_STATS_INDICATOR_DESCRIPTIONS[indicator],
+                    indicator_report_markdown_table=values.to_markdown(),
                 )
             )
         else:
@@ -494,6 +588,10 @@ class RetrieveCompanyBalanceSheetRequest(BaseModel):
         int,
         "The number of years to look back for the cash flow statement, default is 5",
     ]
+    report_format: ReportFormat = Field(
+        default=ReportFormat.MARKDOWN,
+        description="The representation of the reports: 'markdown', 'columnar' or 'arrow'",
+    )
 
 
 class RetrieveCompanyBalanceSheetResponse(BaseModel):
@@ -540,12 +638,7 @@ async def _retrieve_company_balance_sheet(
             symbol=request.symbol,
             report_date_type=request.report_date_type,
             look_back_years=request.look_back_years,
-            reports=[
-                RetrieveNamedReportItem(
-                    name=category_name, report_markdown_table=report.markdown_table
-                )
-                for category_name, report in balance_sheet.items()
-            ],
+            reports=_named_report_items(balance_sheet, request.report_format),
         )
     except Exception as e:
         logger.error(f"Error retrieving company balance sheet: {e}")
@@ -583,6 +676,10 @@ class RetrieveCompanyIncomeStatementRequest(BaseModel):
         int,
         "The number of years to look back for the cash flow statement, default is 5",
     ]
+    report_format: ReportFormat = Field(
+        default=ReportFormat.MARKDOWN,
+        description="The representation of the reports: 'markdown', 'columnar' or 'arrow'",
+    )
 
 
 class RetrieveCompanyIncomeStatementResponse(BaseModel):
@@ -633,12 +730,7 @@ async def _retrieve_company_income_statement(
             symbol=request.symbol,
             report_date_type=request.report_date_type,
             look_back_years=request.look_back_years,
-            reports=[
-                RetrieveNamedReportItem(
-                    name=indicator_name, report_markdown_table=report.markdown_table
-                )
-                for indicator_name, report in income_statement.items()
-            ],
+            reports=_named_report_items(income_statement, request.report_format),
         )
     except Exception as e:
         logger.error(f"Error retrieving company income statement: {e}")
@@ -676,6 +768,10 @@ class RetrieveCompanyCashFlowStatementRequest(BaseModel):
         int,
         "The number of years to look back for the cash flow statement, default is 5",
     ]
+    report_format: ReportFormat = Field(
+        default=ReportFormat.MARKDOWN,
+        description="The representation of the reports: 'markdown', 'columnar' or 'arrow'",
+    )
 
 
 class RetrieveCompanyCashFlowStatementResponse(BaseModel):
@@ -725,12 +821,7 @@ async def _retrieve_company_cash_flow_statement(
             symbol=request.symbol,
             report_date_type=request.report_date_type,
             look_back_years=request.look_back_years,
-            reports=[
-                RetrieveNamedReportItem(
-                    name=indicator_name, report_markdown_table=report.markdown_table
-                )
-                for indicator_name, report in cash_flow_statement.items()
-            ],
+            reports=_named_report_items(cash_flow_statement, request.report_format),
         )
     except Exception as e:
         logger.error(f"Error retrieving company cash flow statement: {e}")
@@ -752,6 +843,10 @@ class RetrieveCompanyFinancialAnalysisIndicatorsRequest(BaseModel):
     symbol: str
     report_date_type: ReportDateType
     look_back_years: int
+    report_format: ReportFormat = Field(
+        default=ReportFormat.MARKDOWN,
+        description="The representation of the reports: 'markdown', 'columnar' or 'arrow'",
+    )
 
 
 class RetrieveCompanyFinancialAnalysisIndicatorsResponse(BaseModel):
@@ -797,12 +892,7 @@ async def _retrieve_company_financial_analysis_indicators(
             symbol=request.symbol,
             report_date_type=request.report_date_type,
             look_back_years=request.look_back_years,
-            reports=[
-                RetrieveNamedReportItem(
-                    name=indicator_name, report_markdown_table=report.markdown_table
-                )
-                for indicator_name, report in reports.items()
-            ],
+            reports=_named_report_items(reports, request.report_format),
         )
 
     except Exception as e:
@@ -835,3 +925,226 @@ async def _retrieve_company_fundamentals(
 ) -> RetrieveCompanyFundamentalsResponse:
     logger.info(f"Retrieving company fundamentals for {request}")
     return RetrieveCompanyFundamentalsResponse(fundamentals="Company fundamentals")
+
+
+MAX_BATCH_SYMBOLS = 20
+
+
+class StockRef(BaseModel):
+    market_code: MarketCode = Field(description="The market code of the stock symbol")
+    symbol: str = Field(description="The ticker symbol of the stock")
+
+    @property
+    def key(self) -> str:
+        return f"{self.market_code.value}.{self.symbol}"
+
+
+class FinancialStatementType(str, Enum):
+    INDICATORS = "indicators"
+    BALANCE_SHEET = "balance_sheet"
+    INCOME_STATEMENT = "income_statement"
+    CASH_FLOW_STATEMENT = "cash_flow_statement"
+
+
+async def _gather_by_stock(stocks: List[StockRef], fetch) -> tuple[dict[str, object], dict[str, str]]:
+    """并发获取每只股票的数据，返回 (结果, 错误信息)，键为 "市场.代码" """
+    stocks = list({stock.key: stock for stock in stocks}.values())
+    if len(stocks) > MAX_BATCH_SYMBOLS:
+        raise ValueError(f"At most {MAX_BATCH_SYMBOLS} symbols are allowed in one batch request")
+    results = await asyncio.gather(*(fetch(stock) for stock in stocks), return_exceptions=True)
+    values, errors = {}, {}
+    for stock, result in zip(stocks, results):
+        if isinstance(result, BaseException):
+            logger.error(f"Error retrieving batch data for {stock.key}: {result}")
+            errors[stock.key] = str(result) or type(result).__name__
+        elif result is None:
+            errors[stock.key] = "No data"
+        else:
+            values[stock.key] = result
+    return values, errors
+
+
+class RetrieveStockKlineDataBatchRequest(BaseModel):
+    stocks: List[StockRef]
+    interval: str
+    start_date: str
+    end_date: str
+
+
+class RetrieveStockKlineDataBatchResponse(BaseModel):
+    success: bool = Field(description="Whether data was retrieved for at least one stock")
+    errors: dict[str, str] = Field(
+        default_factory=dict, description="The error message of each failed stock, keyed by 'MARKET.SYMBOL'"
+    )
+    interval: str = Field(description="The interval of the kline data")
+    start_date: str = Field(description="The start date of the kline data, format: YYYY-mm-dd")
+    end_date: str = Field(description="The end date of the kline data, format: YYYY-mm-dd")
+    table: ColumnarTable = Field(description="The kline data of all stocks, one row per stock and date")
+
+
+async def _retrieve_stock_kline_data_batch(
+    request: RetrieveStockKlineDataBatchRequest,
+) -> RetrieveStockKlineDataBatchResponse:
+    logger.info(f"Retrieving stock kline data batch for {request}")
+    from novas_mcp.trading.trading_em_stock import em_retrieve_stock_kline_data
+
+    async def fetch(stock: StockRef):
+        return await em_retrieve_stock_kline_data(
+            stock.market_code, stock.symbol, request.interval, request.start_date, request.end_date
+        )
+
+    try:
+        kline_data, errors = await _gather_by_stock(request.stocks, fetch)
+    except Exception as e:
+        logger.error(f"Error retrieving stock kline data batch: {e}")
+        kline_data, errors = {}, {"*": str(e)}
+    frames = [df.assign(市场=key.split(".")[0]) for key, df in kline_data.items()]
+    table = pd.concat(frames, ignore_index=True) if frames else None
+    if table is not None:
+        table = table[["市场", *[column for column in table.columns if column != "市场"]]]
+    return RetrieveStockKlineDataBatchResponse(
+        success=len(kline_data) > 0,
+        errors=errors,
+        interval=request.interval,
+        start_date=request.start_date,
+        end_date=request.end_date,
+        table=_to_columnar_table(table),
+    )
+
+
+class RetrieveStockStatsIndicatorsBatchRequest(BaseModel):
+    stocks: List[StockRef]
+    indicators: List[str]
+    look_back_days: int
+
+
+class RetrieveStockStatsIndicatorsBatchResponse(BaseModel):
+    success: bool = Field(description="Whether indicators were computed for at least one stock")
+    errors: dict[str, str] = Field(
+        default_factory=dict,
+        description="The error message of each failed stock keyed by 'MARKET.SYMBOL', and of each unsupported indicator keyed by its name",
+    )
+    indicator_descriptions: dict[str, str] = Field(description="The description of each returned indicator")
+    table: ColumnarTable = Field(
+        description="The indicators of all stocks, one row per stock and date, one column per indicator"
+    )
+
+
+async def _retrieve_stock_stats_indicators_batch(
+    request: RetrieveStockStatsIndicatorsBatchRequest,
+) -> RetrieveStockStatsIndicatorsBatchResponse:
+    logger.info(f"Retrieving stock stats indicators batch for {request}")
+    indicators = [indicator for indicator in dict.fromkeys(request.indicators) if indicator in STOCK_STATS_INDICATOR_DESCRIPTIONS]
+    errors = {
+        indicator: "Unsupported indicator" for indicator in request.indicators if indicator not in indicators
+    }
+
+    async def fetch(stock: StockRef):
+        values = await _compute_stock_indicators(stock.market_code, stock.symbol, indicators, request.look_back_days)
+        return pd.DataFrame(values) if values else None
+
+    try:
+        indicator_data, stock_errors = await _gather_by_stock(request.stocks, fetch) if indicators else ({}, {})
+    except Exception as e:
+        logger.error(f"Error retrieving stock stats indicators batch: {e}")
+        indicator_data, stock_errors = {}, {"*": str(e)}
+    errors.update(stock_errors)
+    frames = []
+    for key, df in indicator_data.items():
+        market, symbol = key.split(".", 1)
+        df = df.reset_index().rename(columns={"date": "日期"})
+        df.insert(0, "市场", market)
+        df.insert(1, "股票代码", symbol)
+        frames.append(df)
+    return RetrieveStockStatsIndicatorsBatchResponse(
+        success=len(indicator_data) > 0,
+        errors=errors,
+        indicator_descriptions={indicator: STOCK_STATS_INDICATOR_DESCRIPTIONS[indicator] for indicator in indicators},
+        table=_to_columnar_table(pd.concat(frames, ignore_index=True) if frames else None, float_digits=4),
+    )
+
+
+class RetrieveFinancialStatementBatchRequest(BaseModel):
+    stocks: List[StockRef]
+    statement_type: FinancialStatementType
+    report_date_type: ReportDateType
+    look_back_years: int = 2
+    include_yoy: bool = False
+    include_qoq: bool = False
+
+
+class RetrieveFinancialStatementBatchResponse(BaseModel):
+    success: bool = Field(description="Whether the statement was retrieved for at least one stock")
+    errors: dict[str, str] = Field(
+        default_factory=dict, description="The error message of each failed stock, keyed by 'MARKET.SYMBOL'"
+    )
+    statement_type: FinancialStatementType = Field(description="The type of the financial statement")
+    report_date_type: ReportDateType = Field(description="The type of the report dates")
+    reports: dict[str, ColumnarTable] = Field(
+        description="The table of each report category, one row per stock and report date, one column per item"
+    )
+
+
+async def _retrieve_financial_statement_batch(
+    request: RetrieveFinancialStatementBatchRequest,
+) -> RetrieveFinancialStatementBatchResponse:
+    logger.info(f"Retrieving financial statement batch for {request}")
+    from novas_mcp.trading.trading_em_financial import (
+        em_retrieve_company_financial_analysis_balance_sheet,
+        em_retrieve_company_financial_analysis_cash_flow_statement,
+        em_retrieve_company_financial_analysis_income_statement,
+        em_retrieve_company_financial_analysis_indicators,
+    )
+
+    async def fetch(stock: StockRef) -> dict[str, TradingReportResultPack]:
+        if request.statement_type == FinancialStatementType.INDICATORS:
+            return await em_retrieve_company_financial_analysis_indicators(
+                stock.market_code, stock.symbol, request.report_date_type, request.look_back_years
+            )
+        if request.statement_type == FinancialStatementType.BALANCE_SHEET:
+            return await em_retrieve_company_financial_analysis_balance_sheet(
+                stock.market_code, stock.symbol, request.report_date_type, request.include_yoy, request.look_back_years
+            )
+        if request.statement_type == FinancialStatementType.INCOME_STATEMENT:
+            return await em_retrieve_company_financial_analysis_income_statement(
+                stock.market_code,
+                stock.symbol,
+                request.report_date_type,
+                include_yoy=request.include_yoy,
+                include_qoq=request.include_qoq,
+                look_back_years=request.look_back_years,
+            )
+        return await em_retrieve_company_financial_analysis_cash_flow_statement(
+            stock.market_code,
+            stock.symbol,
+            request.report_date_type,
+            request.include_yoy,
+            request.include_qoq,
+            request.look_back_years,
+        )
+
+    try:
+        statements, errors = await _gather_by_stock(request.stocks, fetch)
+    except Exception as e:
+        logger.error(f"Error retrieving financial statement batch: {e}")
+        statements, errors = {}, {"*": str(e)}
+    category_frames: dict[str, list[pd.DataFrame]] = {}
+    for key, reports in statements.items():
+        market, symbol = key.split(".", 1)
+        for category_name, report in reports.items():
+            if report.dataframe is None or report.dataframe.empty:
+                continue
+            df = report.display_dataframe()
+            df.insert(0, "市场", market)
+            df.insert(1, "股票代码", symbol)
+            category_frames.setdefault(category_name, []).append(df)
+    return RetrieveFinancialStatementBatchResponse(
+        success=len(statements) > 0,
+        errors=errors,
+        statement_type=request.statement_type,
+        report_date_type=request.report_date_type,
+        reports={
+            category_name: _to_columnar_table(pd.concat(frames, ignore_index=True))
+            for category_name, frames in category_frames.items()
+        },
+    )
@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 from .trading_core import (
     MarketCode,
     ReportDateType,
+    ReportFormat,
     RetrieveCompanyFundamentalsRequest,
     RetrieveCompanyFundamentalsResponse,
     RetrieveCompanyInsiderSentimentRequest,
@@ -37,6 +38,18 @@ from .trading_core import (
     _retrieve_company_financial_analysis_indicators,
     RetrieveCompanyFinancialAnalysisIndicatorsRequest,
     RetrieveCompanyFinancialAnalysisIndicatorsResponse,
+    FinancialStatementType,
+    StockRef,
+    RetrieveStockKlineDataBatchRequest,
+    RetrieveStockKlineDataBatchResponse,
+    RetrieveStockStatsIndicatorsBatchRequest,
+    RetrieveStockStatsIndicatorsBatchResponse,
+    RetrieveFinancialStatementBatchRequest,
+    RetrieveFinancialStatementBatchResponse,
+    _retrieve_stock_kline_data_batch,
+    _retrieve_stock_stats_indicators_batch,
+    _retrieve_financial_statement_batch,
+    MAX_BATCH_SYMBOLS,
 )
 from mcp.server.fastmcp import FastMCP
 import logging
@@ -92,7 +105,7 @@ def setup_trading_mcp_server(mcp: FastMCP):
 
     @mcp.tool(
         name="retrieve_stock_historical_data",
-        description="Retrieve stock historical data for a company",
+        description="Retrieve stock historical data for a company. To compare several stocks, use retrieve_stock_historical_data_batch instead of calling this tool once per stock",
     )
     async def retrieve_stock_historical_data(
         market_code: Annotated[MarketCode, Field(description="The market code of the stock symbol, available values are 'SH' and 'SZ'")],
@@ -119,7 +132,7 @@ def setup_trading_mcp_server(mcp: FastMCP):
 
     @mcp.tool(
         name="retrieve_stockstats_indicators_report",
-        description="Retrieve stock stats indicators report for a company",
+        description="Retrieve stock stats indicators report for a company. To compare several stocks, use retrieve_stockstats_indicators_batch instead of calling this tool once per stock",
     )
     async def retrieve_stockstats_indicators_report(
         market_code: Annotated[MarketCode, Field(description="The market code of the stock symbol, available values are 'SH' and 'SZ'")],
@@ -136,6 +149,69 @@ def setup_trading_mcp_server(mcp: FastMCP):
         )
         return await _retrieve_stock_stats_indicators_report(request)
 
+    @mcp.tool(
+        name="retrieve_stock_historical_data_batch",
+        description=f"Retrieve stock historical data for up to {MAX_BATCH_SYMBOLS} stocks in one call, returned as one columnar table with a row per stock and date",
+    )
+    async def retrieve_stock_historical_data_batch(
+        stocks: Annotated[list[StockRef], Field(description="The stocks to retrieve price data for, each with market_code ('SH' or 'SZ') and symbol")],
+        interval: Annotated[str, Field(description="The interval of the historical data to retrieve, available values are 'daily', 'weekly' or 'monthly'")],
+        start_date: Annotated[
+            str, Field(description="The start date of the historical data to retrieve, format: YYYY-mm-dd")
+        ] = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d"),
+        end_date: Annotated[
+            str, Field(description="The end date of the historical data to retrieve, format: YYYY-mm-dd")
+        ] = datetime.now().strftime("%Y-%m-%d"),
+    ) -> RetrieveStockKlineDataBatchResponse:
+        logger.info(f"Retrieving stock historical data batch for {[stock.key for stock in stocks]} from {start_date} to {end_date}")
+        request = RetrieveStockKlineDataBatchRequest(
+            stocks=stocks,
+            interval=interval,
+            start_date=start_date,
+            end_date=end_date,
+        )
+        return await _retrieve_stock_kline_data_batch(request)
+
+    @mcp.tool(
+        name="retrieve_stockstats_indicators_batch",
+        description=f"Retrieve stock stats indicators for up to {MAX_BATCH_SYMBOLS} stocks in one call, returned as one columnar table with a row per stock and date and a column per indicator",
+    )
+    async def retrieve_stockstats_indicators_batch(
+        stocks: Annotated[list[StockRef], Field(description="The stocks to retrieve indicators for, each with market_code ('SH' or 'SZ') and symbol")],
+        indicators: Annotated[list[str], Field(description="The indicators to retrieve, only support values: 'close_50_sma', 'close_200_sma', 'close_10_ema', 'macd', 'macds', 'macdh', 'rsi', 'boll', 'boll_ub', 'boll_lb', 'atr', 'vwma', 'mfi'")],
+        look_back_days: Annotated[int, Field(description="how many days to look back, default is 180")] = 180,
+    ) -> RetrieveStockStatsIndicatorsBatchResponse:
+        logger.info(f"Retrieving stock stats indicators batch for {[stock.key for stock in stocks]}")
+        request = RetrieveStockStatsIndicatorsBatchRequest(
+            stocks=stocks,
+            indicators=indicators,
+            look_back_days=look_back_days,
+        )
+        return await _retrieve_stock_stats_indicators_batch(request)
+
+    @mcp.tool(
+        name="retrieve_financial_statement_batch",
+        description=f"Retrieve one kind of financial statement for up to {MAX_BATCH_SYMBOLS} companies in one call, returned as a columnar table per report category with a row per company and report date",
+    )
+    async def retrieve_financial_statement_batch(
+        stocks: Annotated[list[StockRef], Field(description="The stocks of the companies, each with market_code ('SH' or 'SZ') and symbol")],
+        statement_type: Annotated[FinancialStatementType, Field(description="The statement to retrieve, available values are 'indicators', 'balance_sheet', 'income_statement' or 'cash_flow_statement'")],
+        report_date_type: Annotated[ReportDateType, Field(description="The type of the report dates, available values are 'by_period', 'quarterly' or 'annual'")],
+        look_back_years: Annotated[int, Field(description="The number of years to look back, default is 2")] = 2,
+        include_yoy: Annotated[bool, Field(description="Whether to include year-over-year (YOY) items, not available for 'indicators', default is False")] = False,
+        include_qoq: Annotated[bool, Field(description="Whether to include quarter-over-quarter (QOQ) items, only available for 'income_statement' and 'cash_flow_statement' when report_date_type is 'quarterly', default is False")] = False,
+    ) -> RetrieveFinancialStatementBatchResponse:
+        logger.info(f"Retrieving financial statement batch {statement_type.value} for {[stock.key for stock in stocks]}")
+        request = RetrieveFinancialStatementBatchRequest(
+            stocks=stocks,
+            statement_type=statement_type,
+            report_date_type=report_date_type,
+            look_back_years=look_back_years,
+            include_yoy=include_yoy,
+            include_qoq=include_qoq,
+        )
+        return await _retrieve_financial_statement_batch(request)
+
     # @mcp.tool(
     #     name="retrieve_company_insider_sentiment",
     #     description="Retrieve company insider sentiment for a company",
@@ -176,7 +252,7 @@ def setup_trading_mcp_server(mcp: FastMCP):
 
     @mcp.tool(
         name="retrieve_financial_balance_sheet",
-        description="Retrieve company balance sheet for a company",
+        description="Retrieve company balance sheet for a company. To compare several companies, use retrieve_financial_statement_batch instead of calling this tool once per company",
     )
     async def retrieve_financial_balance_sheet(
         market_code: Annotated[MarketCode, Field(description="The market code of the stock symbol, available values are 'SH' and 'SZ'")],
@@ -184,6 +260,7 @@ def setup_trading_mcp_server(mcp: FastMCP):
         report_date_type: Annotated[ReportDateType, Field(description="The type of the cash flow statement to retrieve, available values are 'by_period' or 'annual'")],
         include_yoy: Annotated[bool, Field(description="Whether to include year-over-year (YOY) indicators, default is False")] = False,
         look_back_years: Annotated[int, Field(description="The number of years to look back for the cash flow statement, default is 2")] = 2,
+        report_format: Annotated[ReportFormat, Field(description="How the reports are returned: 'markdown' tables for reading, or 'columnar' / 'arrow' for programmatic use, default is 'markdown'")] = ReportFormat.MARKDOWN,
     ) -> RetrieveCompanyBalanceSheetResponse:
         logger.info(f"Retrieving company balance sheet for {symbol}")
         request = RetrieveCompanyBalanceSheetRequest(
@@ -192,12 +269,13 @@ def setup_trading_mcp_server(mcp: FastMCP):
             report_date_type=report_date_type,
             include_yoy=include_yoy,
             look_back_years=look_back_years,
+            report_format=report_format,
         )
         return await _retrieve_company_balance_sheet(request)
 
     @mcp.tool(
         name="retrieve_financial_income_statement",
-        description="Retrieve company financial income statement for a company",
+        description="Retrieve company financial income statement for a company. To compare several companies, use retrieve_financial_statement_batch instead of calling this tool once per company",
     )
     async def retrieve_financial_income_statement(
         market_code: Annotated[MarketCode, Field(description="The market code of the stock symbol, available values are 'SH' and 'SZ'")],
@@ -208,6 +286,7 @@ def setup_trading_mcp_server(mcp: FastMCP):
         include_yoy: Annotated[bool, Field(description="Whether to include year-over-year (YOY) indicators, default is False")],
         include_qoq: Annotated[bool, Field(description="Whether to include quarter-over-quarter (QOQ) indicators, default is False")],
         look_back_years: Annotated[int, Field(description="The number of years to look back for the cash flow statement, default is 5")],
+        report_format: Annotated[ReportFormat, Field(description="How the reports are returned: 'markdown' tables for reading, or 'columnar' / 'arrow' for programmatic use, default is 'markdown'")] = ReportFormat.MARKDOWN,
     ) -> RetrieveCompanyIncomeStatementResponse:
         logger.info(f"Retrieving company income statement for {symbol}")
         request = RetrieveCompanyIncomeStatementRequest(
@@ -217,12 +296,13 @@ def setup_trading_mcp_server(mcp: FastMCP):
             include_yoy=include_yoy,
             include_qoq=include_qoq,
             look_back_years=look_back_years,
+            report_format=report_format,
         )
         return await _retrieve_company_income_statement(request)
 
     @mcp.tool(
         name="retrieve_financial_cash_flow_statement",
-        description="Retrieve company financial cash flow statement for a company",
+        description="Retrieve company financial cash flow statement for a company. To compare several companies, use retrieve_financial_statement_batch instead of calling this tool once per company",
     )
     async def retrieve_financial_cash_flow_statement(
         market_code: Annotated[MarketCode, Field(description="The market code of the stock symbol, available values are 'SH' and 'SZ'")],
@@ -233,6 +313,7 @@ def setup_trading_mcp_server(mcp: FastMCP):
         include_yoy: Annotated[bool, Field(description="Whether to include year-over-year (YOY) indicators, only available when report_date_type is 'by_period' or 'annual', default is False")] = False,
         include_qoq: Annotated[bool, Field(description="Whether to include quarter-over-quarter (QOQ) indicators, only available when report_date_type is 'quarterly', default is False")] = False,
         look_back_years: Annotated[int, Field(description="The number of years to look back for the cash flow statement, default is 3")] = 3,
+        report_format: Annotated[ReportFormat, Field(description="How the reports are returned: 'markdown' tables for reading, or 'columnar' / 'arrow' for programmatic use, default is 'markdown'")] = ReportFormat.MARKDOWN,
     ) -> RetrieveCompanyCashFlowStatementResponse:
         logger.info(f"Retrieving company cash flow statement for {symbol}")
         request = RetrieveCompanyCashFlowStatementRequest(
@@ -242,12 +323,13 @@ def setup_trading_mcp_server(mcp: FastMCP):
             include_yoy=include_yoy,
             include_qoq=include_qoq,
             look_back_years=look_back_years,
+            report_format=report_format,
         )
         return await _retrieve_company_cash_flow_statement(request)
     
     @mcp.tool(
         name="retrieve_financial_analysis_indicators",
-        description="Retrieve company financial analysis indicators for a company",
+        description="Retrieve company financial analysis indicators for a company. To compare several companies, use retrieve_financial_statement_batch instead of calling this tool once per company",
     )
     async def retrieve_financial_analysis_indicators(
         market_code: Annotated[MarketCode, Field(description="The market code of the stock symbol, available values are 'SH' and 'SZ'")],
@@ -256,6 +338,7 @@ def setup_trading_mcp_server(mcp: FastMCP):
         look_back_years: Annotated[
             int, Field(description="The number of years to look back for the financial analysis indicators, default is 2")
         ] = 2,
+        report_format: Annotated[ReportFormat, Field(description="How the reports are returned: 'markdown' tables for reading, or 'columnar' / 'arrow' for programmatic use, default is 'markdown'")] = ReportFormat.MARKDOWN,
     ) -> RetrieveCompanyFinancialAnalysisIndicatorsResponse:
         logger.info(f"Retrieving company financial analysis indicators for {symbol}")
         request = RetrieveCompanyFinancialAnalysisIndicatorsRequest(
@@ -263,6 +346,7 @@ def setup_trading_mcp_server(mcp: FastMCP):
             symbol=symbol,
             report_date_type=report_date_type,
             look_back_years=look_back_years,
+            report_format=report_format,
         )
         return await _retrieve_company_financial_analysis_indicators(request)
 
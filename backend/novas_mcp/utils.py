@@ -1,11 +1,241 @@
+import math
+import re
+from typing import Optional
+
+import numpy as np
 import pandas as pd
 
 
+def _format_number(x):
+    """根据数值大小格式化数字"""
+    if pd.isna(x):
+        return "-"
+
+    try:
+        x = float(x)
+    except (ValueError, TypeError):
+        return str(x)
+
+    abs_x = abs(x)
+    if abs_x >= 1e8:  # 1亿及以上
+        return f"{x/1e8:.2f}亿"
+    elif abs_x >= 1e4:  # 1万及以上
+        return f"{x/1e4:.2f}万"
+    elif abs_x == 0:
+        return "0"
+    elif abs_x < 0.0001:  # 极小数值
+        return f"{x:.4e}"  # 科学计数法
+    else:
+        return f"{x:.4f}".rstrip('0').rstrip('.') if '.' in f"{x:.4f}" else f"{x:.4f}"
+
+
+def _format_numeric_column(column: pd.Series) -> list:
+    """向量化版本的 _format_number，按数值区间分组后批量格式化，结果与逐个调用 _format_number 相同"""
+    if pd.api.types.is_complex_dtype(column.dtype):
+        return [_format_number(x) for x in column.tolist()]
+
+    values = column.to_numpy(dtype=float, na_value=np.nan)
+    abs_values = np.abs(values)
+    formatted = np.empty(len(values), dtype=object)
+
+    is_nan = np.isnan(values)
+    is_yi = abs_values >= 1e8
+    is_wan = (abs_values >= 1e4) & ~is_yi
+    is_zero = abs_values == 0
+    is_tiny = (abs_values < 0.0001) & ~is_zero
+    is_plain = ~(is_nan | is_yi | is_wan | is_zero | is_tiny)
+
+    formatted[is_nan] = "-"
+    formatted[is_zero] = "0"
+    formatted[is_yi] = ["%.2f亿" % v for v in (values[is_yi] / 1e8).tolist()]
+    formatted[is_wan] = ["%.2f万" % v for v in (values[is_wan] / 1e4).tolist()]
+    formatted[is_tiny] = ["%.4e" % v for v in values[is_tiny].tolist()]
+    formatted[is_plain] = [("%.4f" % v).rstrip("0").rstrip(".") for v in values[is_plain].tolist()]
+    return formatted.tolist()
+
+
+# 以下按 tabulate 的 github 格式直接拼接表格，输出与 DataFrame.to_markdown(tablefmt="github") 逐字节相同。
+# 只处理单元格为 str/int/float/None 的单行表格，其他情况（ANSI 控制符、换行、日期等对象）返回 None，
+# 由调用方回退到 to_markdown。
+
+_NUMBER_WITH_THOUSANDS_SEPARATOR = re.compile(
+    r"^(([+-]?[0-9]{1,3})(?:,([0-9]{3}))*)?(?(1)\.[0-9]*|\.[0-9]+)?$"
+)
+# tabulate 推断列类型时的优先级，越大越通用
+_TYPE_NONE, _TYPE_BOOL, _TYPE_INT, _TYPE_FLOAT, _TYPE_STR = 0, 1, 2, 3, 5
+_UNSUPPORTED_CHARS = re.compile(r"[\x1b\r\n]")
+
+
+def _is_int_string(s: str) -> bool:
+    try:
+        int(s)
+        return True
+    except (ValueError, TypeError):
+        return False
+
+
+def _is_float_string(s: str) -> bool:
+    try:
+        f = float(s)
+    except (ValueError, TypeError):
+        return False
+    return not (math.isinf(f) or math.isnan(f)) or s.lower() in ("inf", "-inf", "nan")
+
+
+def _cell_type(value) -> int:
+    value_type = type(value)
+    if value_type is str:
+        if not value:
+            return _TYPE_NONE
+        if value == "True" or value == "False":
+            return _TYPE_BOOL
+        if _is_int_string(value) or ("." not in value and _NUMBER_WITH_THOUSANDS_SEPARATOR.match(value)):
+            return _TYPE_INT
+        if _is_float_string(value) or _NUMBER_WITH_THOUSANDS_SEPARATOR.match(value):
+            return _TYPE_FLOAT
+        return _TYPE_STR
+    if value is None:
+        return _TYPE_NONE
+    if value_type is int:
+        return _TYPE_INT
+    if value_type is float:
+        return _TYPE_FLOAT
+    return -1
+
+
+_SUPPORTED_CELL_TYPES = frozenset((str, int, float, type(None)))
+
+
+def _column_type(cells: list) -> int:
+    if not _SUPPORTED_CELL_TYPES.issuperset(map(type, cells)):
+        return -1
+    column_type = _TYPE_BOOL
+    for value in cells:
+        cell_type = _cell_type(value)
+        if cell_type > column_type:
+            column_type = cell_type
+            if column_type == _TYPE_STR:
+                # 已是最通用的类型，其余单元格不会再改变结果
+                break
+    return column_type
+
+
+def _format_cell(value, column_type: int) -> str:
+    if value is None:
+        return ""
+    if type(value) is str:
+        if not value or column_type != _TYPE_FLOAT:
+            return value
+        if "," in value:
+            value = value.replace(",", "")
+        try:
+            return format(float(value), "g")
+        except (ValueError, TypeError):
+            return value
+    if column_type == _TYPE_FLOAT:
+        return format(float(value), "g")
+    return str(value)
+
+
+def _afterpoint(s: str) -> int:
+    if _is_float_string(s) or _NUMBER_WITH_THOUSANDS_SEPARATOR.match(s):
+        if _is_int_string(s):
+            return -1
+        pos = s.rfind(".")
+        pos = s.lower().rfind("e") if pos < 0 else pos
+        if pos >= 0:
+            return len(s) - pos - 1
+    return -1
+
+
+def _tabulate_width_settings():
+    """与 tabulate 一致的显示宽度函数（安装了 wcwidth 时中文按 2 个字符宽度计算）和最小列宽余量"""
+    import tabulate
+
+    wcwidth = getattr(tabulate, "wcwidth", None)
+    if wcwidth is not None and getattr(tabulate, "WIDE_CHARS_MODE", False):
+        wcswidth = wcwidth.wcswidth
+    else:
+        wcswidth = len
+    return wcswidth, getattr(tabulate, "MIN_PADDING", 2)
+
+
+def _render_github_table(headers: list[str], columns: list[list]) -> Optional[str]:
+    if not columns or not columns[0]:
+        return None
+    for cells in columns[:2]:
+        # tabulate 把前两列中的 "\x01" 视为分隔行
+        if any(type(value) is str and value.strip() == "\x01" for value in cells):
+            return None
+
+    wcswidth, min_padding = _tabulate_width_settings()
+
+    char_widths = {}
+
+    def width(s: str) -> int:
+        if s.isascii() and s.isprintable():
+            return len(s)
+        head = s[:-1]
+        if head.isascii() and head.isprintable():
+            # 常见的 "1.50亿"、"-2.30万"：只有最后一个字符需要查宽度
+            last = s[-1]
+            last_width = char_widths.get(last)
+            if last_width is None:
+                last_width = char_widths[last] = wcswidth(last)
+            if last_width >= 0:
+                return len(head) + last_width
+        return wcswidth(s)
+
+    padded_columns = []
+    column_widths = []
+    header_cells = []
+    for header, cells in zip(headers, columns):
+        column_type = _column_type(cells)
+        if column_type < 0:
+            return None
+        strings = [_format_cell(value, column_type) for value in cells]
+        if _UNSUPPORTED_CHARS.search("".join(strings)) or _UNSUPPORTED_CHARS.search(header):
+            return None
+
+        numeric = column_type in (_TYPE_INT, _TYPE_FLOAT)
+        if numeric:
+            decimals = [_afterpoint(s) for s in strings]
+            max_decimals = max(decimals)
+            strings = [s + (max_decimals - d) * " " for s, d in zip(strings, decimals)]
+        else:
+            strings = [s.strip() for s in strings]
+
+        widths = [width(s) for s in strings]
+        header_width = width(header)
+        if header_width < 0 or min(widths) < 0:
+            return None
+        column_width = max(max(widths), header_width + min_padding)
+        if numeric:
+            padded = [" " * (column_width - w) + s for s, w in zip(strings, widths)]
+            header_cells.append(" " * (column_width - header_width) + header)
+        else:
+            padded = [s + " " * (column_width - w) for s, w in zip(strings, widths)]
+            header_cells.append(header + " " * (column_width - header_width))
+        padded_columns.append(padded)
+        column_widths.append(column_width)
+
+    lines = [
+        "| " + " | ".join(header_cells) + " |",
+        "|" + "|".join("-" * (w + 2) for w in column_widths) + "|",
+    ]
+    lines.extend("| " + " | ".join(row) + " |" for row in zip(*padded_columns))
+    return "\n".join(lines)
+
+
 def format_pd_dataframe_to_markdown(
     df: pd.DataFrame, name: str = None, include_index: bool = False, transpose: bool = False, column_mapping: dict[str, str] = {}
 ) -> str:
     """Format a pandas dataframe to markdown
-    
+
+    Numbers are scaled to 亿/万 in bulk and the github table is joined directly; the output is
+    identical to ``DataFrame.to_markdown(tablefmt="github")``, which is still used for cells
+    the fast path does not handle.
+
     Args:
         df: The pandas dataframe to format
         name: Optional name/title for the dataframe
@@ -13,40 +243,94 @@ def format_pd_dataframe_to_markdown(
         transpose: Whether to transpose the dataframe before formatting
         column_mapping: A dictionary of column names to rename
     """
-    def format_number(x):
-        """根据数值大小格式化数字"""
-        if pd.isna(x):
-            return "-"
-        
-        try:
-            x = float(x)
-        except (ValueError, TypeError):
-            return str(x)
-        
-        abs_x = abs(x)
-        if abs_x >= 1e8:  # 1亿及以上
-            return f"{x/1e8:.2f}亿"
-        elif abs_x >= 1e4:  # 1万及以上
-            return f"{x/1e4:.2f}万"
-        elif abs_x == 0:
-            return "0"
-        elif abs_x < 0.0001:  # 极小数值
-            return f"{x:.4e}"  # 科学计数法
+    table = None
+    if df.columns.is_unique and not isinstance(df.columns, pd.MultiIndex) and not isinstance(df.index, pd.MultiIndex):
+        table = _format_dataframe_fast(df, include_index, transpose, column_mapping)
+    if table is None:
+        table = _format_dataframe_tabulate(df, include_index, transpose, column_mapping)
+
+    if name and len(name.strip()) > 0:
+        return f"{name}\n{table}"
+    else:
+        return table
+
+
+def _format_columns(df: pd.DataFrame) -> Optional[list[list]]:
+    columns = []
+    for _, column in df.items():
+        if pd.api.types.is_numeric_dtype(column.dtype):
+            columns.append(_format_numeric_column(column))
+        elif column.dtype == object or pd.api.types.is_string_dtype(column.dtype):
+            columns.append(column.tolist())
         else:
-            return f"{x:.4f}".rstrip('0').rstrip('.') if '.' in f"{x:.4f}" else f"{x:.4f}"    
+            return None
+    return columns
+
+
+def _format_dataframe_fast(
+    df: pd.DataFrame, include_index: bool, transpose: bool, column_mapping: dict[str, str]
+) -> Optional[str]:
+    columns = _format_columns(df)
+    if columns is None:
+        return None
+    column_labels = [column_mapping.get(label, label) if column_mapping else label for label in df.columns]
+
+    if transpose:
+        # 转置后原来的行变成列，原来的列名变成索引
+        headers = [str(label) for label in df.index]
+        columns = [list(row) for row in zip(*columns)] if columns else []
+        index_name, index_values = df.columns.name, column_labels
+    else:
+        headers = [str(label) for label in column_labels]
+        index_name, index_values = df.index.name, list(df.index)
+
+    if include_index:
+        headers.insert(0, "" if index_name is None else str(index_name))
+        columns.insert(0, index_values)
+    return _render_github_table(headers, columns)
+
+
+def _format_dataframe_tabulate(
+    df: pd.DataFrame, include_index: bool, transpose: bool, column_mapping: dict[str, str]
+) -> str:
     formatted_df = df.copy()
     # 对数值列应用格式化
     for col in formatted_df.columns:
         if pd.api.types.is_numeric_dtype(formatted_df[col]):
-            formatted_df[col] = formatted_df[col].apply(format_number)
-    
+            formatted_df[col] = formatted_df[col].apply(_format_number)
+
     if column_mapping:
         formatted_df = formatted_df.rename(columns=column_mapping)
-        
+
     if transpose:
         formatted_df = formatted_df.T
-    
-    if name and len(name.strip()) > 0:
-        return f"{name}\n{formatted_df.to_markdown(index=include_index, tablefmt="github")}"
-    else:
-        return formatted_df.to_markdown(index=include_index, tablefmt="github")
+
+    return formatted_df.to_markdown(index=include_index, tablefmt="github")
+
+
+if __name__ == "__main__":
+    # 60 列 × 40 期财务报表的格式化耗时，与 tabulate 输出逐字节相同由 tests/test_markdown_tables.py 校验
+    import time
+
+    rng = np.random.default_rng(7)
+
+    def random_statement(n_columns: int, n_periods: int) -> pd.DataFrame:
+        scales = 10.0 ** rng.integers(-6, 12, size=n_columns)
+        data = rng.standard_normal((n_periods, n_columns)) * scales
+        data[rng.random(data.shape) < 0.1] = np.nan
+        df = pd.DataFrame(data, columns=[f"COL_{i}" for i in range(n_columns)])
+        df.insert(0, "REPORT_DATE_NAME", [f"{2024 - i // 4}-{(i % 4 + 1) * 3:02d}-30" for i in range(n_periods)])
+        df.index = df["REPORT_DATE_NAME"].tolist()
+        return df
+
+    statement = random_statement(60, 40)
+    mapping = {f"COL_{i}": f"财务指标{i}" for i in range(60)}
+    for label, fn in (
+        ("tabulate", lambda: _format_dataframe_tabulate(statement, True, True, mapping)),
+        ("fast", lambda: format_pd_dataframe_to_markdown(statement, include_index=True, transpose=True, column_mapping=mapping)),
+    ):
+        fn()
+        started = time.perf_counter()
+        for _ in range(20):
+            fn()
+        print(f"{label}: {(time.perf_counter() - started) / 20 * 1000:.2f} ms per 60x40 statement")
@@ -1,5 +1,9 @@
+import asyncio
+import hashlib
 import logging
 import os
+from collections import OrderedDict
+from functools import lru_cache
 from fastapi import FastAPI, Request, Response
 from pydantic import BaseModel, Field
 from mcp.server.fastmcp import FastMCP
@@ -17,6 +21,15 @@ WEB_PAGE_FETCH_BASE_FOLDER = os.environ.get(
 WEB_PAGE_FETCH_MARKDOWN_CONVERTER_ENGINE_NAME = os.environ.get(
     "WEB_PAGE_FETCH_MARKDOWN_CONVERTER_ENGINE_NAME", "MARKITDOWN"
 )
+WEB_PAGE_FETCH_MARKDOWN_CHUNK_SIZE = int(
+    os.environ.get("WEB_PAGE_FETCH_MARKDOWN_CHUNK_SIZE", "24000")
+)
+WEB_PAGE_FETCH_MARKDOWN_CONCURRENCY = int(
+    os.environ.get("WEB_PAGE_FETCH_MARKDOWN_CONCURRENCY", "4")
+)
+WEB_PAGE_FETCH_MARKDOWN_CACHE_SIZE = int(
+    os.environ.get("WEB_PAGE_FETCH_MARKDOWN_CACHE_SIZE", "1024")
+)
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -66,6 +79,188 @@ async def _save_fetch_result(
     return result_id
 
 
+MARKDOWN_EXTRACTION_SYSTEM_MESSAGE = (
+    "You are a content extraction specialist. Your task is to extract relevant content from HTML and convert it to clean Markdown format.\n\n"
+    "INSTRUCTIONS:\n"
+    "1. Extract ONLY content that is directly relevant to the user's query or page title\n"
+    "2. IGNORE advertisements, recommendations, navigation menus, sidebars, and other peripheral content\n"
+    "3. Preserve the original language of the content - MUST NOT translate it\n"
+    "4. Format the extracted content as clean, well-structured Markdown\n"
+    "5. Maintain the original text content and meaning\n"
+    "6. Focus on the main article/content body\n"
+    "7. Do not add any commentary or additional information not present in the source\n"
+    "8. Only output the markdown content, no other text such as reasoning, explanation, etc.\n"
+    "9. DO NOT process, analyze, or modify the content - only format the original raw content into Markdown\n"
+    "10. Return the formatted original content as-is for subsequent analysis stages\n"
+    "11. When encountering detailed data, especially tables, MUST retain ALL detailed content completely\n"
+    "12. For tables: preserve all rows, columns, headers, and data values without omission\n"
+    "13. For data lists, statistics, or numerical content: include every item and value\n"
+    "14. Never summarize or abbreviate detailed data - maintain complete information integrity\n"
+    "15. The HTML may be one section of a larger page; if it contains nothing relevant, output nothing"
+)
+
+_markdown_chunk_cache: OrderedDict[str, str] = OrderedDict()
+_markdown_chunk_tasks: dict[str, asyncio.Task] = {}
+
+
+@lru_cache()
+def _get_markdown_extraction_service() -> OpenAIChatCompletion:
+    """Chat completion service shared by all LLM based markdown extractions."""
+    return OpenAIChatCompletion(
+        ai_model_id=os.getenv("OPENAI_MODEL_NAME"),
+        async_client=AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            base_url=os.getenv("OPENAI_BASE_URL"),
+        ),
+    )
+
+
+def _split_html_into_sections(html_content: str, max_chunk_chars: int) -> list[str]:
+    """Split cleaned html into ordered chunks along DOM section boundaries.
+
+    Top level elements of the body are packed into chunks of at most
+    `max_chunk_chars`; an element larger than that is split along its own
+    children, each part wrapped in a copy of the element's tag, and text that
+    is still too large is cut by length. Every chunk is well formed html.
+    """
+    from html import escape
+    from lxml import html
+
+    if len(html_content) <= max_chunk_chars:
+        return [html_content]
+
+    root = html.fromstring(html_content)
+    body = root.find("body") if root.tag == "html" else root
+    if body is None:
+        body = root
+
+    def _text_sections(text: str, budget: int) -> list[str]:
+        return [
+            escape(text[i : i + budget], quote=False)
+            for i in range(0, len(text), budget)
+        ]
+
+    def _collect(element, budget: int) -> list[str]:
+        sections: list[str] = []
+        if element.text and element.text.strip():
+            sections.extend(_text_sections(element.text, budget))
+        for child in element:
+            # Comments and processing instructions carry no content
+            if isinstance(child.tag, str):
+                child_html = html.tostring(
+                    child, encoding="unicode", method="html", with_tail=False
+                )
+                if len(child_html) <= budget:
+                    sections.append(child_html)
+                else:
+                    attrs = "".join(
+                        f' {name}="{escape(value)}"'
+                        for name, value in child.attrib.items()
+                    )
+                    open_tag, close_tag = f"<{child.tag}{attrs}>", f"</{child.tag}>"
+                    child_budget = max(budget - len(open_tag) - len(close_tag), 1)
+                    sections.extend(
+                        open_tag + section + close_tag
+                        for section in _collect(child, child_budget)
+                    )
+            if child.tail and child.tail.strip():
+                sections.extend(_text_sections(child.tail, budget))
+        return sections
+
+    chunks: list[str] = []
+    current = ""
+    for section in _collect(body, max_chunk_chars):
+        if current and len(current) + len(section) > max_chunk_chars:
+            chunks.append(current)
+            current = ""
+        current += section
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def _llm_request_markdown_chunk(
+    cache_key: str, system_message: str, html_chunk: str, semaphore: asyncio.Semaphore
+) -> str:
+    chat_completion_service = _get_markdown_extraction_service()
+    settings = chat_completion_service.instantiate_prompt_execution_settings(
+        temperature=0.0
+    )
+    async with semaphore:
+        message_content = await chat_completion_service.get_chat_message_content(
+            chat_history=ChatHistory(
+                messages=[ChatMessageContent(role=AuthorRole.USER, content=html_chunk)]
+            ),
+            system_message=system_message,
+            settings=settings,
+        )
+    markdown_content = (
+        message_content.content
+        if message_content is not None and message_content.content
+        else ""
+    )
+    _markdown_chunk_cache[cache_key] = markdown_content
+    while len(_markdown_chunk_cache) > WEB_PAGE_FETCH_MARKDOWN_CACHE_SIZE:
+        _markdown_chunk_cache.popitem(last=False)
+    return markdown_content
+
+
+async def _llm_extract_markdown_chunk(
+    system_message: str, html_chunk: str, semaphore: asyncio.Semaphore
+) -> str:
+    cache_key = hashlib.sha256(
+        f"{os.getenv('OPENAI_MODEL_NAME')}\0{system_message}\0{html_chunk}".encode("utf-8")
+    ).hexdigest()
+    if cache_key in _markdown_chunk_cache:
+        _markdown_chunk_cache.move_to_end(cache_key)
+        return _markdown_chunk_cache[cache_key]
+
+    # Identical chunks extracted at the same time (repeated sections of one page,
+    # concurrent fetches of the same page) share a single LLM request
+    task = _markdown_chunk_tasks.get(cache_key)
+    if task is None:
+        task = asyncio.create_task(
+            _llm_request_markdown_chunk(cache_key, system_message, html_chunk, semaphore)
+        )
+        _markdown_chunk_tasks[cache_key] = task
+        task.add_done_callback(lambda _: _markdown_chunk_tasks.pop(cache_key, None))
+    # Shielded, so a cancelled caller does not cancel the request for the others
+    return await asyncio.shield(task)
+
+
+async def _llm_convert_html_to_markdown(
+    html_content: str, query: str | None = None, title: str | None = None
+) -> str:
+    """Convert cleaned html to markdown with the LLM, section by section.
+
+    Chunks are extracted concurrently and stitched back in document order.
+    Results are cached per chunk content, so sections repeated across pages
+    (headers, footers, disclaimers) are only sent to the model once.
+    """
+    system_message = MARKDOWN_EXTRACTION_SYSTEM_MESSAGE
+    if query is not None:
+        system_message += f"\n\nPlease extract the main content from the HTML that is relevant to this query: {query}"
+    if title is not None:
+        system_message += f"\n\nOr extract content related to the page title: {title}"
+
+    html_chunks = _split_html_into_sections(
+        html_content, WEB_PAGE_FETCH_MARKDOWN_CHUNK_SIZE
+    )
+    logger.info(f"extracting markdown from {len(html_chunks)} html chunks")
+    semaphore = asyncio.Semaphore(WEB_PAGE_FETCH_MARKDOWN_CONCURRENCY)
+    markdown_chunks = await asyncio.gather(
+        *[
+            _llm_extract_markdown_chunk(system_message, html_chunk, semaphore)
+            for html_chunk in html_chunks
+        ]
+    )
+    final_markdown_content = "\n\n".join(
+        chunk.strip() for chunk in markdown_chunks if chunk and chunk.strip()
+    )
+    logger.info(f"extracted -> markdown: \n {final_markdown_content}")
+    return final_markdown_content
+
+
 async def _playwright_fetch_content_of_url(
     url: str, query: str | None = None, title: str | None = None
 ) -> TextContentFetchResult:
@@ -178,58 +373,11 @@ async def _playwright_fetch_content_of_url(
             converter = markitdown.converters.HtmlConverter()
             fetch_result["markdown_content"] = converter.convert_string(html_content = fetch_result["html_content"]).markdown
         else:
-            chat_completion_service = OpenAIChatCompletion(
-                ai_model_id=os.getenv("OPENAI_MODEL_NAME"),
-                async_client=AsyncOpenAI(
-                    api_key=os.getenv("OPENAI_API_KEY"),
-                    base_url=os.getenv("OPENAI_BASE_URL"),
-                ),
-            )
-            system_message = (
-                "You are a content extraction specialist. Your task is to extract relevant content from HTML and convert it to clean Markdown format.\n\n"
-                "INSTRUCTIONS:\n"
-                "1. Extract ONLY content that is directly relevant to the user's query or page title\n"
-                "2. IGNORE advertisements, recommendations, navigation menus, sidebars, and other peripheral content\n"
-                "3. Preserve the original language of the content - MUST NOT translate it\n"
-                "4. Format the extracted content as clean, well-structured Markdown\n"
-                "5. Maintain the original text content and meaning\n"
-                "6. Focus on the main article/content body\n"
-                "7. Do not add any commentary or additional information not present in the source\n"
-                "8. Only output the markdown content, no other text such as reasoning, explanation, etc.\n"
-                "9. DO NOT process, analyze, or modify the content - only format the original raw content into Markdown\n"
-                "10. Return the formatted original content as-is for subsequent analysis stages\n"
-                "11. When encountering detailed data, especially tables, MUST retain ALL detailed content completely\n"
-                "12. For tables: preserve all rows, columns, headers, and data values without omission\n"
-                "13. For data lists, statistics, or numerical content: include every item and value\n"
-                "14. Never summarize or abbreviate detailed data - maintain complete information integrity"
-            )
-            if query is not None:
-                system_message += f"\n\nPlease extract the main content from the HTML that is relevant to this query: {query}"
-            if title is not None:
-                system_message += f"\n\nOr extract content related to the page title: {fetch_result['title']}"
-
-            logger.info(f"fetched result: \n {fetch_result['html_content']}")
-            settings = chat_completion_service.instantiate_prompt_execution_settings(
-                temperature=0.0
-            )
-            message_content = await chat_completion_service.get_chat_message_content(
-                chat_history=ChatHistory(
-                    messages=[
-                        ChatMessageContent(
-                            role=AuthorRole.USER, content=fetch_result["html_content"]
-                        )
-                    ]
-                ),
-                system_message=system_message,
-                settings=settings,
-            )
-            logger.info(f"extracted -> markdown: \n {message_content.content}")
-            final_markdown_content = (
-                message_content.content
-                if message_content is not None and len(message_content.content) > 0
-                else ""
+            fetch_result["markdown_content"] = await _llm_convert_html_to_markdown(
+                fetch_result["html_content"],
+                query=query,
+                title=fetch_result["title"] if title is not None else None,
             )
-            fetch_result["markdown_content"] = final_markdown_content
         
         final_markdown_content = fetch_result.get("markdown_content")
         logger.info(f"fetched result: \n {fetch_result['markdown_content']}")
@@ -1,20 +1,36 @@
+import asyncio
 import os
 from typing import Dict, Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 from fastapi import FastAPI
 from mcp.server.fastmcp import FastMCP
 from pydantic import BaseModel, Field
 import logging
-from urllib.parse import urljoin
+from .searxng_client import get_searxng_client, get_searxng_metrics
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+WEB_SEARCH_RRF_K = int(os.environ.get("WEB_SEARCH_RRF_K", "60"))
+WEB_SEARCH_PER_QUERY_TIMEOUT = float(
+    os.environ.get("WEB_SEARCH_PER_QUERY_TIMEOUT", "8.0")
+)
+_TRACKING_QUERY_PARAM_PREFIXES = ("utm_",)
+_TRACKING_QUERY_PARAMS = {"spm", "fbclid", "gclid"}
+
 
 class SearXngSearchRequest(BaseModel):
     query: str
     language: str = "en"
 
 
+class SearXngMultiSearchRequest(BaseModel):
+    queries: list[str]
+    language: str = "en"
+    max_results: int = 10
+    per_query_timeout: float = Field(default=WEB_SEARCH_PER_QUERY_TIMEOUT)
+
+
 class SearXngSearchResult(BaseModel):
     url: str
     title: str
@@ -32,56 +48,139 @@ class SearXngSearchResults(BaseModel):
 
 
 async def _seaxng_web_search(query: str, language: str = "en") -> SearXngSearchResults:
-    import httpx
-
     searxng_base_url = os.getenv("SEARXNG_BASE_URL")
     logger.info(f"searxng_base_url: {searxng_base_url}")
 
-    # Prepare search parameters
-    params = {"q": query, "format": "json"}
-    params["language"] = "auto"
-    if language and len(language) > 0:
-        params["language"] = language
-    params["categories"] = "general"
-    params["engines"] = "baidu,sogou"
-
-    # if categories:
-    #     params["categories"] = categories
-    # if engines:
-    #     params["engines"] = engines
-    # if language:
-    #     params["language"] = language
-    # if pageno:
-    #     params["pageno"] = str(pageno)
-
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            urljoin(searxng_base_url, "search"), params=params, timeout=30.0
-        )
-        response.raise_for_status()
-        data = response.json()
-        logger.info(f"searxng_search_results = {data}")
-        results = data["results"] if "results" in data else []
-        search_results = SearXngSearchResults(
-            query=data["query"],
-            num_results=data["number_of_results"],
-            results=[],
-            metadata={},
+    client = get_searxng_client(
+        searxng_base_url,
+        redis_url=os.getenv("SEARXNG_CACHE_REDIS_URL"),
+        cache_ttl=float(os.getenv("SEARXNG_CACHE_TTL", "300")),
+    )
+    data = await client.search(
+        query,
+        engines="baidu,sogou",
+        language=language if language and len(language) > 0 else "auto",
+        categories="general",
+    )
+    logger.info(f"searxng_search_results = {data}")
+    results = data["results"] if "results" in data else []
+    search_results = SearXngSearchResults(
+        query=data["query"],
+        num_results=data["number_of_results"],
+        results=[],
+        metadata={},
+    )
+    for r in results:
+        search_result = SearXngSearchResult(
+            url=r["url"],
+            title=r["title"],
+            snippet=r["content"],
+            thumbnail=r["thumbnail"],
+            category=r["category"],
         )
-        for r in results:
-            search_result = SearXngSearchResult(
-                url=r["url"],
-                title=r["title"],
-                snippet=r["content"],
-                thumbnail=r["thumbnail"],
-                category=r["category"],
-            )
-            search_results.results.append(search_result)
+        search_results.results.append(search_result)
 
-        logger.info(
-            f"search_results = {search_results.model_dump_json(indent=2, exclude_none=True)}"
+    logger.info(
+        f"search_results = {search_results.model_dump_json(indent=2, exclude_none=True)}"
+    )
+    return search_results
+
+
+def _canonicalize_url(url: str) -> str:
+    """Canonical form of a url used to dedup results returned by different engines."""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+    netloc = parts.netloc.lower()
+    if netloc.startswith("www."):
+        netloc = netloc[4:]
+    if parts.scheme in ("http", "https") and netloc.endswith((":80", ":443")):
+        netloc = netloc.rsplit(":", 1)[0]
+    query = urlencode(
+        sorted(
+            (k, v)
+            for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if not k.lower().startswith(_TRACKING_QUERY_PARAM_PREFIXES)
+            and k.lower() not in _TRACKING_QUERY_PARAMS
+        )
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("", netloc, path, query, ""))
+
+
+def _reciprocal_rank_fusion(
+    ranked_lists: list[SearXngSearchResults], max_results: int, k: int = WEB_SEARCH_RRF_K
+) -> list[SearXngSearchResult]:
+    """Merge several ranked result lists with reciprocal rank fusion.
+
+    Each result scores sum(1 / (k + rank)) over the lists it appears in, results
+    are deduplicated by canonical url and ties keep first-seen order.
+    """
+    fused: dict[str, SearXngSearchResult] = {}
+    scores: dict[str, float] = {}
+    for ranked_list in ranked_lists:
+        seen_in_list: set[str] = set()
+        for rank, result in enumerate(ranked_list.results, start=1):
+            key = _canonicalize_url(result.url)
+            if key in seen_in_list:
+                continue
+            seen_in_list.add(key)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            if key not in fused:
+                fused[key] = result.model_copy(
+                    update={"metadata": {**result.metadata, "queries": []}}
+                )
+            fused[key].metadata["queries"].append(ranked_list.query)
+            if not fused[key].snippet and result.snippet:
+                fused[key].snippet = result.snippet
+
+    ordered_keys = sorted(fused.keys(), key=lambda key: -scores[key])[:max_results]
+    for key in ordered_keys:
+        fused[key].metadata["rrf_score"] = round(scores[key], 6)
+    return [fused[key] for key in ordered_keys]
+
+
+async def _seaxng_multi_web_search(
+    queries: list[str],
+    language: str = "en",
+    max_results: int = 10,
+    per_query_timeout: float = WEB_SEARCH_PER_QUERY_TIMEOUT,
+) -> SearXngSearchResults:
+    """Run several query reformulations concurrently and fuse their results.
+
+    A query that fails or misses its deadline is left out of the fusion and
+    reported in the metadata, so one slow engine does not hold up the answer.
+    """
+    unique_queries = list(dict.fromkeys(q.strip() for q in queries if q and q.strip()))
+
+    async def _search_with_deadline(query: str) -> SearXngSearchResults:
+        return await asyncio.wait_for(
+            _seaxng_web_search(query, language), timeout=per_query_timeout
         )
-        return search_results
+
+    outcomes = await asyncio.gather(
+        *[_search_with_deadline(query) for query in unique_queries],
+        return_exceptions=True,
+    )
+    ranked_lists: list[SearXngSearchResults] = []
+    failed_queries: dict[str, str] = {}
+    for query, outcome in zip(unique_queries, outcomes):
+        if isinstance(outcome, BaseException):
+            logger.warning(f"multi web search - query {query!r} failed: {outcome!r}")
+            failed_queries[query] = (
+                "timeout" if isinstance(outcome, asyncio.TimeoutError) else str(outcome)
+            )
+        else:
+            ranked_lists.append(outcome)
+
+    results = _reciprocal_rank_fusion(ranked_lists, max_results)
+    return SearXngSearchResults(
+        query=" | ".join(unique_queries),
+        num_results=len(results),
+        results=results,
+        metadata={"queries": unique_queries, "failed_queries": failed_queries},
+    )
 
 
 def setup_web_search(app: FastAPI):
@@ -91,10 +190,43 @@ def setup_web_search(app: FastAPI):
     async def web_search_api(request: SearXngSearchRequest) -> SearXngSearchResults:
         return await _seaxng_web_search(request.query, request.language)
 
+    @app.post(
+        "/api/v1/web_search/multi",
+        tags=["web_search"],
+        response_model=SearXngSearchResults,
+    )
+    async def web_multi_search_api(
+        request: SearXngMultiSearchRequest,
+    ) -> SearXngSearchResults:
+        return await _seaxng_multi_web_search(
+            request.queries,
+            request.language,
+            max_results=request.max_results,
+            per_query_timeout=request.per_query_timeout,
+        )
+
+    @app.get("/api/v1/web_search/metrics", tags=["web_search"])
+    async def web_search_metrics_api() -> Dict[str, Dict[str, Any]]:
+        return get_searxng_metrics()
+
     mcp = FastMCP(name="web_search", version="1.0.0", stateless_http=True)
 
     @mcp.tool(name="web_search", description="Search the web for information")
     async def web_search_mcp(request: SearXngSearchRequest) -> SearXngSearchResults:
         return await _seaxng_web_search(request.query, request.language)
 
+    @mcp.tool(
+        name="web_multi_search",
+        description="Search the web with several reformulations of a query at once and return the fused, deduplicated results",
+    )
+    async def web_multi_search_mcp(
+        request: SearXngMultiSearchRequest,
+    ) -> SearXngSearchResults:
+        return await _seaxng_multi_web_search(
+            request.queries,
+            request.language,
+            max_results=request.max_results,
+            per_query_timeout=request.per_query_timeout,
+        )
+
     return mcp
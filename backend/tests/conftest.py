@@ -0,0 +1,20 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from novas_app.db import database
+from novas_app.db.models import DbAppBase
+
+
+@pytest.fixture
+async def app_db(tmp_path, monkeypatch):
+    """Point the app database at a fresh SQLite file."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(DbAppBase.metadata.create_all)
+    monkeypatch.setattr(
+        database,
+        "app_session_factory",
+        async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    )
+    yield engine
+    await engine.dispose()
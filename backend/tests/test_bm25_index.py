@@ -0,0 +1,19 @@
+import numpy as np
+
+from novas_app.features.files.bm25_index import FileLexicalIndex, bm25_scores, fuse_scores
+
+
+def test_web_documents_and_file_chunks_share_one_fused_scale():
+    # Reranking scores web documents as one more lexical index ahead of the files
+    text = "Kweichow Moutai 600519 annual report"
+    indexes = [
+        FileLexicalIndex.build("web", [text, "unrelated weather news"]),
+        FileLexicalIndex.build("file-1", ["quarterly cash flow", text]),
+    ]
+    cosine = np.array([0.4, 0.4, 0.4, 0.4], dtype=np.float32)
+
+    scores = fuse_scores(cosine, bm25_scores(indexes, "600519 annual report"), 0.3)
+
+    assert scores[0] == scores[3]
+    assert scores[0] > 0.4 > scores[1]
+    assert scores[1] == scores[2]
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from novas_app.core.utils.compute_similarity import (
+    compute_similarities,
+    compute_similarity,
+    top_k_indices,
+)
+
+
+def _pairwise_similarities(query, vectors) -> list[float]:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return [compute_similarity(query, vector) for vector in vectors]
+
+
+def _pairwise_top_k(similarities, k: int, threshold: float) -> list[int]:
+    """The selection _rerank_docs made before it was vectorized"""
+    ranked = sorted(
+        [
+            {"index": i, "similarity": s}
+            for i, s in enumerate(similarities)
+            if s > threshold
+        ],
+        key=lambda x: -x["similarity"],
+    )[:k]
+    return [x["index"] for x in ranked]
+
+
+def _vectors(seed: int, rows: int, dims: int = 64) -> tuple[list[float], list[list[float]]]:
+    rng = np.random.default_rng(seed)
+    query = rng.normal(size=dims).tolist()
+    vectors = rng.normal(size=(rows, dims))
+    # Duplicated rows tie exactly, zero rows have no direction
+    vectors[1::7] = vectors[0]
+    vectors[3::11] = 0.0
+    return query, vectors.tolist()
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_batched_similarities_match_pairwise(seed):
+    query, vectors = _vectors(seed, rows=200)
+
+    expected = np.array(_pairwise_similarities(query, vectors))
+    actual = compute_similarities(query, vectors)
+
+    assert actual.dtype == np.float32
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-6, equal_nan=True)
+
+
+def test_batched_similarities_of_no_vectors_is_empty():
+    assert compute_similarities([1.0, 0.0], []).shape == (0,)
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("k, threshold", [(15, 0.0), (15, -1.0), (8, 0.1), (500, 0.0), (0, 0.0)])
+def test_top_k_matches_stable_sort(seed, k, threshold):
+    query, vectors = _vectors(seed, rows=200)
+    similarities = _pairwise_similarities(query, vectors)
+
+    assert top_k_indices(np.array(similarities), k, threshold) == _pairwise_top_k(
+        similarities, k, threshold
+    )
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_batched_rerank_selects_the_same_documents(seed):
+    query, vectors = _vectors(seed, rows=300)
+
+    expected = _pairwise_top_k(_pairwise_similarities(query, vectors), 15, 0.1)
+    actual = top_k_indices(compute_similarities(query, vectors), 15, 0.1)
+
+    assert len(expected) == 15
+
+    assert actual == expected
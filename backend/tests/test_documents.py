@@ -0,0 +1,44 @@
+from novas_app.features.documents import extract_readable_text
+
+ARTICLE_TEXT = "The quarterly report shows revenue grew by twelve percent. " * 5
+
+
+def _extract(html: str) -> str:
+    return extract_readable_text(html.encode("utf-8"), "text/html; charset=utf-8")[1]
+
+
+def test_boilerplate_is_removed():
+    text = _extract(f"""
+        <html><head><title>T</title><script>var x = 1;</script></head><body>
+        <nav>Home | About</nav>
+        <div class="cookie-banner">We use cookies</div>
+        <p>{ARTICLE_TEXT}</p>
+        <div id="comments">First!</div>
+        <footer>Copyright</footer>
+        </body></html>
+    """)
+    assert text == ARTICLE_TEXT.strip()
+
+
+def test_content_inside_boilerplate_named_wrappers_is_kept():
+    text = _extract(f"""
+        <html><body>
+        <div class="container has-sidebar">
+          <div class="sidebar">Popular posts</div>
+          <article><h1>Results</h1><p>{ARTICLE_TEXT}</p>
+            <div class="share">Share this</div>
+          </article>
+        </div>
+        </body></html>
+    """)
+    assert text == f"Results\n{ARTICLE_TEXT.strip()}"
+
+
+def test_page_wide_form_and_role_main_are_kept():
+    text = _extract(f"""
+        <html><body><form id="aspnetForm">
+          <header>Site header</header>
+          <div role="main" class="main-menu-layout"><p>{ARTICLE_TEXT}</p></div>
+        </form></body></html>
+    """)
+    assert text == ARTICLE_TEXT.strip()
@@ -0,0 +1,62 @@
+import os
+
+import numpy as np
+import pytest
+
+from novas_app.features.files.embedding_store import EmbeddingStore
+
+
+def _vectors(count: int, dim: int, seed: int) -> list[list[float]]:
+    return np.random.default_rng(seed).normal(size=(count, dim)).tolist()
+
+
+def test_write_and_load_roundtrip(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    store.write("f1", "title", ["a", "béta", ""], _vectors(3, 8, 0))
+
+    loaded = store.load("f1")
+    assert loaded.title == "title"
+    assert [loaded.chunk(i) for i in range(len(loaded))] == ["a", "béta", ""]
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_rewrite_keeps_open_mappings_intact(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    store.write("f1", "old", ["one", "two"], _vectors(2, 4, 0))
+    old = store.load("f1")
+    old_embeddings = np.array(old.embeddings)
+
+    store.write("f1", "new", ["three", "four", "five"], _vectors(3, 6, 1))
+
+    # The previous mapping still points at the replaced files
+    assert np.array_equal(old.embeddings, old_embeddings)
+    assert [old.chunk(i) for i in range(len(old))] == ["one", "two"]
+    new = store.load("f1")
+    assert new is not old
+    assert new.title == "new"
+    assert new.embeddings.shape == (3, 6)
+    assert [new.chunk(i) for i in range(len(new))] == ["three", "four", "five"]
+
+
+def test_failed_write_leaves_previous_version(tmp_path, monkeypatch):
+    store = EmbeddingStore(str(tmp_path))
+    store.write("f1", "old", ["one"], _vectors(1, 4, 0))
+
+    calls = 0
+    original = EmbeddingStore._write_temp
+
+    def failing_write_temp(path, write):
+        nonlocal calls
+        calls += 1
+        if calls == 3:
+            raise OSError("disk full")
+        return original(path, write)
+
+    monkeypatch.setattr(EmbeddingStore, "_write_temp", staticmethod(failing_write_temp))
+    with pytest.raises(OSError):
+        store.write("f1", "new", ["two", "three"], _vectors(2, 4, 1))
+
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+    loaded = store.load("f1")
+    assert loaded.title == "old"
+    assert [loaded.chunk(i) for i in range(len(loaded))] == ["one"]
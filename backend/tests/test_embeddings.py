@@ -0,0 +1,49 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+
+from novas_app.core.embeddings import EmbeddingService, embedding_model_name
+
+
+def _service(delay: float = 0.0) -> EmbeddingService:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(delay)
+        texts = json.loads(request.content)["input"]
+        return httpx.Response(
+            200,
+            json={"data": [{"index": i, "embedding": [float(len(t)), 1.0]} for i, t in enumerate(texts)]}
+        )
+
+    service = EmbeddingService("openai", "stub-model", "http://stub/v1", batch_window=0.001)
+    service._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return service
+
+
+async def test_concurrent_callers_share_requests():
+    service = _service()
+    first, second = await asyncio.gather(
+        service.embed_documents(["a", "bb"]),
+        service.embed_documents(["bb", "ccc"]),
+    )
+    assert first == [[1.0, 1.0], [2.0, 1.0]]
+    assert second == [[2.0, 1.0], [3.0, 1.0]]
+
+
+async def test_cancelled_caller_does_not_cancel_others():
+    service = _service(delay=0.05)
+    cancelled = asyncio.create_task(service.embed_documents(["shared", "a"]))
+    survivor = asyncio.create_task(service.embed_documents(["shared"]))
+    await asyncio.sleep(0.01)
+    cancelled.cancel()
+
+    assert await survivor == [[6.0, 1.0]]
+    assert cancelled.cancelled()
+
+
+def test_embedding_model_name():
+    assert embedding_model_name(SimpleNamespace(model="text-embedding-3-small")) == "text-embedding-3-small"
+    assert embedding_model_name(SimpleNamespace(model_name="bge-m3")) == "bge-m3"
+    assert embedding_model_name(SimpleNamespace()) is None
+    assert embedding_model_name(_service()) == "stub-model"
@@ -0,0 +1,93 @@
+import io
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI, File, UploadFile
+
+from novas_app.features.files import ingestion
+from novas_app.features.files.ingestion import UploadSizeLimitMiddleware
+from novas_app.features.files.service import FileService
+from novas_app.features.files.storage import store_upload
+
+
+def _finish(file_id: str, status: str, age: timedelta) -> None:
+    ingestion._update_status(file_id, status=status)
+    ingestion._ingestion_statuses[file_id] = ingestion._ingestion_statuses[file_id].model_copy(
+        update={"updatedAt": datetime.now() - age}
+    )
+
+
+def test_finished_statuses_expire(monkeypatch):
+    monkeypatch.setattr(ingestion, "_ingestion_statuses", {})
+    for file_id in ("old-done", "old-failed", "old-running", "new-done"):
+        ingestion.register_ingestion(file_id, f"{file_id}.txt")
+    _finish("old-done", "completed", timedelta(hours=2))
+    _finish("old-failed", "failed", timedelta(hours=2))
+    _finish("old-running", "parsing", timedelta(hours=2))
+    _finish("new-done", "completed", timedelta(minutes=1))
+
+    ingestion.register_ingestion("next", "next.txt")
+
+    assert set(ingestion._ingestion_statuses) == {"old-running", "new-done", "next"}
+
+
+def test_statuses_are_bounded(monkeypatch):
+    monkeypatch.setattr(ingestion, "_ingestion_statuses", {})
+    monkeypatch.setattr(ingestion, "MAX_INGESTION_STATUSES", 3)
+    for i in range(3):
+        ingestion.register_ingestion(f"f{i}", "f.txt")
+        _finish(f"f{i}", "completed", timedelta(minutes=10 - i))
+
+    ingestion.register_ingestion("f3", "f.txt")
+    ingestion.register_ingestion("f4", "f.txt")
+
+    # The oldest finished ones make room, pending ones are kept
+    assert list(ingestion._ingestion_statuses) == ["f2", "f3", "f4"]
+
+
+def _upload_app(limit: int) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, max_body_size=limit)
+
+    @app.post("/api/v1/uploads")
+    async def upload(files: list[UploadFile] = File(...)) -> dict:
+        return {"sizes": [len(await f.read()) for f in files]}
+
+    return app
+
+
+async def test_upload_size_limit():
+    transport = httpx.ASGITransport(app=_upload_app(1000))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        small = await client.post("/api/v1/uploads", files={"files": ("a.txt", b"x" * 100)})
+        assert small.status_code == 200
+        assert small.json() == {"sizes": [100]}
+
+        large = await client.post("/api/v1/uploads", files={"files": ("a.txt", b"x" * 2000)})
+        assert large.status_code == 413
+
+        async def chunked_body():
+            yield b'--b\r\nContent-Disposition: form-data; name="files"; filename="a.txt"\r\n\r\n'
+            for _ in range(10):
+                yield b"x" * 500
+
+        streamed = await client.post(
+            "/api/v1/uploads",
+            content=chunked_body(),
+            headers={"content-type": "multipart/form-data; boundary=b"}
+        )
+        assert streamed.status_code == 413
+
+
+async def test_status_requires_a_reference(app_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(ingestion, "_ingestion_statuses", {})
+    monkeypatch.chdir(tmp_path)
+    upload = UploadFile(file=io.BytesIO(b"hello"), filename="a.txt")
+    stored = await store_upload(upload, "alice", str(tmp_path), "txt", max_bytes=100)
+    ingestion.register_ingestion(stored.sha256, "a.txt")
+
+    service = FileService()
+    alice, bob = SimpleNamespace(id="alice"), SimpleNamespace(id="bob")
+    assert (await service.get_ingestion_status(stored.sha256, alice)).status == "pending"
+    assert await service.get_ingestion_status(stored.sha256, bob) is None
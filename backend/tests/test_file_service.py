@@ -0,0 +1,98 @@
+import io
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from novas_app.features.files import ann_index, service as file_service
+from novas_app.features.files.ann_index import get_user_ann_index, index_user_files
+from novas_app.features.files.bm25_index import get_lexical_store
+from novas_app.features.files.embedding_store import get_embedding_store
+from novas_app.features.files.service import FileService
+from novas_app.features.files.storage import collect_unreferenced_blobs, release_upload, store_upload
+
+ALICE, BOB = SimpleNamespace(id="alice"), SimpleNamespace(id="bob")
+CHUNKS = ["alpha chunk", "beta chunk", "gamma chunk"]
+VECTORS = [[1.0, 0.0], [0.0, 1.0], [0.7, 0.7]]
+
+
+class StubEmbeddingService:
+    async def embed_query(self, text: str) -> list[float]:
+        return [1.0, 0.0]
+
+
+@pytest.fixture
+def uploads(app_db, tmp_path, monkeypatch):
+    """Run in a temp directory with a stub embedding service and fresh indexes."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(file_service, "get_embedding_service", lambda: StubEmbeddingService())
+    monkeypatch.setattr(ann_index, "_user_indexes", ann_index.OrderedDict())
+    return tmp_path / "uploads"
+
+
+async def _upload_embedded(user, content: bytes, upload_dir, chunks=CHUNKS, vectors=VECTORS) -> str:
+    upload_dir.mkdir(exist_ok=True)
+    upload = UploadFile(file=io.BytesIO(content), filename="a.txt")
+    stored = await store_upload(upload, user.id, str(upload_dir), "txt", max_bytes=100)
+    get_embedding_store().write(stored.sha256, "a.txt", chunks, vectors)
+    get_lexical_store().write(stored.sha256, chunks)
+    return stored.sha256
+
+
+async def test_search_rejects_files_of_other_users(uploads):
+    file_id = await _upload_embedded(ALICE, b"alice's file", uploads)
+
+    with pytest.raises(HTTPException) as error:
+        await FileService().search_files("alpha", BOB, [file_id])
+    assert error.value.status_code == 404
+    # Nothing was indexed for the caller
+    assert file_id not in get_user_ann_index(BOB.id)
+
+    response = await FileService().search_files("alpha", ALICE, [file_id], top_k=1)
+    assert [(r.fileId, r.content) for r in response.results] == [(file_id, "alpha chunk")]
+
+
+async def test_search_without_file_ids_only_scores_candidate_files(uploads, monkeypatch):
+    close = await _upload_embedded(
+        ALICE, b"close", uploads, [f"close {i}" for i in range(4)], [[1.0, 0.1 * i] for i in range(4)]
+    )
+    far = [
+        await _upload_embedded(ALICE, content, uploads, ["far alpha"], [[-1.0, 0.0]])
+        for content in (b"far 1", b"far 2")
+    ]
+    await FileService().search_files("alpha", ALICE, far + [close])
+
+    lexical_store = get_lexical_store()
+    loaded = []
+    load = lexical_store.load
+    monkeypatch.setattr(lexical_store, "load", lambda file_id: loaded.append(file_id) or load(file_id))
+    response = await FileService().search_files("close", ALICE, top_k=1)
+
+    assert [r.content for r in response.results] == ["close 0"]
+    assert loaded == [close]
+
+
+async def test_release_removes_the_file_from_the_index(uploads):
+    file_id = await _upload_embedded(ALICE, b"shared", uploads)
+    await _upload_embedded(ALICE, b"shared", uploads)
+    await _upload_embedded(BOB, b"shared", uploads)
+    await FileService().search_files("alpha", ALICE, [file_id])
+    await FileService().search_files("alpha", BOB, [file_id])
+
+    # Alice still holds a second reference
+    await release_upload(file_id, ALICE.id)
+    assert file_id in get_user_ann_index(ALICE.id)
+    await release_upload(file_id, ALICE.id)
+    assert file_id not in get_user_ann_index(ALICE.id)
+    assert file_id in get_user_ann_index(BOB.id)
+
+
+async def test_gc_removes_the_file_from_loaded_indexes(uploads):
+    file_id = await _upload_embedded(ALICE, b"collected", uploads)
+    # Left in the index of a user without a reference, e.g. from before releases unindexed files
+    index_user_files(BOB.id, [file_id])
+    await release_upload(file_id, ALICE.id)
+
+    assert await collect_unreferenced_blobs(str(uploads), grace_period=timedelta(0)) == 1
+    assert file_id not in get_user_ann_index(BOB.id)
@@ -0,0 +1,79 @@
+import asyncio
+import io
+import os
+import threading
+from datetime import timedelta
+
+from fastapi import UploadFile
+
+from novas_app.db.database import get_app_session
+from novas_app.db.service import FileBlobDbService
+from novas_app.features.files import ingestion, storage
+from novas_app.features.files.storage import collect_unreferenced_blobs, release_upload, store_upload
+
+
+def _upload(content: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename="a.txt")
+
+
+async def _ref_count(sha256: str) -> int:
+    async with get_app_session() as session:
+        blob = await FileBlobDbService(session).fetch_blob(sha256)
+        return blob.ref_count if blob is not None else 0
+
+
+async def test_references_are_counted(app_db, tmp_path):
+    first = await store_upload(_upload(b"same"), "alice", str(tmp_path), "txt", max_bytes=100)
+    second = await store_upload(_upload(b"same"), "bob", str(tmp_path), "txt", max_bytes=100)
+
+    assert first.created and not second.created
+    assert first.sha256 == second.sha256
+    assert await _ref_count(first.sha256) == 2
+    assert await release_upload(first.sha256, "alice")
+    assert not await release_upload(first.sha256, "alice")
+    assert await _ref_count(first.sha256) == 1
+
+
+async def test_gc_deletes_unreferenced_blobs_and_their_status(app_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(ingestion, "_ingestion_statuses", {})
+    kept = await store_upload(_upload(b"kept"), "alice", str(tmp_path), "txt", max_bytes=100)
+    dropped = await store_upload(_upload(b"dropped"), "alice", str(tmp_path), "txt", max_bytes=100)
+    ingestion.register_ingestion(dropped.sha256, "a.txt")
+    await release_upload(dropped.sha256, "alice")
+
+    assert await collect_unreferenced_blobs(str(tmp_path), grace_period=timedelta(0)) == 1
+
+    assert os.path.exists(kept.file_path)
+    assert not os.path.exists(dropped.file_path)
+    assert ingestion.get_ingestion_status(dropped.sha256) is None
+
+
+async def test_upload_during_gc_keeps_the_blob(app_db, tmp_path, monkeypatch):
+    stored = await store_upload(_upload(b"racy"), "alice", str(tmp_path), "txt", max_bytes=100)
+    await release_upload(stored.sha256, "alice")
+
+    deleting, resume = threading.Event(), threading.Event()
+    delete_blob_files = storage._delete_blob_files
+
+    def slow_delete_blob_files(*args):
+        deleting.set()
+        resume.wait(5)
+        delete_blob_files(*args)
+
+    monkeypatch.setattr(storage, "_delete_blob_files", slow_delete_blob_files)
+    gc = asyncio.create_task(collect_unreferenced_blobs(str(tmp_path), grace_period=timedelta(0)))
+    await asyncio.to_thread(deleting.wait, 5)
+
+    # The bytes are still on disk, but about to be deleted
+    upload = asyncio.create_task(
+        store_upload(_upload(b"racy"), "bob", str(tmp_path), "txt", max_bytes=100)
+    )
+    await asyncio.sleep(0.05)
+    assert not upload.done()
+    resume.set()
+
+    assert await gc == 1
+    stored_again = await upload
+    assert stored_again.created
+    assert os.path.exists(stored_again.file_path)
+    assert await _ref_count(stored.sha256) == 1
@@ -0,0 +1,29 @@
+import subprocess
+import sys
+
+import pytest
+
+# The benchmarks are run as `python -m novas_app.features.files.<module>`, so each
+# module has to import on its own, without the app having loaded the other features.
+MODULES = [
+    "novas_app.features.files",
+    "novas_app.features.files.embedding_store",
+    "novas_app.features.files.ann_index",
+    "novas_app.features.files.bm25_index",
+    "novas_app.features.files.relevance_benchmark",
+    "novas_app.features.files.ingestion",
+    "novas_app.features.files.storage",
+    "novas_app.features.files.service",
+    "novas_app.features.files.router",
+]
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_module_imports_in_a_fresh_interpreter(module):
+    result = subprocess.run(
+        [sys.executable, "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from novas_mcp.utils import _format_dataframe_tabulate, format_pd_dataframe_to_markdown
+
+NUM_FUZZED_TABLES = 16000
+BATCH_SIZE = 1000
+
+EDGE_VALUES = [
+    0.0, -0.0, 1e-5, -5e-5, 1e-4, 0.99999, 1.00004, 9999.99999, 1e4, 99999999.99, 1e8,
+    -1e8, 123456789012345.0, float("inf"), float("-inf"), np.nan, 12, -3, 1.5, 1234.5678,
+]
+STRINGS = [
+    "a", " b ", "1,000", "1e5", "-2.50", "0x1F", "nan", "inf", "True", "", None, "中文", "贵州茅台",
+    "６００５１９", "x|y", "12", "3.0", " 7 ", "1_000", "−5", "é", "2024-03-31",
+]
+
+
+def _random_column(rng: np.random.Generator, n_rows: int) -> pd.Series:
+    kind = rng.integers(0, 8)
+    if kind == 0:
+        values = rng.standard_normal(n_rows) * 10.0 ** rng.integers(-8, 14)
+        values[rng.random(n_rows) < 0.15] = np.nan
+        return pd.Series(values)
+    if kind == 1:
+        return pd.Series(rng.integers(-10 ** int(rng.integers(1, 12)), 10 ** int(rng.integers(1, 12)), n_rows))
+    if kind == 2:
+        return pd.Series(rng.choice(EDGE_VALUES, n_rows))
+    if kind == 3:
+        return pd.Series(rng.random(n_rows) < 0.5)
+    if kind == 4:
+        return pd.Series([STRINGS[i] for i in rng.integers(0, len(STRINGS), n_rows)], dtype=object)
+    if kind == 5:
+        values = [None if rng.random() < 0.3 else int(v) for v in rng.integers(-1000, 1000, n_rows)]
+        return pd.Series(pd.array(values, dtype="Int64"))
+    if kind == 6:
+        return pd.Series(np.round(rng.standard_normal(n_rows), int(rng.integers(0, 6))))
+    return pd.Series(pd.date_range("2024-01-01", periods=n_rows))
+
+
+def _random_case(seed: int):
+    rng = np.random.default_rng(seed)
+    n_rows, n_columns = int(rng.integers(1, 9)), int(rng.integers(1, 7))
+    df = pd.DataFrame({f"COL_{i}": _random_column(rng, n_rows) for i in range(n_columns)})
+    if rng.random() < 0.5:
+        df.index = [f"{2024 - i // 4}-{(i % 4 + 1) * 3:02d}-30" for i in range(n_rows)]
+    if rng.random() < 0.3:
+        df.index.name = "REPORT_DATE"
+    mapping = {f"COL_{i}": f"指标{i}" for i in range(0, n_columns, 2)} if rng.random() < 0.5 else {}
+    return df, bool(rng.random() < 0.5), bool(rng.random() < 0.5), mapping
+
+
+def _assert_same_as_tabulate(df, include_index, transpose, mapping):
+    expected = _format_dataframe_tabulate(df, include_index, transpose, mapping)
+    actual = format_pd_dataframe_to_markdown(
+        df, include_index=include_index, transpose=transpose, column_mapping=mapping
+    )
+    assert actual == expected, f"\n{actual}\n---\n{expected}"
+
+
+@pytest.mark.parametrize("first_seed", range(0, NUM_FUZZED_TABLES, BATCH_SIZE))
+def test_fuzzed_tables_match_tabulate(first_seed):
+    for seed in range(first_seed, first_seed + BATCH_SIZE):
+        _assert_same_as_tabulate(*_random_case(seed))
+
+
+@pytest.mark.parametrize("include_index", [True, False])
+@pytest.mark.parametrize("transpose", [True, False])
+def test_edge_values_match_tabulate(include_index, transpose):
+    df = pd.DataFrame({
+        "value": EDGE_VALUES,
+        "int": list(range(-10, 10)),
+        "flag": [True, False] * 10,
+        "text": (STRINGS * 2)[:20],
+        "small": [0.5] * 20,
+        "nullable": pd.array([1, None] * 10, dtype="Int64"),
+    })
+    _assert_same_as_tabulate(df, include_index, transpose, {})
+
+
+def test_financial_statement_matches_tabulate():
+    rng = np.random.default_rng(7)
+    n_columns, n_periods = 60, 40
+    data = rng.standard_normal((n_periods, n_columns)) * 10.0 ** rng.integers(-6, 12, size=n_columns)
+    data[rng.random(data.shape) < 0.1] = np.nan
+    df = pd.DataFrame(data, columns=[f"COL_{i}" for i in range(n_columns)])
+    df.insert(0, "REPORT_DATE_NAME", [f"{2024 - i // 4}-{(i % 4 + 1) * 3:02d}-30" for i in range(n_periods)])
+    df.index = df["REPORT_DATE_NAME"].tolist()
+    mapping = {f"COL_{i}": f"财务指标{i}" for i in range(n_columns)}
+    _assert_same_as_tabulate(df, True, True, mapping)
+
+
+def test_name_is_prepended():
+    df = pd.DataFrame({"a": [1.0]})
+    assert format_pd_dataframe_to_markdown(df, name="利润表") == "利润表\n|   a |\n|-----|\n|   1 |"
+    assert format_pd_dataframe_to_markdown(df, name="  ") == "|   a |\n|-----|\n|   1 |"
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from novas_agents.sk_mcp_pool import McpSessionPool
+
+
+class _FakeSession:
+    async def send_ping(self):
+        return None
+
+
+class _FakePlugin:
+    def __init__(self, connected: asyncio.Event | None = None):
+        self.name = "trading"
+        self.session = None
+        self.closed = False
+        self._connected = connected
+
+    async def connect(self):
+        if self._connected is not None:
+            await self._connected.wait()
+        self.session = _FakeSession()
+
+    async def close(self):
+        self.closed = True
+
+
+def _pool(monkeypatch, plugins: list, **kwargs) -> McpSessionPool:
+    pool = McpSessionPool("trading", "http://mcp.test/sse", **kwargs)
+    monkeypatch.setattr(pool, "_create_plugin", lambda: plugins.pop(0))
+    return pool
+
+
+async def test_returned_sessions_are_reused(monkeypatch):
+    plugin = _FakePlugin()
+    pool = _pool(monkeypatch, [plugin])
+    async with pool.lease() as first:
+        pass
+    async with pool.lease() as second:
+        pass
+    assert first is second is plugin
+    await pool.close()
+    assert plugin.closed
+
+
+async def test_lease_times_out_when_all_sessions_are_leased(monkeypatch):
+    pool = _pool(monkeypatch, [_FakePlugin(), _FakePlugin()], max_size=1, acquire_timeout=0.05)
+    async with pool.lease():
+        with pytest.raises(TimeoutError):
+            async with pool.lease():
+                pass
+    # The slot of the timed out lease was not lost
+    async with pool.lease():
+        pass
+    await pool.close()
+
+
+async def test_session_is_closed_when_lease_is_cancelled_while_connecting(monkeypatch):
+    connected = asyncio.Event()
+    plugin = _FakePlugin(connected)
+    pool = _pool(monkeypatch, [plugin, _FakePlugin()], max_size=1)
+
+    async def run():
+        async with pool.lease():
+            pass
+
+    task = asyncio.create_task(run())
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    connected.set()
+    for _ in range(10):
+        await asyncio.sleep(0)
+    assert plugin.closed
+    async with pool.lease() as next_plugin:
+        assert next_plugin is not plugin
+    await pool.close()
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+
+import pytest
+from semantic_kernel.kernel import Kernel
+
+from novas_agents import sk_trading_agent
+from novas_agents.sk_trading_agent import (
+    FinancialTradingAgent,
+    FinancialTradingAgentConfig,
+    ToolResultMemo,
+)
+
+KEY = ToolResultMemo.make_key("trading", "get_stock_data", {"symbol": "600519"})
+
+
+class _Tool:
+    """Tool whose calls block until released, failing the first `failures` of them"""
+
+    def __init__(self, failures: int = 0):
+        self.calls = 0
+        self.failures = failures
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        call = self.calls
+        await self.release.wait()
+        if call <= self.failures:
+            raise ValueError(f"call {call} failed")
+        return f"result {call}"
+
+
+async def test_duplicate_calls_join_the_call_in_flight():
+    memo = ToolResultMemo()
+    tool = _Tool()
+    tasks = [asyncio.create_task(memo.get_or_invoke(KEY, tool)) for _ in range(3)]
+    await asyncio.sleep(0)
+    tool.release.set()
+    assert await asyncio.gather(*tasks) == ["result 1"] * 3
+    # Later duplicates are answered from the memo, other arguments invoke the tool
+    assert await memo.get_or_invoke(KEY, tool) == "result 1"
+    other_key = ToolResultMemo.make_key("trading", "get_stock_data", {"symbol": "000001"})
+    assert await memo.get_or_invoke(other_key, tool) == "result 2"
+    assert (memo.invoked_calls, memo.saved_calls) == (2, 3)
+
+
+async def test_failed_call_is_not_memoized():
+    memo = ToolResultMemo()
+    tool = _Tool(failures=1)
+    tasks = [asyncio.create_task(memo.get_or_invoke(KEY, tool)) for _ in range(2)]
+    await asyncio.sleep(0)
+    tool.release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    # The caller that joined the failing call gets its error
+    assert [str(result) for result in results] == ["call 1 failed"] * 2
+    assert await memo.get_or_invoke(KEY, tool) == "result 2"
+    assert await memo.get_or_invoke(KEY, tool) == "result 2"
+    assert tool.calls == 2
+    assert (memo.invoked_calls, memo.saved_calls) == (2, 2)
+
+
+async def test_caller_joining_a_cancelled_call_invokes_the_tool_itself():
+    memo = ToolResultMemo()
+    tool = _Tool()
+    leader = asyncio.create_task(memo.get_or_invoke(KEY, tool))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(memo.get_or_invoke(KEY, tool))
+    await asyncio.sleep(0)
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    tool.release.set()
+    assert await follower == "result 2"
+    assert tool.calls == 2
+    assert (memo.invoked_calls, memo.saved_calls) == (2, 0)
+
+
+async def test_failed_run_still_reports_the_saved_calls(monkeypatch, tmp_path, caplog):
+    monkeypatch.chdir(tmp_path)
+
+    async def failing_analysts(conditional_logic, state, kernel, configurable, thread, tool_result_memo):
+        tool = _Tool()
+        tool.release.set()
+        await tool_result_memo.get_or_invoke(KEY, tool)
+        await tool_result_memo.get_or_invoke(KEY, tool)
+        raise RuntimeError("analyst failed")
+        yield
+
+    monkeypatch.setattr(sk_trading_agent, "invoke_analysts_stream", failing_analysts)
+    agent = FinancialTradingAgent(FinancialTradingAgentConfig(mcp_server_url=""), kernel=Kernel())
+
+    with caplog.at_level(logging.INFO, logger=sk_trading_agent.__name__):
+        with pytest.raises(RuntimeError):
+            async for _ in agent.invoke_stream("Analyze 600519"):
+                pass
+    assert "made 1 MCP tool calls, saved 1 duplicate calls" in caplog.text
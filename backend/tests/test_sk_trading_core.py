@@ -0,0 +1,49 @@
+from novas_agents.sk_trading_core import digest_report
+
+
+def _table(rows: int) -> list[str]:
+    return ["| date | close |", "| --- | --- |"] + [f"| 2025-01-{i:02d} | {i}.00 |" for i in range(1, rows + 1)]
+
+
+def test_digest_keeps_first_and_last_table_rows():
+    report = "\n".join(["Prices:", *_table(30), "The trend is up."])
+    lines = digest_report(report, max_table_rows=4).splitlines()
+    assert lines == [
+        "Prices:",
+        "| date | close |",
+        "| --- | --- |",
+        "| 2025-01-01 | 1.00 |",
+        "| 2025-01-02 | 2.00 |",
+        "... (26 rows omitted) ...",
+        "| 2025-01-29 | 29.00 |",
+        "| 2025-01-30 | 30.00 |",
+        "The trend is up.",
+    ]
+
+
+def test_digest_keeps_short_tables_and_compacts_code_blocks():
+    report = "\n".join(["```json", *[f'  "row{i}": {i},' for i in range(20)], "```", *_table(3)])
+    lines = digest_report(report, max_table_rows=2).splitlines()
+    assert lines[:5] == ["```json", '  "row0": 0,', "... (18 rows omitted) ...", '  "row19": 19,', "```"]
+    # A table ending the report is compacted too
+    assert lines[5:] == ["| date | close |", "| --- | --- |", "| 2025-01-01 | 1.00 |", "... (1 rows omitted) ...", "| 2025-01-03 | 3.00 |"]
+
+
+def test_digest_collapses_blank_lines():
+    assert digest_report("\n\nfirst  \n\n\n\nsecond\n\n") == "first\n\nsecond"
+    assert digest_report("") == ""
+
+
+def test_digest_is_cut_at_a_line_boundary():
+    report = "\n".join(f"line {i} " + "x" * 40 for i in range(100))
+    digest = digest_report(report, max_chars=500)
+    kept, marker = digest.rsplit("\n", 1)
+    assert len(kept) <= 500
+    assert kept.splitlines() == report.splitlines()[: len(kept.splitlines())]
+    assert marker == f"... (report truncated, {len(report) - len(kept)} characters omitted) ..."
+
+
+def test_digest_is_deterministic():
+    report = "\n".join(["Summary", "", *_table(50), "```", *map(str, range(40)), "```", "tail " * 2000])
+    assert digest_report(report, max_chars=1500) == digest_report(report, max_chars=1500)
+    assert digest_report(report, max_chars=1500) == digest_report(report + "\n\n", max_chars=1500)
@@ -0,0 +1,186 @@
+import json
+
+import httpx
+from openai import AsyncOpenAI
+from semantic_kernel.agents import ChatHistoryAgentThread
+from semantic_kernel.connectors.ai.open_ai import OpenAIChatCompletion
+from semantic_kernel.contents import AuthorRole
+from semantic_kernel.kernel import Kernel
+
+from novas_agents.sk_trading_agent import (
+    FinancialTradingAgentConfig,
+    build_stage_chat_history,
+    get_stage_model_config,
+    invoke_researchers_stream,
+    invoke_risk_analysis_stream,
+    invoke_trader_stream,
+)
+from novas_agents.sk_trading_core import (
+    FinancialSituationMemory,
+    FinancialTradingAgentState,
+    FinancialTradingConditionalLogic,
+)
+
+DEEP_MODEL = "openai:deep-model"
+QUICK_MODEL = "openai:quick-model"
+
+
+class StubChatServer:
+    """
+    Streaming chat completions endpoint that counts prompt tokens (whitespace separated)
+    and models an OpenAI-style prefix cache: a request reuses the longest prefix it shares
+    with an earlier request to the same model, in 128-token blocks, from 1024 tokens up.
+    """
+
+    def __init__(self):
+        self.requests: list[dict] = []
+        self._prompts: dict[str, list[list[str]]] = {}
+
+    def _cached_tokens(self, model: str, tokens: list[str]) -> int:
+        longest = 0
+        for previous in self._prompts.setdefault(model, []):
+            shared = 0
+            for a, b in zip(previous, tokens):
+                if a != b:
+                    break
+                shared += 1
+            longest = max(longest, shared)
+        self._prompts[model].append(tokens)
+        return longest // 128 * 128 if longest >= 1024 else 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        model = body["model"]
+        tokens = [
+            token
+            for message in body["messages"]
+            for token in [f"<{message['role']}>", *message["content"].split()]
+        ]
+        self.requests.append(
+            {
+                "model": model,
+                "messages": body["messages"],
+                "prompt_tokens": len(tokens),
+                "cached_tokens": self._cached_tokens(model, tokens),
+            }
+        )
+        text = f"Argument {len(self.requests)} " + "point " * 80
+        chunk = {
+            "id": f"chatcmpl-{len(self.requests)}",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": model,
+            "choices": [{"index": 0, "delta": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        }
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream"},
+            content=f"data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n".encode(),
+        )
+
+
+def _kernel(server: StubChatServer, with_quick_service: bool = True) -> Kernel:
+    async_client = AsyncOpenAI(
+        api_key="test",
+        base_url="http://stub-openai/v1",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(server.handle)),
+    )
+    kernel = Kernel()
+    models = [DEEP_MODEL, QUICK_MODEL] if with_quick_service else [DEEP_MODEL]
+    for model in models:
+        kernel.add_service(
+            OpenAIChatCompletion(ai_model_id=model.split(":", 1)[-1], service_id=model, async_client=async_client)
+        )
+    return kernel
+
+
+def _report(title: str) -> str:
+    rows = [f"| 2025-{month:02d}-{day:02d} | {100 + day}.5 | {day * 1000} |" for month in (4, 5, 6) for day in range(1, 29)]
+    prose = [f"{title} observation {i}: the metric moved by {i % 7} percent against its peers." for i in range(30)]
+    return "\n".join([f"# {title}", *prose, "", "| date | close | volume |", "| --- | --- | --- |", *rows])
+
+
+async def _run_stages(kernel: Kernel, config: FinancialTradingAgentConfig) -> None:
+    state = FinancialTradingAgentState(
+        company_of_interest="600519",
+        trade_date="2025-06-30",
+        market_report=_report("Market"),
+        sentiment_report=_report("Sentiment"),
+        news_report=_report("News"),
+        fundamentals_report=_report("Fundamentals"),
+    )
+    logic = FinancialTradingConditionalLogic(config.max_debate_rounds, config.max_risk_discuss_rounds)
+    memory = FinancialSituationMemory("memory", config)
+    thread = ChatHistoryAgentThread()
+    stages = [
+        invoke_researchers_stream(logic, memory, memory, memory, state, kernel, config, thread),
+        invoke_trader_stream(memory, state, kernel, config, thread),
+        invoke_risk_analysis_stream(logic, memory, state, kernel, config, thread),
+    ]
+    for stage in stages:
+        async for _ in stage:
+            pass
+
+
+def _config(**kwargs) -> FinancialTradingAgentConfig:
+    return FinancialTradingAgentConfig(
+        deep_think_model=DEEP_MODEL,
+        quick_think_model=QUICK_MODEL,
+        max_debate_rounds=2,
+        max_risk_discuss_rounds=2,
+        **kwargs,
+    )
+
+
+async def test_debaters_run_on_the_quick_model_and_share_a_cached_prefix():
+    server = StubChatServer()
+    await _run_stages(_kernel(server), _config())
+
+    models = [request["model"] for request in server.requests]
+    # bull, bear x 2 rounds, invest judge, trader, risky, safe, neutral x 2 rounds, risk judge
+    assert models == ["quick-model"] * 4 + ["deep-model"] * 2 + ["quick-model"] * 6 + ["deep-model"]
+
+    debaters = [request for request in server.requests if request["model"] == "quick-model"]
+    assert len({json.dumps(request["messages"][0]) for request in debaters}) == 1
+    assert debaters[0]["messages"][0]["role"] == "system"
+    # Every turn after the first reuses at least the shared analyst report digests
+    context_tokens = len(debaters[0]["messages"][0]["content"].split())
+    assert context_tokens > 1024
+    for request in debaters[1:]:
+        assert request["cached_tokens"] >= context_tokens // 128 * 128
+    prompt_tokens = sum(request["prompt_tokens"] for request in debaters)
+    cached_tokens = sum(request["cached_tokens"] for request in debaters)
+    assert cached_tokens > 0.7 * prompt_tokens
+
+
+async def test_stages_fall_back_to_the_deep_model_without_a_quick_service():
+    server = StubChatServer()
+    kernel = _kernel(server, with_quick_service=False)
+    config = _config()
+
+    assert get_stage_model_config(kernel, config, "researchers") == (DEEP_MODEL, config.deep_think_model_config)
+    await _run_stages(kernel, config)
+    assert {request["model"] for request in server.requests} == {"deep-model"}
+    assert len(server.requests) == 13
+
+
+def test_stage_model_config_follows_the_stage_routing():
+    kernel = _kernel(StubChatServer())
+    config = _config(quick_think_model_config={"temperature": 0.2}, stage_models={"trader": "quick"})
+    assert get_stage_model_config(kernel, config, "trader") == (QUICK_MODEL, {"temperature": 0.2})
+    # Stages that are not listed run on the deep model
+    assert get_stage_model_config(kernel, config, "researchers") == (DEEP_MODEL, {})
+
+
+def test_stage_chat_history_puts_the_debate_history_before_the_role_prompt():
+    history = build_stage_chat_history("context", "role prompt", "history")
+    assert [(m.role, m.content) for m in history.messages] == [
+        (AuthorRole.SYSTEM, "context"),
+        (AuthorRole.USER, "history"),
+        (AuthorRole.USER, "role prompt"),
+    ]
+    history = build_stage_chat_history("system prompt", "user prompt")
+    assert [(m.role, m.content) for m in history.messages] == [
+        (AuthorRole.SYSTEM, "system prompt"),
+        (AuthorRole.USER, "user prompt"),
+    ]
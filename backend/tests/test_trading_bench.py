@@ -0,0 +1,28 @@
+import json
+import os
+
+import novas_mcp
+from novas_mcp.trading_bench import BENCH_CASES, run_benchmark
+from novas_mcp.trading_bench_fixtures import generate_fixtures
+
+FIXTURES_DIR = os.path.join(os.path.dirname(novas_mcp.__file__), "bench_fixtures")
+
+
+async def test_committed_fixtures_replay_offline():
+    results = await run_benchmark(FIXTURES_DIR, repeat=1)
+    assert [r.tool for r in results] == list(BENCH_CASES)
+    for result in results:
+        assert result.failures == 0, result.tool
+        assert result.payload_bytes > 1000, result.tool
+
+
+async def test_generated_fixtures_replay(tmp_path):
+    tools = ["retrieve_stock_historical_data", "retrieve_financial_balance_sheet"]
+    await generate_fixtures(str(tmp_path), ["SZ.000001"], tools)
+    with open(tmp_path / "manifest.json") as f:
+        manifest = json.load(f)
+    assert manifest["stocks"] == ["SZ.000001"]
+    assert manifest["tools"] == tools
+
+    results = await run_benchmark(str(tmp_path), repeat=1)
+    assert [(r.tool, r.failures) for r in results] == [(tool, 0) for tool in tools]
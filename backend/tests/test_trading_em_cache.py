@@ -0,0 +1,53 @@
+import httpx
+import pandas as pd
+import pytest
+
+from novas_mcp.trading import trading_em_cache
+from novas_mcp.trading.trading_em_cache import em_cached
+
+
+@pytest.fixture(autouse=True)
+def memory_backend(monkeypatch):
+    monkeypatch.setattr(trading_em_cache, "EM_CACHE_BACKEND", "memory")
+    monkeypatch.setattr(trading_em_cache, "_backend", trading_em_cache._MemoryBackend(16))
+
+
+def _fetcher(responses: list):
+    calls = []
+
+    @em_cached(ttl=3600)
+    async def fetch(symbol: str):
+        calls.append(symbol)
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    return fetch, calls
+
+
+async def test_results_are_cached():
+    fetch, calls = _fetcher([{"revenue": 1}])
+    assert await fetch("600519") == {"revenue": 1}
+    assert await fetch(" 600519 ") == {"revenue": 1}
+    assert calls == ["600519"]
+
+
+@pytest.mark.parametrize("empty", [{}, [], pd.DataFrame()], ids=["dict", "list", "dataframe"])
+async def test_empty_results_are_not_cached(empty):
+    fetch, calls = _fetcher([empty, {"revenue": 1}])
+    first = await fetch("600519")
+    assert len(first) == 0
+    assert await fetch("600519") == {"revenue": 1}
+    assert len(calls) == 2
+
+
+async def test_empty_result_does_not_replace_stale_data():
+    fetch, _ = _fetcher([{"revenue": 1}, {}, httpx.ConnectError("down")])
+    await fetch("600519")
+    # Expire the entry, it is kept as stale data
+    key, (expires_at, payload) = next(iter(trading_em_cache._backend._entries.items()))
+    trading_em_cache._backend._entries[key] = (expires_at - 7200, payload)
+
+    assert await fetch("600519") == {}
+    assert await fetch("600519") == {"revenue": 1}
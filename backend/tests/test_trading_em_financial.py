@@ -0,0 +1,186 @@
+"""
+Financial statements split with the precomputed column plans must come out exactly as
+with the per-call category loop they replaced. The expected reports are rebuilt here
+with that loop from the payloads the mock EM endpoints served.
+"""
+import random
+from datetime import datetime
+
+import httpx
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from novas_mcp.trading import trading_em_cache
+from novas_mcp.trading import trading_em_financial as financial
+from novas_mcp.trading.trading_em_http import use_em_http_transport
+from novas_mcp.trading_core import MarketCode, ReportDateType, TradingReportResultPack
+
+LOOK_BACK_YEARS = 5
+REPORT_DATES = [
+    f"{year}-{month_day} 00:00:00"
+    for year in range(datetime.now().year, datetime.now().year - 8, -1)
+    for month_day in ("12-31", "09-30", "06-30", "03-31")
+]
+STATEMENT_COLUMNS = sorted(
+    (
+        set(financial._FINANCIAL_INDICATOR_MAPPING)
+        | set(financial._CASH_FLOW_STATEMENT_COLUMN_MAPPING)
+        | set(financial._BALANCE_SHEET_COLUMN_MAPPING)
+        | set(financial._INCOME_STATEMENT_COLUMN_MAPPING)
+    )
+    - {"REPORT_DATE", "REPORT_DATE_NAME"}
+)
+
+FETCHES = (
+    [("indicators", False, False)]
+    + [("cash_flow", yoy, qoq) for yoy, qoq in financial._CHANGE_OPTIONS]
+    + [("balance_sheet", yoy, False) for yoy in (False, True)]
+    + [("income", yoy, qoq) for yoy, qoq in financial._CHANGE_OPTIONS]
+)
+STATEMENTS = {
+    "cash_flow": (financial._CASH_FLOW_STATEMENT_CATEGORIES, financial._CASH_FLOW_STATEMENT_COLUMN_MAPPING),
+    "balance_sheet": (financial._BALANCE_SHEET_CATEGORIES, financial._BALANCE_SHEET_COLUMN_MAPPING),
+    "income": (financial._INCOME_STATEMENT_CATEGORIES, financial._INCOME_STATEMENT_COLUMN_MAPPING),
+}
+
+
+@pytest.fixture(autouse=True)
+def no_cache(monkeypatch):
+    monkeypatch.setattr(trading_em_cache, "EM_CACHE_BACKEND", "none")
+
+
+class _MockEm:
+    """Serves random EM records and keeps the ones returned by the data endpoints."""
+
+    def __init__(self, seed: int, with_report_date_name: bool):
+        self.rnd = random.Random(seed)
+        self.with_report_date_name = with_report_date_name
+        self.served: list[dict] = []
+
+    def record(self, report_date: str) -> dict:
+        rnd = self.rnd
+        record = {"REPORT_DATE": report_date, "SECUCODE": "600519.SH", "EXTRA": rnd.random()}
+        if self.with_report_date_name:
+            record["REPORT_DATE_NAME"] = report_date[:10] + "报"
+        for column in STATEMENT_COLUMNS:
+            if rnd.random() < 0.7:
+                record[column] = rnd.choice([None, rnd.uniform(-1e9, 1e9), rnd.randint(0, 10**6)])
+            for suffix in ("_YOY", "_QOQ"):
+                if rnd.random() < 0.5:
+                    record[column + suffix] = rnd.choice([None, rnd.uniform(-50, 50)])
+        return record
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path.endswith("DateAjaxNew"):
+            return httpx.Response(200, json={"data": [{"REPORT_DATE": d} for d in REPORT_DATES]})
+        if path.endswith("ZYZBAjaxNew"):
+            records = [self.record(d) for d in REPORT_DATES]
+        else:
+            records = [self.record(d + " 00:00:00") for d in request.url.params["dates"].split(",")]
+        self.served.extend(records)
+        return httpx.Response(200, json={"data": records})
+
+
+def _split_by_category(df: pd.DataFrame, categories: dict, include_yoy: bool, include_qoq: bool) -> dict:
+    """The category loop the column plans replaced"""
+    category_dataframes = {}
+    for category_name, indicators in categories.items():
+        available_indicators = {"NORMAL": [indicator for indicator in indicators if indicator in df.columns]}
+        if include_yoy:
+            available_indicators["YOY"] = [i + "_YOY" for i in indicators if i + "_YOY" in df.columns]
+        if include_qoq:
+            available_indicators["QOQ"] = [i + "_QOQ" for i in indicators if i + "_QOQ" in df.columns]
+        for _type, _indicators in available_indicators.items():
+            if len(_indicators) == 0:
+                continue
+            final_category_name = category_name
+            if _type == "YOY":
+                final_category_name += "-同比"
+            elif _type == "QOQ":
+                final_category_name += "-环比"
+            category_data = df[["REPORT_DATE_NAME"] + _indicators].copy()
+            category_data.set_index("REPORT_DATE_NAME", inplace=True)
+            category_dataframes[final_category_name] = category_data
+    return category_dataframes
+
+
+def _expected_reports(kind: str, report_date_type: ReportDateType, include_yoy: bool, include_qoq: bool, served: list) -> dict:
+    df = pd.DataFrame(served)
+    if kind == "indicators":
+        df["REPORT_DATE_T"] = pd.to_datetime(df["REPORT_DATE"])
+        df = df[df["REPORT_DATE_T"] >= datetime(datetime.now().year - LOOK_BACK_YEARS, 1, 1)].copy()
+        df = df.sort_values("REPORT_DATE_T", ascending=False)
+        if "REPORT_DATE_NAME" not in df.columns:
+            df["REPORT_DATE_NAME"] = df["REPORT_DATE_T"].dt.strftime("%Y-%m-%d")
+        mapping = dict(financial._FINANCIAL_INDICATOR_MAPPING)
+        if report_date_type == ReportDateType.QUARTERLY:
+            mapping["EPSJB"] = "摊薄每股收益(元)"
+        category_dataframes = _split_by_category(df, financial._FINANCIAL_INDICATOR_CATEGORIES, False, False)
+    else:
+        categories, mapping = STATEMENTS[kind]
+        columns = []
+        for column in dict.fromkeys(["REPORT_DATE", "REPORT_DATE_NAME", *mapping]):
+            columns += [c for c, wanted in ((column, True), (column + "_YOY", include_yoy), (column + "_QOQ", include_qoq)) if wanted and c in df.columns]
+        df = df[columns].copy()
+        if kind == "cash_flow" or (kind == "income" and "REPORT_DATE_NAME" not in df.columns):
+            df["REPORT_DATE_NAME"] = df["REPORT_DATE"].apply(lambda d: d[0:10])
+        category_dataframes = _split_by_category(df, categories, include_yoy, include_qoq)
+        # The QOQ names were added on top of the YOY ones, _YOY_QOQ keys included
+        if include_yoy:
+            mapping = {**mapping, **{k + "_YOY": v + "(%)" for k, v in mapping.items()}}
+        if include_qoq:
+            mapping = {**mapping, **{k + "_QOQ": v + "(%)" for k, v in mapping.items()}}
+    return {
+        name: TradingReportResultPack(dataframe=category_df, column_mapping=mapping)
+        for name, category_df in category_dataframes.items()
+    }
+
+
+async def _fetch(kind: str, report_date_type: ReportDateType, include_yoy: bool, include_qoq: bool) -> dict:
+    if kind == "indicators":
+        return await financial.em_retrieve_company_financial_analysis_indicators(
+            MarketCode.SH, "600519", report_period_type=report_date_type, look_back_years=LOOK_BACK_YEARS
+        )
+    if kind == "balance_sheet":
+        return await financial.em_retrieve_company_financial_analysis_balance_sheet(
+            MarketCode.SH, "600519", report_date_type=report_date_type, include_yoy=include_yoy, look_back_years=LOOK_BACK_YEARS
+        )
+    fetch = {
+        "cash_flow": financial.em_retrieve_company_financial_analysis_cash_flow_statement,
+        "income": financial.em_retrieve_company_financial_analysis_income_statement,
+    }[kind]
+    return await fetch(
+        MarketCode.SH, "600519", report_date_type=report_date_type,
+        include_yoy=include_yoy, include_qoq=include_qoq, look_back_years=LOOK_BACK_YEARS,
+    )
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("with_report_date_name", [True, False], ids=["named", "unnamed"])
+@pytest.mark.parametrize("report_date_type", list(ReportDateType), ids=lambda t: t.value)
+@pytest.mark.parametrize(
+    "kind,include_yoy,include_qoq", FETCHES,
+    ids=[f"{kind}-yoy{int(yoy)}-qoq{int(qoq)}" for kind, yoy, qoq in FETCHES],
+)
+async def test_reports_match_category_loop(kind, include_yoy, include_qoq, report_date_type, with_report_date_name, seed):
+    em = _MockEm(seed, with_report_date_name)
+    if kind == "balance_sheet" and (report_date_type == ReportDateType.QUARTERLY or not with_report_date_name):
+        # Balance sheets have no quarterly reports and are indexed by the name EM sends
+        error = ValueError if report_date_type == ReportDateType.QUARTERLY else KeyError
+        async with use_em_http_transport(httpx.MockTransport(em.handler)):
+            with pytest.raises(error):
+                await _fetch(kind, report_date_type, include_yoy, include_qoq)
+        return
+
+    async with use_em_http_transport(httpx.MockTransport(em.handler)):
+        reports = await _fetch(kind, report_date_type, include_yoy, include_qoq)
+
+    expected = _expected_reports(kind, report_date_type, include_yoy, include_qoq, em.served)
+    assert list(reports) == list(expected)
+    assert reports
+    for name, pack in reports.items():
+        assert_frame_equal(pack.dataframe, expected[name].dataframe, check_exact=True)
+        assert pack.column_mapping == expected[name].column_mapping
+        assert pack.markdown_table == expected[name].markdown_table
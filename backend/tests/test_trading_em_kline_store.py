@@ -0,0 +1,94 @@
+import pandas as pd
+
+from novas_mcp.trading import trading_em_kline_store
+from novas_mcp.trading.trading_em_kline_store import KlineStore, parse_klines
+
+TODAY = "2024-01-10"
+
+
+def _upstream(start: str, end: str) -> pd.DataFrame:
+    """Business day bars the upstream would return for a range."""
+    dates = pd.bdate_range(start, end).strftime("%Y-%m-%d")
+    return parse_klines([f"{d},1,2,3,0.5,100,200,1,2,0.1,0.5" for d in dates])
+
+
+def _request(stored, coverage, start: str, end: str):
+    missing = KlineStore.missing_ranges(stored, coverage, start, end, today=TODAY)
+    fetched = [((begin, stop), _upstream(begin, stop)) for begin, stop in missing]
+    if fetched:
+        stored, coverage = KlineStore.merge(stored, coverage, fetched, today=TODAY)
+    return stored, coverage, missing
+
+
+def _dates(stored, start: str, end: str) -> list[str]:
+    return stored[(stored["日期"] >= start) & (stored["日期"] <= end)]["日期"].tolist()
+
+
+def test_covered_range_is_not_fetched_again():
+    stored, coverage, _ = _request(None, None, "2020-01-01", "2020-06-30")
+    _, _, missing = _request(stored, coverage, "2020-02-01", "2020-03-31")
+    assert missing == []
+
+
+def test_request_after_coverage_fetches_the_gap():
+    stored, coverage, _ = _request(None, None, "2020-01-01", "2020-06-30")
+    stored, coverage, missing = _request(stored, coverage, "2023-01-01", "2023-06-30")
+    assert missing == [("2020-06-30", "2023-06-30")]
+
+    # The years in between were fetched along the way
+    _, _, missing = _request(stored, coverage, "2021-01-01", "2021-12-31")
+    assert missing == []
+    assert _dates(stored, "2021-01-01", "2021-12-31") == _upstream("2021-01-01", "2021-12-31")["日期"].tolist()
+
+
+def test_request_before_coverage_fetches_the_gap():
+    stored, coverage, _ = _request(None, None, "2023-01-01", "2023-06-30")
+    stored, coverage, missing = _request(stored, coverage, "2020-01-01", "2020-06-30")
+    assert missing == [("2020-01-01", "2022-12-31")]
+    assert coverage == {"from": "2020-01-01", "to": "2023-06-30"}
+
+    _, _, missing = _request(stored, coverage, "2021-01-01", "2021-12-31")
+    assert missing == []
+    assert _dates(stored, "2021-01-01", "2021-12-31") == _upstream("2021-01-01", "2021-12-31")["日期"].tolist()
+
+
+def test_open_bar_of_today_is_refreshed():
+    stored, coverage, _ = _request(None, None, "2024-01-01", TODAY)
+    _, _, missing = _request(stored, coverage, "2024-01-05", TODAY)
+    assert missing == [(TODAY, TODAY)]
+
+
+def test_empty_fetch_does_not_extend_coverage():
+    stored, coverage, _ = _request(None, None, "2023-01-01", "2023-06-30")
+    # The upstream answers the gap with no bars, e.g. a transient failure
+    missing = KlineStore.missing_ranges(stored, coverage, "2023-01-01", "2023-12-31", today=TODAY)
+    stored, coverage = KlineStore.merge(stored, coverage, [(r, parse_klines([])) for r in missing], today=TODAY)
+    assert coverage == {"from": "2023-01-01", "to": "2023-06-30"}
+
+    stored, coverage, missing = _request(stored, coverage, "2023-01-01", "2023-12-31")
+    assert missing == [("2023-06-30", "2023-12-31")]
+    assert coverage == {"from": "2023-01-01", "to": "2023-12-31"}
+    assert _dates(stored, "2023-07-01", "2023-12-31") == _upstream("2023-07-01", "2023-12-31")["日期"].tolist()
+
+
+def test_empty_first_fetch_has_no_coverage():
+    stored, coverage = KlineStore.merge(None, None, [(("2023-01-01", "2023-06-30"), parse_klines([]))], today=TODAY)
+    assert coverage is None
+    assert KlineStore.missing_ranges(stored, coverage, "2023-01-01", "2023-06-30", today=TODAY) == [
+        ("2023-01-01", "2023-06-30")
+    ]
+
+
+def test_today_is_taken_in_beijing_time(monkeypatch):
+    from datetime import datetime, timezone
+
+    class UtcEvening(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            # 2024-01-10 20:00 UTC is already 2024-01-11 in Beijing
+            moment = datetime(2024, 1, 10, 20, 0, tzinfo=timezone.utc)
+            return moment.astimezone(tz) if tz else moment.replace(tzinfo=None)
+
+    monkeypatch.setattr(trading_em_kline_store, "datetime", UtcEvening)
+    stored, coverage, _ = _request(None, None, "2024-01-01", "2024-01-10")
+    assert KlineStore.missing_ranges(stored, coverage, "2024-01-01", "2024-01-11") == [("2024-01-10", "2024-01-11")]
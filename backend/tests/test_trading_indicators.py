@@ -0,0 +1,76 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pytest
+from stockstats import wrap
+
+from novas_mcp.trading import trading_indicators
+from novas_mcp.trading.trading_indicators import IndicatorEngine, compute_kline_indicators
+
+INDICATORS = [
+    "close_50_sma", "close_200_sma", "close_10_ema", "macd", "macds", "macdh", "rsi", "rsi_6",
+    "boll", "boll_ub", "boll_lb", "atr", "atr_5", "vwma", "vwma_5", "mfi", "mfi_5",
+]
+# pandas' rolling variance leaves ~1e-13 on flat windows, about 1e-7 on the bands after the square root
+TOLERANCES = {"boll_ub": 9e-7, "boll_lb": 9e-7}
+DEFAULT_TOLERANCE = 1e-13
+
+
+def _klines(seed: int, num_days: int = 600, zero_volume: bool = False, flat: bool = False) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = np.round(20 + np.cumsum(rng.normal(0, 0.3, num_days)).clip(-15, None), 2)
+    if flat:
+        close[5:30] = close[4]
+    volume = rng.integers(0 if zero_volume else 1000, 100000, num_days).astype(np.int64)
+    return pd.DataFrame({
+        "日期": pd.bdate_range("2015-01-01", periods=num_days).strftime("%Y-%m-%d"),
+        "收盘": close,
+        "最高": close + rng.uniform(0, 0.5, num_days).round(2),
+        "最低": close - rng.uniform(0, 0.5, num_days).round(2),
+        "成交量": volume,
+        "成交额": (volume * close * 100).round(1),
+    })
+
+
+def _stockstats(kline_data: pd.DataFrame) -> dict[str, np.ndarray]:
+    sdf = wrap(pd.DataFrame({
+        "date": kline_data["日期"], "amount": kline_data["成交额"], "close": kline_data["收盘"],
+        "high": kline_data["最高"], "low": kline_data["最低"], "volume": kline_data["成交量"],
+    }))
+    return {indicator: sdf[indicator].to_numpy(dtype=np.float64) for indicator in INDICATORS}
+
+
+CASES = {
+    **{f"random-{seed}": _klines(seed) for seed in range(20)},
+    "zero-volume": _klines(100, zero_volume=True),
+    "flat": _klines(101, flat=True),
+    "short": _klines(102).iloc[:30],
+    "single-bar": _klines(103).iloc[:1],
+}
+
+
+@pytest.mark.parametrize("kline_data", CASES.values(), ids=CASES.keys())
+def test_matches_stockstats(kline_data):
+    expected = _stockstats(kline_data)
+    actual = IndicatorEngine.from_kline_data(kline_data).compute_many(INDICATORS)
+
+    for indicator in INDICATORS:
+        assert np.array_equal(np.isnan(expected[indicator]), np.isnan(actual[indicator])), indicator
+        scale = np.maximum(np.abs(expected[indicator]), 1.0)
+        error = np.nan_to_num(np.abs(expected[indicator] - actual[indicator]) / scale)
+        assert error.max(initial=0.0) < TOLERANCES.get(indicator, DEFAULT_TOLERANCE), indicator
+
+
+def test_engine_is_reused_until_the_last_bar_changes(monkeypatch):
+    monkeypatch.setattr(trading_indicators, "_indicator_cache", OrderedDict())
+    kline_data = _klines(0)
+    first = compute_kline_indicators(("SH", "600000", "daily"), kline_data, ["rsi"])
+    again = compute_kline_indicators(("SH", "600000", "daily"), kline_data.copy(), ["rsi"])
+    assert len(trading_indicators._indicator_cache) == 1
+    pd.testing.assert_series_equal(first["rsi"], again["rsi"])
+
+    kline_data.loc[kline_data.index[-1], "收盘"] += 0.5
+    moved = compute_kline_indicators(("SH", "600000", "daily"), kline_data, ["rsi"])
+    assert len(trading_indicators._indicator_cache) == 2
+    assert moved["rsi"].iloc[-1] > first["rsi"].iloc[-1]
@@ -0,0 +1,135 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from lxml import html
+from openai import AsyncOpenAI
+from semantic_kernel.connectors.ai.open_ai.services.open_ai_chat_completion import (
+    OpenAIChatCompletion,
+)
+
+from novas_mcp import web_fetch
+
+
+class StubOpenAIServer:
+    """Chat completions endpoint answering every chunk with its text content"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.chunks: list[str] = []
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        chunk = body["messages"][-1]["content"]
+        self.chunks.append(chunk)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        text = " ".join(html.fromstring(f"<div>{chunk}</div>").text_content().split())
+        return httpx.Response(
+            200,
+            json={
+                "id": f"chatcmpl-{len(self.chunks)}",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": text},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            },
+        )
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    server = StubOpenAIServer()
+    service = OpenAIChatCompletion(
+        ai_model_id="stub-model",
+        async_client=AsyncOpenAI(
+            api_key="test",
+            base_url="http://stub-openai/v1",
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(server.handle)),
+        ),
+    )
+    monkeypatch.setattr(web_fetch, "_get_markdown_extraction_service", lambda: service)
+    monkeypatch.setattr(web_fetch, "WEB_PAGE_FETCH_MARKDOWN_CHUNK_SIZE", 400)
+    web_fetch._markdown_chunk_cache.clear()
+    yield server
+    web_fetch._markdown_chunk_cache.clear()
+
+
+def _page(paragraphs: int, footer_copies: int = 1) -> str:
+    body = "".join(
+        f"<p>Paragraph {i} says 1 &lt; 2 &amp; 3 &gt; 2</p>tail {i} &lt;b&gt;"
+        for i in range(paragraphs)
+    )
+    footer = '<div class="footer">Copyright notice &amp; disclaimer</div>' * footer_copies
+    return f'<html><body>intro<div class="article">{body}</div>{footer}</body></html>'
+
+
+def test_split_keeps_chunks_well_formed_and_escaped():
+    page = _page(60)
+    chunks = web_fetch._split_html_into_sections(page, 400)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 400 for chunk in chunks)
+    # Parts of the split article keep its wrapper tag
+    assert sum(chunk.count('<div class="article">') for chunk in chunks) > 1
+    for chunk in chunks:
+        assert "<b>" not in chunk
+        assert " 1 < 2 " not in chunk
+        reparsed = html.tostring(
+            html.fragment_fromstring(chunk, create_parent="div"), encoding="unicode"
+        )
+        assert reparsed == f"<div>{chunk}</div>"
+
+    text = "".join(
+        html.fragment_fromstring(chunk, create_parent="div").text_content()
+        for chunk in chunks
+    )
+    assert text == html.fromstring(page).text_content()
+
+
+def test_split_cuts_oversized_text_by_length():
+    page = f"<html><body><pre>{'x' * 1000} &amp;</pre></body></html>"
+    chunks = web_fetch._split_html_into_sections(page, 300)
+
+    assert all(chunk.startswith("<pre>") and chunk.endswith("</pre>") for chunk in chunks)
+    assert "".join(html.fromstring(chunk).text_content() for chunk in chunks) == (
+        "x" * 1000 + " &"
+    )
+
+
+async def test_convert_stitches_chunks_in_document_order(stub_server):
+    page = _page(40)
+
+    markdown = await web_fetch._llm_convert_html_to_markdown(page, query="paragraphs")
+
+    # Chunks are extracted concurrently, so they reach the server in any order
+    expected_chunks = web_fetch._split_html_into_sections(page, 400)
+    assert sorted(stub_server.chunks) == sorted(expected_chunks)
+    positions = [markdown.index(f"Paragraph {i} says") for i in range(40)]
+    assert positions == sorted(positions)
+
+
+async def test_repeated_and_cached_chunks_are_sent_once(stub_server):
+    stub_server.delay = 0.05
+    # The footer repeats, so several identical chunks are extracted at the same time
+    page = _page(0, footer_copies=60)
+    chunks = web_fetch._split_html_into_sections(page, 400)
+    assert len(set(chunks)) < len(chunks)
+
+    first, second = await asyncio.gather(
+        web_fetch._llm_convert_html_to_markdown(page),
+        web_fetch._llm_convert_html_to_markdown(page),
+    )
+    assert first == second
+    assert sorted(stub_server.chunks) == sorted(set(chunks))
+
+    await web_fetch._llm_convert_html_to_markdown(page)
+    assert len(stub_server.chunks) == len(set(chunks))
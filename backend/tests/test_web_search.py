@@ -0,0 +1,158 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from novas_mcp import searxng_client, web_search
+
+STUB_SEARXNG_URL = "http://stub-searxng/"
+
+STUB_RESULTS = {
+    "alpha": [
+        "https://www.a.com/x?utm_source=feed",
+        "https://b.com/y",
+        "https://c.com/z#comments",
+    ],
+    "beta": ["https://a.com/x/", "https://c.com/z", "https://d.com/w"],
+    "gamma": ["https://b.com/y?spm=1.2", "https://e.com/v"],
+}
+
+
+class StubSearxng:
+    """SearXNG search endpoint with canned results, a slow query and a failing query"""
+
+    def __init__(self):
+        self.queries: list[str] = []
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/search"
+        query = request.url.params["q"]
+        self.queries.append(query)
+        if query == "slow":
+            await asyncio.sleep(1.0)
+        if query == "broken":
+            return httpx.Response(500, text="engine error")
+        urls = STUB_RESULTS.get(query, [])
+        return httpx.Response(
+            200,
+            content=json.dumps(
+                {
+                    "query": query,
+                    "number_of_results": len(urls),
+                    "results": [
+                        {
+                            "url": url,
+                            "title": f"{query} {rank}",
+                            "content": f"snippet for {url}",
+                            "thumbnail": "",
+                            "category": "general",
+                        }
+                        for rank, url in enumerate(urls, start=1)
+                    ],
+                }
+            ),
+            headers={"content-type": "application/json"},
+        )
+
+
+@pytest.fixture
+def stub_searxng(monkeypatch):
+    monkeypatch.setenv("SEARXNG_BASE_URL", STUB_SEARXNG_URL)
+    monkeypatch.delenv("SEARXNG_CACHE_REDIS_URL", raising=False)
+    monkeypatch.setenv("SEARXNG_CACHE_TTL", "300")
+    server = StubSearxng()
+    client = searxng_client.get_searxng_client(STUB_SEARXNG_URL)
+    client._http_client = httpx.AsyncClient(transport=httpx.MockTransport(server.handle))
+    yield server
+    searxng_client._clients.pop((STUB_SEARXNG_URL, None), None)
+
+
+def test_canonicalize_url_drops_www_fragment_and_tracking_params():
+    assert web_search._canonicalize_url(
+        "https://WWW.Example.com:443/a/b/?utm_source=x&b=2&a=1&spm=9#top"
+    ) == web_search._canonicalize_url("https://example.com/a/b?a=1&b=2")
+
+
+async def test_multi_search_fuses_deduplicated_results_by_rrf(stub_searxng):
+    results = await web_search._seaxng_multi_web_search(
+        ["alpha", "beta", "gamma", "alpha "], max_results=10, per_query_timeout=5.0
+    )
+
+    assert sorted(stub_searxng.queries) == ["alpha", "beta", "gamma"]
+    assert results.metadata == {
+        "queries": ["alpha", "beta", "gamma"],
+        "failed_queries": {},
+    }
+    assert [r.url for r in results.results] == [
+        "https://www.a.com/x?utm_source=feed",
+        "https://b.com/y",
+        "https://c.com/z#comments",
+        "https://e.com/v",
+        "https://d.com/w",
+    ]
+    k = web_search.WEB_SEARCH_RRF_K
+    assert [r.metadata["rrf_score"] for r in results.results] == [
+        round(2 / (k + 1), 6),
+        round(1 / (k + 2) + 1 / (k + 1), 6),
+        round(1 / (k + 3) + 1 / (k + 2), 6),
+        round(1 / (k + 2), 6),
+        round(1 / (k + 3), 6),
+    ]
+    assert [r.metadata["queries"] for r in results.results] == [
+        ["alpha", "beta"],
+        ["alpha", "gamma"],
+        ["alpha", "beta"],
+        ["gamma"],
+        ["beta"],
+    ]
+
+
+async def test_multi_search_reports_late_and_failed_queries(stub_searxng):
+    results = await web_search._seaxng_multi_web_search(
+        ["slow", "broken", "gamma"], max_results=1, per_query_timeout=0.2
+    )
+
+    assert [r.url for r in results.results] == ["https://b.com/y?spm=1.2"]
+    assert results.metadata["failed_queries"]["slow"] == "timeout"
+    assert "500" in results.metadata["failed_queries"]["broken"]
+
+
+async def test_repeated_searches_are_served_from_the_client_cache(stub_searxng):
+    first = await web_search._seaxng_multi_web_search(["alpha", "beta"])
+    second = await web_search._seaxng_multi_web_search(["beta", "alpha"])
+
+    assert sorted(stub_searxng.queries) == ["alpha", "beta"]
+    assert [r.metadata["rrf_score"] for r in first.results] == [
+        r.metadata["rrf_score"] for r in second.results
+    ]
+    metrics = searxng_client.get_searxng_metrics()[STUB_SEARXNG_URL]
+    assert metrics["cache_hits"] == 2
+
+
+async def test_cancelled_search_does_not_fail_coalesced_searches(stub_searxng):
+    client = searxng_client.get_searxng_client(STUB_SEARXNG_URL)
+    leader = asyncio.create_task(client.search("slow"))
+    await asyncio.sleep(0.05)
+    follower = asyncio.create_task(client.search("slow"))
+    await asyncio.sleep(0.05)
+
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    data = await follower
+
+    assert data["query"] == "slow"
+    assert stub_searxng.queries == ["slow"]
+    assert client.metrics.coalesced == 1
+
+
+async def test_deadline_of_one_query_does_not_fail_the_same_query_elsewhere(stub_searxng):
+    timed_out, completed = await asyncio.gather(
+        web_search._seaxng_multi_web_search(["slow"], per_query_timeout=0.2),
+        web_search._seaxng_multi_web_search(["slow", "gamma"], per_query_timeout=5.0),
+    )
+
+    assert timed_out.metadata["failed_queries"] == {"slow": "timeout"}
+    assert completed.metadata["failed_queries"] == {}
+    assert stub_searxng.queries == ["slow", "gamma"]